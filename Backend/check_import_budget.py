@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Import budget check for the web app
+Imports app.py in a fresh interpreter and fails if heavy plotting or data
+libraries end up in its import graph (they belong to report workers only),
+or if importing the app takes longer than an optional time budget
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Top-level packages the web app must not import at startup
+HEAVY_MODULES = (
+    "matplotlib",
+    "seaborn",
+    "numpy",
+    "pandas",
+    "scipy",
+    "PIL",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed_ms = (time.perf_counter() - started) * 1000
+heavy = sorted({name.split('.')[0] for name in sys.modules} & set(json.loads(sys.argv[1])))
+print(json.dumps({"elapsed_ms": elapsed_ms, "heavy": heavy}))
+"""
+
+
+def _import_chain(module):
+    """
+    Find the import chain that pulled in a heavy package, using -X importtime
+
+    importtime lists a module after everything it imported, indented by depth,
+    so the first line for the package is followed by its importers.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1]
+            entries.append(((len(name) - len(name.lstrip())) // 2, name.strip()))
+
+    for index, (depth, name) in enumerate(entries):
+        if name.split(".")[0] != module:
+            continue
+        chain = [name]
+        for parent_depth, parent in entries[index + 1:]:
+            if parent_depth < depth:
+                chain.append(parent)
+                depth = parent_depth
+        return " <- ".join(chain)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail if the web app imports heavy plotting/data libraries"
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Optional budget for the time taken to import app.py",
+    )
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        print("❌ Importing app.py failed")
+        return 1
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    print(f"📦 app.py imported in {report['elapsed_ms']:.0f} ms")
+
+    failed = False
+    for module in report["heavy"]:
+        failed = True
+        print(f"❌ Heavy module imported by the web app: {module}")
+        chain = _import_chain(module)
+        if chain:
+            print(f"   {chain}")
+
+    if args.max_ms is not None and report["elapsed_ms"] > args.max_ms:
+        failed = True
+        print(f"❌ Import time exceeds the {args.max_ms:.0f} ms budget")
+
+    if failed:
+        return 1
+    print("✅ Import budget OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
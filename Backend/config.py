@@ -28,30 +28,96 @@ class Config:
     ADMIN_NAME = os.environ.get("ADMIN_NAME")
 
     # Email configuration
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
+    # Point MAIL_SERVER/MAIL_PORT at a local SMTP stand-in (with MAIL_USE_TLS=false) to test bulk jobs
+    MAIL_SERVER = os.environ.get("MAIL_SERVER", 'smtp.gmail.com')
+    MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
+    MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "true").lower() == "true"
     MAIL_USE_SSL = False
     MAIL_USERNAME = os.environ.get("MAIL_USERNAME")  # Your Gmail address
     MAIL_PASSWORD = os.environ.get("MAIL_PASSWORD")  # App-specific password
     MAIL_DEFAULT_SENDER = os.environ.get("MAIL_DEFAULT_SENDER", "noreply@example.com")
     MAIL_DEBUG = True
+    # Daily reminders are queued in batches of this many users, one task each
+    REMINDER_BATCH_SIZE = 500
+    # Email outbox: send_email queues mail, the drain task sends batches over one connection,
+    # retrying failures after EMAIL_OUTBOX_RETRY_BASE * 2^(attempt-1) seconds
+    EMAIL_OUTBOX_BATCH_SIZE = 200
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+    EMAIL_OUTBOX_RETRY_BASE = 60
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = 300  # reclaim messages from a drain that died
+    # Messages per minute per recipient domain ('default' applies to unlisted domains)
+    EMAIL_RATE_LIMITS = {
+        'default': 120,
+        'gmail.com': 60,
+    }
 
     BACKEND_URL = "http://localhost:5000"
     CELERY_BROKER_URL = 'redis://localhost:6379/0'
     RESULT_BACKEND = "redis://localhost:6379/0"
     CELERY_TIMEZONE = "UTC"
     BEAT_SCHEDULE = {}
+    # Scheduled jobs hold a Redis lease lock while running (released early on completion)
+    # and record each processed period in job_runs; a run older than the lease is presumed dead
+    SCHEDULED_JOB_LEASE = 1800
+    # 'celery' publishes jobs to Redis for separate workers; 'local' runs them on a
+    # worker thread pool inside this process (no broker needed: single node, tests)
+    JOB_BACKEND = os.environ.get("JOB_BACKEND") or 'celery'
+    JOB_LOCAL_CONCURRENCY = int(os.environ.get("JOB_LOCAL_CONCURRENCY") or 4)
+    # Also run the beat schedule in-process (enable in one process per deployment only)
+    JOB_LOCAL_BEAT = os.environ.get("JOB_LOCAL_BEAT", "").lower() in ("1", "true", "yes")
 
     # Celery schedule
 
     EXPORT_FOLDER = os.environ.get("EXPORT_FOLDER") or './exports'
+    # Compression applied while exports are written: 'gzip', 'zstd' or 'none'
+    EXPORT_COMPRESSION = os.environ.get("EXPORT_COMPRESSION") or 'gzip'
+    # Internal location the front proxy maps to EXPORT_FOLDER (e.g. '/protected-exports/').
+    # When set, downloads are handed off to the proxy instead of streamed by the worker.
+    EXPORT_ACCEL_REDIRECT_PREFIX = os.environ.get("EXPORT_ACCEL_REDIRECT_PREFIX")
+    EXPORT_ACCEL_REDIRECT_HEADER = os.environ.get("EXPORT_ACCEL_REDIRECT_HEADER") or 'X-Accel-Redirect'
+    # Identical exports (same user, filters and data version) reuse the finished file
+    # for this long; a running export's claim expires after EXPORT_CLAIM_TTL
+    EXPORT_REUSE_TTL = 6 * 24 * 3600  # stays below the 7 day file retention
+    EXPORT_CLAIM_TTL = 3600
+    # Live event streams (SSE): idle interval after which a keepalive is sent and
+    # the state re-checked, and how long an export progress stream stays open
+    EVENT_STREAM_RESYNC = 15
+    EXPORT_STREAM_TIMEOUT = 300
+    # Lot availability stream: reconnecting clients get a fresh snapshot
+    AVAILABILITY_STREAM_TIMEOUT = 600
+    # Delta sync: deletions are kept this long (older tokens get a full sync), and
+    # each sync re-reads this many seconds before the token to catch late commits
+    SYNC_TOMBSTONE_RETENTION_DAYS = 30
+    SYNC_CLOCK_OVERLAP_SECONDS = 5
+    # Hot/cold split: completed and cancelled reservations finished this many days
+    # ago move to reservations_archive, RESERVATION_ARCHIVE_BATCH_SIZE per transaction
+    RESERVATION_ARCHIVE_AFTER_DAYS = int(os.environ.get("RESERVATION_ARCHIVE_AFTER_DAYS", 365))
+    RESERVATION_ARCHIVE_BATCH_SIZE = 1000
+    # Online backups: pages per backup API step, pause between steps (seconds), and
+    # commits allowed to restart a stepped copy before it finishes in one step
+    BACKUP_PAGES_PER_STEP = 256
+    BACKUP_STEP_PAUSE = 0.005
+    BACKUP_MAX_RESTARTS = 3
+    # Export store: files expire after EXPORT_TTL_DAYS; least recently used files are
+    # evicted when a new export would push its owner or the folder over quota
+    EXPORT_TTL_DAYS = 7
+    EXPORT_USER_QUOTA_BYTES = 50 * 1024 * 1024  # 50 MB per user
+    EXPORT_GLOBAL_QUOTA_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB total
 
     # Matplotlib configuration
     MATPLOTLIB_BACKEND = "Agg"
 
     REPORT_INCLUDE_CHART = True
+    # 'png' renders charts with matplotlib; 'svg' emits compact inline SVG without it
+    REPORT_CHART_BACKEND = os.environ.get("REPORT_CHART_BACKEND") or 'png'
     MAX_RESERVATIONS_PER_REPORT = 50
+    # Monthly reports are rendered in chunks of REPORT_CHUNK_SIZE users, fanned out as
+    # a Celery chord ('celery') or over a local spawned process pool ('local', for runs
+    # without report workers; pool size defaults to the CPU count). Prefork worker
+    # children cannot start a pool and render 'local' reports one chunk at a time.
+    REPORT_EXECUTOR = os.environ.get("REPORT_EXECUTOR") or 'celery'
+    REPORT_CHUNK_SIZE = 100
+    REPORT_LOCAL_WORKERS = None
 
     # Redis Caching Configuration
     REDIS_CACHE_URL = 'redis://localhost:6379/1'  # Different DB than Celery
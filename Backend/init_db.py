@@ -11,10 +11,13 @@ from config import Config, DevelopmentConfig
 from models import db, init_db
 from models.db_utils import (
     create_database,
+    backup_database,
+    restore_database,
     reset_database,
     get_database_stats,
     create_sample_data,
 )
+from models.migrations import run_migrations, migration_status
 
 
 def create_app():
@@ -36,6 +39,22 @@ def main():
         "--no-sample", action="store_true", help="Skip creating sample data"
     )
     parser.add_argument("--stats", action="store_true", help="Show database statistics")
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Apply pending schema migrations to the existing database and exit",
+    )
+    parser.add_argument(
+        "--backup", metavar="PATH", help="Take an online, verified backup to PATH and exit"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --backup, store only the pages changed since the last backup to PATH",
+    )
+    parser.add_argument(
+        "--restore", metavar="PATH", help="Validate the backup at PATH and restore it"
+    )
 
     args = parser.parse_args()
 
@@ -61,6 +80,29 @@ def main():
         print("========================\n")
         return
 
+    if args.backup or args.restore:
+        db.init_app(app)
+        if args.backup:
+            ok = backup_database(app, args.backup, incremental=args.incremental)
+        else:
+            ok = restore_database(app, args.restore)
+        if not ok:
+            sys.exit(1)
+        return
+
+    if args.migrate:
+        # Upgrade the schema in place, keeping all data
+        db.init_app(app)
+        with app.app_context():
+            applied = run_migrations()
+            print("\n=== Schema Migrations ===")
+            for migration in migration_status():
+                state = migration["applied_at"] or "pending"
+                print(f"{migration['version']:>4}  {migration['name']:<30} {state}")
+            print("========================\n")
+        print(f"Applied {len(applied)} migration(s)")
+        return
+
     if args.reset:
         # Reset database
         print("Resetting database...")
@@ -77,6 +119,7 @@ def main():
 
     if db_exists:
         print(f"Database already exists at: {db_path}")
+        print("Use --migrate to upgrade its schema in place.")
         response = input("Do you want to recreate it? (y/N): ").lower()
         if response != "y":
             print("Database initialization cancelled.")
@@ -87,7 +130,7 @@ def main():
     with app.app_context():
         # Initialize database
         db.init_app(app)
-        db.create_all()
+        run_migrations()
 
         # Create sample data if requested
         if not args.no_sample:
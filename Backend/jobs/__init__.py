@@ -1,9 +1,13 @@
-from celery import current_app as celery_app
+from celery import shared_task
 from flask import current_app
 from models.user import User
 from models.reservation import Reservation
 from utils.notification import send_email
 from utils.csv_generator import generate_parking_csv
+from utils.export_store import cleanup_expired_exports, cleanup_stale_partials, index_untracked_exports
+from utils.delta_sync import purge_tombstones
+from utils.reservation_archive import archive_reservations
+from models import db
 import os
 import csv
 from datetime import datetime, timedelta
@@ -122,7 +126,7 @@ from datetime import datetime, timedelta
 #         self.update_state(state='FAILURE', meta={'error': str(e)})
 #         raise
 
-@celery_app.task
+@shared_task
 def create_user_notification(user_id, title, message, action_url=None):
     """Create in-app notification for user"""
     try:
@@ -132,22 +136,52 @@ def create_user_notification(user_id, title, message, action_url=None):
     except Exception as e:
         current_app.logger.error(f"Failed to create notification for user {user_id}: {str(e)}")
 
-@celery_app.task
-def cleanup_old_csv_files():
-    """Cleanup old CSV export files (run weekly)"""
+@shared_task
+def cleanup_old_csv_files(reconcile=False):
+    """
+    Cleanup expired CSV export files (scheduled hourly)
+
+    Expired files are found through the export_files expiry index, so the
+    cost is proportional to the number of expired files, not the folder size.
+    Partial exports abandoned for longer than EXPORT_CLAIM_TTL are deleted too.
+    Pass reconcile=True once to index files written before the export store.
+    """
     try:
-        export_folder = current_app.config['EXPORT_FOLDER']
-        cutoff_date = datetime.now() - timedelta(days=7)  # Delete files older than 7 days
-        
-        for filename in os.listdir(export_folder):
-            filepath = os.path.join(export_folder, filename)
-            if os.path.isfile(filepath):
-                file_modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-                if file_modified < cutoff_date:
-                    os.remove(filepath)
-                    current_app.logger.info(f"Deleted old export file: {filename}")
-        
-        return "CSV cleanup completed"
+        if reconcile:
+            indexed = index_untracked_exports()
+            current_app.logger.info(f"Indexed {indexed} untracked export files")
+
+        deleted = cleanup_expired_exports()
+        current_app.logger.info(f"Deleted {deleted} expired export files")
+        partials = cleanup_stale_partials()
+        current_app.logger.info(f"Deleted {partials} abandoned partial export files")
+
+        return f"CSV cleanup completed: {deleted} files and {partials} partial files deleted"
     except Exception as e:
         current_app.logger.error(f"CSV cleanup failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+@shared_task
+def purge_sync_tombstones():
+    """Delete delta sync tombstones past their retention (scheduled daily)"""
+    try:
+        purged = purge_tombstones()
+        db.session.commit()
+        current_app.logger.info(f"Purged {purged} sync tombstones")
+        return f"Sync tombstone purge completed: {purged} deleted"
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Sync tombstone purge failed: {str(e)}")
+        raise
+
+@shared_task
+def archive_old_reservations():
+    """Move finished reservations past RESERVATION_ARCHIVE_AFTER_DAYS to the archive (scheduled daily)"""
+    try:
+        archived = archive_reservations()
+        current_app.logger.info(f"Archived {archived} reservations")
+        return f"Reservation archival completed: {archived} archived"
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Reservation archival failed: {str(e)}")
+        raise
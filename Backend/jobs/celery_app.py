@@ -1,42 +1,161 @@
+import time
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import before_task_publish
 from flask import Flask
-from jobs import user_jobs
+from kombu import Queue
+from jobs import user_jobs, email_jobs
+from jobs.local_runner import LOCAL_BROKER_URL, LOCAL_RESULT_BACKEND, LocalCelery
+from utils.queue_stats import record_queue_wait
 import os
 
+# One queue per workload class so bulk work never sits in front of exports users
+# are waiting on. Priority uses the Redis transport scale (0 = highest) and orders
+# queues for workers consuming several; limits are (soft, hard) seconds. Worker
+# concurrency and prefetch are set on the command line of each queue's worker
+# (see README).
+WORKLOAD_QUEUES = {
+    'exports': {'priority': 0, 'time_limits': (1500, 1800)},
+    'email': {'priority': 3, 'time_limits': (120, 180)},
+    'reports': {'priority': 6, 'time_limits': (600, 900)},
+    'maintenance': {'priority': 9, 'time_limits': (600, 900)},
+}
+
+TASK_QUEUE_ROUTES = {
+    'jobs.user_jobs.export_user_parking_csv': 'exports',
+    'jobs.email_jobs.drain_email_outbox': 'email',
+    'jobs.user_jobs.generate_monthly_report': 'reports',
+    'jobs.user_jobs.render_monthly_report_chunk': 'reports',
+    'jobs.user_jobs.collect_monthly_report_results': 'reports',
+    'jobs.user_jobs.send_daily_reminders': 'reports',
+    'jobs.user_jobs.send_reminder_batch': 'reports',
+    'jobs.user_jobs.collect_reminder_results': 'reports',
+    'jobs.user_jobs.fail_scheduled_job_run': 'reports',
+    'jobs.cleanup_old_csv_files': 'maintenance',
+    'jobs.purge_sync_tombstones': 'maintenance',
+    'jobs.archive_old_reservations': 'maintenance',
+    'jobs.create_user_notification': 'maintenance',
+}
+
+# Redis transport priority levels, checked in this order
+PRIORITY_STEPS = list(range(10))
+
+
+@before_task_publish.connect
+def _stamp_enqueue_time(headers=None, **kwargs):
+    """Record when a task was queued so workers can measure its queue wait"""
+    if headers is not None:
+        headers.setdefault('enqueued_at', time.time())
+
+
+def celery_settings(app):
+    """
+    Celery settings under Celery's own (new-style) names
+
+    Celery ignores Flask config keys it does not know (BEAT_SCHEDULE was
+    never applied that way) and refuses to mix old- and new-style names, so
+    the Flask config is translated here instead of copied over.
+    """
+    return {
+        'timezone': app.config.get('CELERY_TIMEZONE', 'UTC'),
+        'beat_schedule': app.config.get('BEAT_SCHEDULE', {}),
+        'task_queues': [Queue(name, routing_key=name) for name in WORKLOAD_QUEUES],
+        'task_default_queue': 'maintenance',
+        'task_routes': {
+            task: {'queue': queue, 'routing_key': queue, 'priority': WORKLOAD_QUEUES[queue]['priority']}
+            for task, queue in TASK_QUEUE_ROUTES.items()
+        },
+        'task_annotations': {
+            task: {
+                'soft_time_limit': WORKLOAD_QUEUES[queue]['time_limits'][0],
+                'time_limit': WORKLOAD_QUEUES[queue]['time_limits'][1],
+            }
+            for task, queue in TASK_QUEUE_ROUTES.items()
+        },
+        'broker_transport_options': {
+            'priority_steps': PRIORITY_STEPS,
+            'sep': ':',
+            'queue_order_strategy': 'priority',
+        },
+        # Long tasks: take one message at a time unless a worker overrides it
+        'worker_prefetch_multiplier': 1,
+        'task_compression': 'gzip',
+        'result_compression': 'gzip',
+    }
+
+
 def make_celery(app):
     """Factory function to create Celery instance with Flask app context"""
-    celery = Celery(
-        app.import_name,
-        backend=app.config['RESULT_BACKEND'],
-        broker=app.config['CELERY_BROKER_URL'],
-    )
+    if app.config.get('JOB_BACKEND') == 'local':
+        celery = LocalCelery(
+            app.import_name,
+            backend=app.config['RESULT_BACKEND'],
+            broker=app.config['CELERY_BROKER_URL'],
+            concurrency=app.config.get('JOB_LOCAL_CONCURRENCY', 4),
+            queues=list(WORKLOAD_QUEUES),
+            beat=app.config.get('JOB_LOCAL_BEAT', False),
+        )
+    else:
+        celery = Celery(
+            app.import_name,
+            backend=app.config['RESULT_BACKEND'],
+            broker=app.config['CELERY_BROKER_URL'],
+        )
     
-    celery.conf.update(app.config)
+    celery.conf.update(celery_settings(app))
     
     class ContextTask(celery.Task):
         """Make celery tasks work with Flask app context"""
         def __call__(self, *args, **kwargs):
             with app.app_context():
+                record_queue_wait(self.request)
                 return self.run(*args, **kwargs)
     
     celery.Task = ContextTask
+    # Tasks are shared and resolve through current_app, in every thread
+    celery.set_default()
+    if isinstance(celery, LocalCelery) and celery.local_beat:
+        # Scheduled jobs publish nothing until beat runs, so start both with the app
+        celery.start_local_worker()
     return celery
 
 # Celery configuration
 def configure_celery(app):
-    app.config['CELERY_BROKER_URL'] = 'redis://localhost:6379/0'
-    app.config['RESULT_BACKEND'] = 'redis://localhost:6379/0'
+    if app.config.get('JOB_BACKEND') == 'local':
+        app.config['CELERY_BROKER_URL'] = LOCAL_BROKER_URL
+        app.config['RESULT_BACKEND'] = LOCAL_RESULT_BACKEND
+    else:
+        app.config['CELERY_BROKER_URL'] = 'redis://localhost:6379/0'
+        app.config['RESULT_BACKEND'] = 'redis://localhost:6379/0'
     app.config['CELERY_TIMEZONE'] = 'UTC'
     
     # Beat schedule for periodic tasks
     app.config['BEAT_SCHEDULE'] = {
+        # Missed ticks expire instead of piling up behind a busy or stopped worker
         'daily-reminders': {
             'task': 'jobs.user_jobs.send_daily_reminders',
-            'schedule': crontab(minute='*/2'),  # 6 PM daily
+            'schedule': crontab(hour=18, minute=0),  # 6 PM daily
+            'options': {'expires': 6 * 3600},
         },
         'monthly-report': {
             'task': 'jobs.user_jobs.generate_monthly_report',
-            'schedule': crontab(minute='*/2'),  # 1st of month at 9 AM
+            'schedule': crontab(day_of_month=1, hour=9, minute=0),  # 1st of month at 9 AM
+            'options': {'expires': 24 * 3600},
+        },
+        'export-cleanup': {
+            'task': 'jobs.cleanup_old_csv_files',
+            'schedule': crontab(minute=0),  # hourly, cheap index query
+        },
+        'sync-tombstone-purge': {
+            'task': 'jobs.purge_sync_tombstones',
+            'schedule': crontab(hour=3, minute=30),  # daily
+        },
+        'reservation-archival': {
+            'task': 'jobs.archive_old_reservations',
+            'schedule': crontab(hour=4, minute=0),  # daily, after the tombstone purge
+        },
+        'email-outbox-drain': {
+            'task': 'jobs.email_jobs.drain_email_outbox',
+            'schedule': 30.0,  # every 30 seconds; enqueues also start a drain
         },
     }
\ No newline at end of file
@@ -0,0 +1,71 @@
+from celery import shared_task
+from flask import current_app
+from models import db
+from utils.notification import send_bulk_email
+from utils.email_outbox import (
+    ProviderRateLimiter,
+    claim_outbox_batch,
+    defer,
+    mark_failed,
+    mark_sent,
+)
+
+
+@shared_task
+def drain_email_outbox():
+    """
+    Deliver queued emails from the outbox
+
+    Claims up to EMAIL_OUTBOX_BATCH_SIZE due messages, holds back those over
+    their provider's rate limit until the next window, sends the rest over
+    one SMTP connection and schedules failures for retry with backoff. Runs on
+    the beat schedule and whenever mail is queued; a full batch queues
+    another run right away.
+    """
+    batch_size = current_app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 200)
+    entries = claim_outbox_batch(batch_size)
+    if not entries:
+        return "Email outbox empty"
+
+    limiter = ProviderRateLimiter(
+        current_app.config.get('EMAIL_RATE_LIMITS'),
+        current_app.extensions.get('cache'),
+    )
+    sendable = []
+    deferred = 0
+    for entry in entries:
+        if limiter.allow(entry.provider):
+            sendable.append(entry)
+        else:
+            defer(entry, limiter.next_window())
+            deferred += 1
+
+    messages = [
+        {
+            'entry': entry,
+            'subject': entry.subject,
+            'recipients': entry.recipients,
+            'text_body': entry.text_body,
+            'html_body': entry.html_body,
+        }
+        for entry in sendable
+    ]
+    try:
+        sent, failed = send_bulk_email(messages)
+    except Exception as e:
+        # Could not connect at all: every message in the batch is retried
+        current_app.logger.error(f"Email outbox drain could not connect: {str(e)}")
+        sent, failed = [], [(message, str(e)) for message in messages]
+
+    mark_sent([message['entry'] for message in sent])
+    for message, error in failed:
+        mark_failed(message['entry'], error)
+    db.session.commit()
+
+    if len(entries) == batch_size and sent:
+        drain_email_outbox.delay()
+
+    current_app.logger.info(
+        f"Email outbox drain: {len(sent)} sent, {len(failed)} failed, {deferred} rate limited"
+    )
+    return {'sent': len(sent), 'failed': len(failed), 'deferred': deferred}
@@ -0,0 +1,99 @@
+"""
+In-process job runner for single-node deployments and performance runs
+With JOB_BACKEND = 'local' tasks are published to an in-memory broker and run
+by a Celery worker on a thread pool inside the Flask process, so exports,
+reports and mail work without Redis while keeping real task ids, states,
+progress updates, routing and chords
+"""
+
+import atexit
+import logging
+import threading
+from celery import Celery
+from celery._state import _set_task_join_will_block
+from celery.beat import EmbeddedService
+from celery.utils.nodenames import anon_nodename
+from celery.worker import WorkController
+
+logger = logging.getLogger(__name__)
+
+LOCAL_BROKER_URL = 'memory://'
+# Process-wide in-memory store, shared by the web threads and the worker threads
+LOCAL_RESULT_BACKEND = 'cache+memory://'
+
+
+class _LocalWorkController(WorkController):
+    """Worker that signals once it consumes from its queues"""
+
+    def __init__(self, *args, **kwargs):
+        self.ready = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def on_consumer_ready(self, consumer):
+        self.ready.set()
+
+
+class LocalCelery(Celery):
+    """
+    Celery app that runs its own worker (and optionally beat) in-process
+
+    The worker starts with the first published task; everything that
+    publishes (send_task, delay, apply_async, groups, chords) goes through
+    send_task. Queued tasks live in memory and are lost when the process
+    exits, and each process runs its own worker.
+    """
+
+    def __init__(self, *args, concurrency=4, queues=None, beat=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.local_concurrency = concurrency
+        self.local_queues = queues
+        self.local_beat = beat
+        self._local_worker = None
+        self._local_beat = None
+        self._local_lock = threading.Lock()
+
+    def send_task(self, *args, **kwargs):
+        self.start_local_worker()
+        return super().send_task(*args, **kwargs)
+
+    def start_local_worker(self):
+        """Start the worker thread (and beat thread, if enabled) once"""
+        if self._local_worker is not None:
+            return
+        with self._local_lock:
+            if self._local_worker is not None:
+                return
+            self.finalize()
+            worker = _LocalWorkController(
+                app=self,
+                hostname=anon_nodename(hostname='local'),
+                pool='threads',
+                concurrency=self.local_concurrency,
+                queues=self.local_queues,
+                without_heartbeat=True,
+                without_mingle=True,
+                without_gossip=True,
+            )
+            threading.Thread(target=worker.start, name='local-celery-worker', daemon=True).start()
+            if self.local_beat:
+                self._local_beat = EmbeddedService(self, thread=True)
+                self._local_beat.start()
+            self._local_worker = worker
+            atexit.register(self.stop_local_worker)
+            logger.info(
+                f"Started in-process job worker ({self.local_concurrency} threads"
+                f"{', with beat' if self.local_beat else ''})"
+            )
+        worker.ready.wait(10)
+        # The worker flags the process as a worker, which forbids waiting on
+        # results; this process also runs the web app and tests, which may wait
+        _set_task_join_will_block(False)
+
+    def stop_local_worker(self):
+        """Stop beat and let running tasks finish; queued tasks are dropped"""
+        if self._local_beat is not None:
+            self._local_beat.stop()
+            self._local_beat = None
+        if self._local_worker is not None:
+            self._local_worker.stop(in_sighandler=False)
+            self._local_worker = None
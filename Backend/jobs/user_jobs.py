@@ -1,179 +1,484 @@
-from celery import current_app as celery_app
+from celery import chord, shared_task
+from celery.exceptions import Ignore
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy.exc import OperationalError
 from models.user import User
 from models.parking_lot import ParkingLot
+from models import db
 from models.reservation import Reservation
-from utils.csv_generator import generate_parking_csv
+from models.export_watermark import ExportWatermark
+from utils.csv_generator import (
+    generate_parking_csv,
+    generate_parking_delta_csv,
+    export_checkpoint_path,
+    discard_export_checkpoint,
+)
+from utils.export_registry import remember_export, forget_export, export_cancel_requested, publish_export_event
 from utils.notification import send_email
-from utils.report_generator import generate_monthly_html_report
+from utils.email_outbox import enqueue_emails
+from utils.report_generator import stream_monthly_html_report, render_monthly_reports
+from utils.job_guard import Dispatched, Failed, finish_job_run, run_scheduled_job
+from utils.report_data import month_window, monthly_report_user_ids, iter_monthly_user_aggregates
 
 import logging
+import multiprocessing
+import os
 
-@celery_app.task
-def send_daily_reminders():
+def _reminder_message(username, new_lot_names):
+    """Build the reminder text for an inactive user, or for new lots if new_lot_names is set"""
+    if new_lot_names:
+        return f"Hi {username}! 🆕 New parking lots available: {', '.join(new_lot_names)}. Book your spot now!"
+    return f"Hi {username}! 🚗 Haven't seen you in a while. Check out available parking spots and book if needed!"
+
+
+def _iter_reminder_recipients(inactive_since, include_active):
+    """
+    Stream (email, username, inactive) for active users due a reminder
+
+    Each user's last activity comes from one grouped max(created_at) query
+    over reservations instead of a query per user.
+    """
+    last_activity = (
+        db.session.query(
+            Reservation.user_id.label('user_id'),
+            db.func.max(Reservation.created_at).label('last_created_at'),
+        )
+        .group_by(Reservation.user_id)
+        .subquery()
+    )
+    inactive = db.or_(
+        last_activity.c.last_created_at.is_(None),
+        last_activity.c.last_created_at < inactive_since,
+    )
+    query = (
+        db.session.query(User.email, User.username, inactive)
+        .outerjoin(last_activity, last_activity.c.user_id == User.id)
+        .filter(User.role == 'user', User.is_active.is_(True))
+    )
+    if not include_active:
+        query = query.filter(inactive)
+    return query.order_by(User.id).yield_per(current_app.config.get('REMINDER_BATCH_SIZE', 500))
+
+
+@shared_task
+def send_daily_reminders(force=False):
     """
     Daily job to send reminders to users who haven't visited
     or when new parking lots are created
+
+    Recipients are computed with one grouped query and fanned out as a chord
+    of send_reminder_batch tasks of REMINDER_BATCH_SIZE users each, which
+    queue the mails for the outbox drain task; the day's run is completed by
+    the chord callback once every batch is queued. Runs at most once per (UTC)
+    day and never overlaps another run; force=True runs an already processed
+    day again.
     """
     try:
         current_app.logger.info("Starting daily reminders job")
-        
-        # Get all active users
-        users = User.query.filter_by(role='user', is_active=True).all()
-        
-        # Check for users who haven't made reservations in last 3 days
-        three_days_ago = datetime.utcnow() - timedelta(days=3)
-        
-        for user in users:
-            last_reservation = Reservation.query.filter_by(user_id=user.id)\
-                .order_by(Reservation.created_at.desc()).first()
-            
-            should_send_reminder = False
-            message = ""
-            
-            # Check if user hasn't visited recently
-            if not last_reservation or last_reservation.created_at < three_days_ago:
-                should_send_reminder = True
-                message = f"Hi {user.username}! 🚗 Haven't seen you in a while. Check out available parking spots and book if needed!"
-            
-            # Check for new parking lots created in last 24 hours
-            yesterday = datetime.utcnow() - timedelta(days=1)
-            new_lots = ParkingLot.query.filter(ParkingLot.created_at >= yesterday).all()
-            
-            if new_lots and not should_send_reminder:
-                should_send_reminder = True
-                lot_names = [lot.prime_location_name for lot in new_lots]
-                message = f"Hi {user.username}! 🆕 New parking lots available: {', '.join(lot_names)}. Book your spot now!"
-            
-            if should_send_reminder:
-                try:
-                    send_email(
-                        subject="Parking Reminder 🚗",
-                        recipients=[user.email],
-                        text_body=message,
-                        html_body=f"<p>{message}</p>"
-                    )
-                    current_app.logger.info(f"Reminder sent to {user.email}")
-                except Exception as e:
-                    current_app.logger.error(f"Error sending reminder to {user.email}: {str(e)}")
-        
-        current_app.logger.info(f"Daily reminders sent to {len(users)} users")
-        return f"Reminders processed for {len(users)} users"
+        today = datetime.utcnow().date().isoformat()
+        return run_scheduled_job(
+            'send_daily_reminders', today,
+            lambda run: _queue_daily_reminders(today, run.attempts),
+            force=force,
+        )
         
     except Exception as e:
         current_app.logger.error(f"Error in daily reminders: {str(e)}")
         raise
 
 
-@celery_app.task
-def generate_monthly_report():
+def _queue_daily_reminders(day, attempt):
+    """Fan the day's reminder recipients out to a chord of send_reminder_batch tasks"""
+    # Users who haven't made reservations in last 3 days get a "haven't seen you" reminder
+    three_days_ago = datetime.utcnow() - timedelta(days=3)
+    
+    # Everyone else is only reminded about parking lots created in last 24 hours
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    new_lot_names = [
+        name for (name,) in db.session.query(ParkingLot.prime_location_name)
+        .filter(ParkingLot.created_at >= yesterday)
+        .order_by(ParkingLot.id)
+    ]
+    
+    batch_size = current_app.config.get('REMINDER_BATCH_SIZE', 500)
+    batches, batch, recipients = [], [], 0
+    for email, username, inactive in _iter_reminder_recipients(three_days_ago, bool(new_lot_names)):
+        batch.append([email, username, bool(inactive)])
+        if len(batch) >= batch_size:
+            batches.append(batch)
+            recipients += len(batch)
+            batch = []
+    if batch:
+        batches.append(batch)
+        recipients += len(batch)
+    
+    if not batches:
+        return "No users due a reminder"
+    
+    chord(
+        send_reminder_batch.s(batch, new_lot_names) for batch in batches
+    )(
+        collect_reminder_results.s(day, attempt).on_error(
+            fail_scheduled_job_run.s('send_daily_reminders', day, attempt)
+        )
+    )
+    
+    current_app.logger.info(f"Daily reminders queued for {recipients} users in {len(batches)} batches")
+    return Dispatched(f"Reminders queued for {recipients} users in {len(batches)} batches")
+
+
+@shared_task
+def send_reminder_batch(recipients, new_lot_names):
     """
-    Generate and send monthly activity reports to all users
+    Queue one batch of daily reminders in the email outbox with a single commit
+
+    Args:
+        recipients (list): [email, username, inactive] per user
+        new_lot_names (list): Names of lots created in the last 24 hours
+
+    Returns:
+        dict: queued count (reminders already queued today are skipped)
     """
-    try:
-        current_app.logger.info("Starting monthly report generation")
-        
-        # Get all users
-        users = User.query.filter_by(role='user', is_active=True).all()
-        
-        # Get date range for last month
-        today = datetime.now()
-        first_day_last_month = datetime(today.year, today.month - 1, 1)
-        last_day_last_month = datetime(today.year, today.month, 1) - timedelta(days=1)
-        
-        reports_sent = 0
-        
-        for user in users:
+    today = datetime.utcnow().date().isoformat()
+    messages = []
+    for email, username, inactive in recipients:
+        message = _reminder_message(username, None if inactive else new_lot_names)
+        messages.append({
+            'subject': "Parking Reminder 🚗",
+            'recipients': [email],
+            'text_body': message,
+            'html_body': f"<p>{message}</p>",
+            'dedupe_key': f"daily-reminder:{email}:{today}",
+        })
+    
+    queued = enqueue_emails(messages)
+    current_app.logger.info(f"Reminder batch queued: {queued}/{len(recipients)}")
+    return {'queued': queued}
+
+
+@shared_task
+def collect_reminder_results(batch_results, day, attempt):
+    """Chord callback: complete the day's reminder run once every batch is queued"""
+    queued = sum(result['queued'] for result in batch_results)
+    summary = f"Reminders queued for {queued} users in {len(batch_results)} batches"
+    finish_job_run('send_daily_reminders', day, attempt, result=summary)
+    return summary
+
+
+@shared_task
+def fail_scheduled_job_run(request, exc, traceback, job_name, period, attempt):
+    """Chord error callback: mark the dispatched run failed so the period can be rerun"""
+    current_app.logger.error(f"{job_name} for {period} failed: {exc}")
+    finish_job_run(job_name, period, attempt, error=str(exc) or exc.__class__.__name__)
+
+
+def _chunked(items, size):
+    """Split a list into consecutive chunks of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _send_monthly_report(user, html_report, month_year):
+    """Queue one rendered monthly report (once per user and month)"""
+    send_email(
+        subject=f"Monthly Parking Report - {month_year}",
+        recipients=[user['email']],
+        text_body=f"Your monthly parking report for {month_year} is ready.",
+        html_body=html_report,
+        dedupe_key=f"monthly-report:{user['id']}:{month_year}"
+    )
+    current_app.logger.info(f"Monthly report queued for {user['email']}")
+
+
+def _summarize_monthly_reports(chunk_results, month_year):
+    """Fold per-chunk results into one summary and log failures"""
+    users = sum(result['users'] for result in chunk_results)
+    sent = sum(result['sent'] for result in chunk_results)
+    failed = [failure for result in chunk_results for failure in result['failed']]
+
+    for failure in failed:
+        current_app.logger.error(
+            f"Error generating report for user {failure['user_id']}: {failure['error']}"
+        )
+    current_app.logger.info(
+        f"Monthly reports for {month_year}: {sent}/{users} sent in "
+        f"{len(chunk_results)} chunks, {len(failed)} failed"
+    )
+    return f"Monthly reports sent to {sent}/{users} users ({len(failed)} failed)"
+
+
+def _local_report_pool(workers):
+    """
+    Process pool for local report rendering, or None to render in this process
+
+    Pool processes are spawned rather than forked, so they do not inherit the
+    Flask app, the SQLAlchemy engine or its pooled connections. A prefork
+    Celery worker child is a daemonic process and may not start processes at
+    all, so there reports are rendered in the worker child itself (run
+    REPORT_EXECUTOR = 'local' under the threads or solo pool, or the
+    in-process job backend, to render in parallel).
+    """
+    if multiprocessing.current_process().daemon:
+        current_app.logger.warning(
+            "Rendering monthly reports in-process: daemonic worker processes cannot start a pool"
+        )
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _render_reports_locally(start_dt, end_dt, month_year, chunks):
+    """
+    Render report chunks on a local process pool and send them from this process
+
+    Aggregates are built here (the pool has no database session) and at most
+    two chunks per worker are in flight at a time.
+
+    Returns:
+        list: Chunk results in the shape returned by render_monthly_report_chunk
+    """
+    workers = current_app.config.get('REPORT_LOCAL_WORKERS') or os.cpu_count() or 1
+    chart_backend = current_app.config.get('REPORT_CHART_BACKEND', 'png')
+    results = []
+
+    def collect(batch, render):
+        result = {'users': len(batch), 'sent': 0, 'failed': []}
+        try:
+            reports = render()
+        except Exception as chunk_error:
+            result['failed'] = [
+                {'user_id': aggregates['user']['id'], 'error': str(chunk_error)}
+                for aggregates in batch
+            ]
+            results.append(result)
+            return
+
+        for aggregates, html_report in zip(batch, reports):
             try:
-                # DIRECT FUNCTION CALL instead of .delay()
-                start_dt = datetime(2025, 7, 1)
-                end_dt = datetime(2025, 8, 1)
-                
-                # Get user's reservations for the month
-                reservations = Reservation.query.filter(
-                    Reservation.user_id == user.id,
-                    Reservation.parking_timestamp >= start_dt,
-                    Reservation.parking_timestamp <= end_dt
-                ).all()
-                
-                if not reservations:
-                    current_app.logger.info(f"No activity for user {user.username} in the specified period")
-                    continue
-                
-                # Calculate statistics
-                total_bookings = len(reservations)
-                total_cost = sum(r.parking_cost for r in reservations if r.parking_cost)
-                
-                # Most used parking lot
-                lot_usage = {}
-                for reservation in reservations:
-                    lot_name = reservation.parking_spot.parking_lot.prime_location_name
-                    lot_usage[lot_name] = lot_usage.get(lot_name, 0) + 1
-                
-                most_used_lot = max(lot_usage.items(), key=lambda x: x[1]) if lot_usage else None
-                
-                # Generate HTML report
-                report_data = {
-                    'user': user,
-                    'month_year': start_dt.strftime('%B %Y'),
-                    'total_bookings': total_bookings,
-                    'total_cost': total_cost,
-                    'most_used_lot': most_used_lot,
-                    'lot_usage': lot_usage,
-                    'reservations': reservations
-                }
-                
-                html_report = generate_monthly_html_report(report_data)
-                
-                # Send email with HTML report
-                send_email(
-                    subject=f"Monthly Parking Report - {start_dt.strftime('%B %Y')}",
-                    recipients=[user.email],
-                    text_body=f"Your monthly parking report for {start_dt.strftime('%B %Y')} is ready.",
-                    html_body=html_report
+                _send_monthly_report(aggregates['user'], html_report, month_year)
+                result['sent'] += 1
+            except Exception as user_error:
+                result['failed'].append(
+                    {'user_id': aggregates['user']['id'], 'error': str(user_error)}
                 )
-                
-                reports_sent += 1
-                current_app.logger.info(f"Monthly report sent to {user.email}")
-                
+        results.append(result)
+
+    pool = _local_report_pool(workers)
+    if pool is None:
+        for user_ids in chunks:
+            batch = list(iter_monthly_user_aggregates(start_dt, end_dt, user_ids))
+            collect(batch, lambda: render_monthly_reports(batch, month_year, chart_backend))
+        return results
+
+    with pool:
+        pending = {}
+        for user_ids in chunks:
+            batch = list(iter_monthly_user_aggregates(start_dt, end_dt, user_ids))
+            pending[pool.submit(render_monthly_reports, batch, month_year, chart_backend)] = batch
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(pending.pop(future), future.result)
+        for future in as_completed(list(pending)):
+            collect(pending.pop(future), future.result)
+
+    return results
+
+
+@shared_task
+def render_monthly_report_chunk(user_ids, month):
+    """
+    Render and send the monthly reports for one chunk of users
+
+    Per-user failures are returned rather than raised, so the chord callback
+    always runs and sees every chunk's outcome.
+
+    Args:
+        user_ids (list): Users in this chunk
+        month (str): 'YYYY-MM' to report on
+
+    Returns:
+        dict: users, sent and failed ([{user_id, error}]) for the chunk
+    """
+    start_dt, end_dt = month_window(month)
+    month_year = start_dt.strftime('%B %Y')
+    result = {'users': len(user_ids), 'sent': 0, 'failed': []}
+    handled = set()
+
+    try:
+        for aggregates in iter_monthly_user_aggregates(start_dt, end_dt, user_ids):
+            user = aggregates['user']
+            handled.add(user['id'])
+            try:
+                html_report = stream_monthly_html_report({**aggregates, 'month_year': month_year})
+                _send_monthly_report(user, html_report, month_year)
+                result['sent'] += 1
             except Exception as user_error:
-                current_app.logger.error(f"Error generating report for user {user.username}: {str(user_error)}")
-                # Continue with other users even if one fails
+                result['failed'].append({'user_id': user['id'], 'error': str(user_error)})
+    except Exception as chunk_error:
+        current_app.logger.error(f"Error in monthly report chunk: {str(chunk_error)}")
+        result['failed'].extend(
+            {'user_id': user_id, 'error': str(chunk_error)}
+            for user_id in user_ids if user_id not in handled
+        )
+
+    return result
+
+
+@shared_task
+def collect_monthly_report_results(chunk_results, month, attempt=None):
+    """
+    Chord callback: aggregate the outcome of all report chunks and finish the
+    month's run, failed if any user's report failed (a rerun without force
+    then retries them; reports already queued are deduplicated)
+    """
+    start_dt, _ = month_window(month)
+    summary = _summarize_monthly_reports(chunk_results, start_dt.strftime('%B %Y'))
+    if attempt is not None:
+        failed = sum(len(result['failed']) for result in chunk_results)
+        finish_job_run(
+            'generate_monthly_report', month, attempt,
+            result=summary, error=summary if failed else None,
+        )
+    return summary
+
+
+@shared_task
+def generate_monthly_report(month=None, force=False):
+    """
+    Generate and send monthly activity reports to all users
+
+    Users with activity in the month are split into chunks of REPORT_CHUNK_SIZE
+    which are rendered in parallel, either as a Celery chord of
+    render_monthly_report_chunk tasks or on a local process pool
+    (REPORT_EXECUTOR = 'local'). Each month is reported once and runs never
+    overlap; force=True reports an already processed month again.
+
+    Args:
+        month (str): 'YYYY-MM' to report on, defaults to the previous month
+        force (bool): Run even if the month was already reported
+    """
+    try:
+        current_app.logger.info("Starting monthly report generation")
         
-        return f"Monthly reports sent to {reports_sent}/{len(users)} users"
+        start_dt, end_dt = month_window(month)
+        return run_scheduled_job(
+            'generate_monthly_report',
+            start_dt.strftime('%Y-%m'),
+            lambda run: _dispatch_monthly_reports(start_dt, end_dt, run.attempts),
+            force=force,
+        )
         
     except Exception as e:
         current_app.logger.error(f"Error in monthly report generation: {str(e)}")
         raise
 
 
+def _dispatch_monthly_reports(start_dt, end_dt, attempt):
+    """Split the month's active users into chunks and render their reports"""
+    month = start_dt.strftime('%Y-%m')
+    month_year = start_dt.strftime('%B %Y')
+    
+    user_ids = monthly_report_user_ids(start_dt, end_dt)
+    if not user_ids:
+        return f"No user activity in {month_year}, no reports sent"
+    
+    chunks = _chunked(user_ids, current_app.config.get('REPORT_CHUNK_SIZE', 100))
+    
+    if current_app.config.get('REPORT_EXECUTOR', 'celery') == 'local':
+        results = _render_reports_locally(start_dt, end_dt, month_year, chunks)
+        summary = _summarize_monthly_reports(results, month_year)
+        # Like the chord callback: a month with failed reports is retried
+        if any(result['failed'] for result in results):
+            return Failed(summary)
+        return summary
+    
+    chord(
+        render_monthly_report_chunk.s(chunk, month) for chunk in chunks
+    )(
+        collect_monthly_report_results.s(month, attempt).on_error(
+            fail_scheduled_job_run.s('generate_monthly_report', month, attempt)
+        )
+    )
+    
+    return Dispatched(f"Monthly reports for {len(user_ids)} users dispatched in {len(chunks)} chunks")
+
+
+class ExportCancelled(Exception):
+    """Raised at a chunk boundary when the user asked to cancel the export"""
+
+
 # Update the export_user_parking_csv function
-@celery_app.task(bind=True)
-def export_user_parking_csv(self, user_id, email):
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=3, default_retry_delay=30)
+def export_user_parking_csv(self, user_id, email, incremental=False, consumer='default', export_key=None):
     """
-    Export user's complete parking history as CSV
+    Export user's parking history as CSV
     This is a user-triggered async job
+
+    With incremental=True only reservations created, changed or deleted since
+    the consumer's last export are written, and the consumer's watermark is
+    advanced once the delta file is complete.
+
+    export_key is the content address under which the finished file is
+    registered for reuse by identical requests.
+
+    Progress is reported in records after every chunk. Each completed chunk is
+    checkpointed under the task id, so a retried or redelivered task resumes
+    where it left off, and a cancel request takes effect at the next chunk.
     """
+    task_id = self.request.id
+    checkpoint_path = export_checkpoint_path(task_id)
+
+    def report(state, meta):
+        # Stored for status lookups and pushed to streaming clients
+        self.update_state(state=state, meta=meta)
+        publish_export_event(task_id, state, meta)
+
+    def on_progress(rows_written, total_rows):
+        if export_cancel_requested(task_id):
+            raise ExportCancelled()
+        report('PROGRESS', {
+            'current': rows_written,
+            'total': total_rows,
+            'percent': int(rows_written * 100 / total_rows) if total_rows else 100,
+            'status': f'Exported {rows_written}/{total_rows} records',
+        })
+
     try:
         # Update task state
-        self.update_state(state='PROGRESS', meta={'current': 0, 'total': 100, 'status': 'Starting export...'})
+        report('PROGRESS', {'current': 0, 'total': 0, 'percent': 0, 'status': 'Starting export...'})
         
         user = User.query.get(user_id)
         if not user:
             raise Exception(f"User {user_id} not found")
         
-        # Update progress
-        self.update_state(state='PROGRESS', meta={'current': 30, 'total': 100, 'status': 'Generating CSV...'})
-        
         # Generate CSV using utility function
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"parking_history_{user.username}_{timestamp}.csv"
+        records_count = None
+        watermark = None
         
-        filepath = generate_parking_csv(user_id, output_format='file', filename=filename)
-        
-        # Update progress
-        self.update_state(state='PROGRESS', meta={'current': 80, 'total': 100, 'status': 'Sending notification...'})
+        if incremental:
+            watermark = ExportWatermark.get_or_create(user.id, consumer)
+            filename = f"parking_history_delta_{user.username}_{timestamp}.csv"
+            delta = generate_parking_delta_csv(
+                user.id, since=watermark.position(), filename=filename,
+                checkpoint_path=checkpoint_path, on_progress=on_progress,
+                exported=watermark.recently_exported(), tombstone_id=watermark.last_tombstone_id,
+            )
+            filepath = delta['filepath']
+            records_count = delta['records_count']
+            watermark.advance(
+                delta['watermark'], filename=os.path.basename(filepath),
+                tombstone_id=delta['tombstone_id'], recent=delta['recent'],
+            )
+            db.session.commit()
+        else:
+            filename = f"parking_history_{user.username}_{timestamp}.csv"
+            filepath = generate_parking_csv(
+                user_id, output_format='file', filename=filename,
+                checkpoint_path=checkpoint_path, on_progress=on_progress,
+            )
+        filename = os.path.basename(filepath)
         
         download_url = f"{current_app.config['BACKEND_URL']}/api/user/download-csv/{filename}"
         
@@ -181,7 +486,7 @@ def export_user_parking_csv(self, user_id, email):
         send_email(
             subject="Parking History Export Ready 📊",
             recipients=[email],
-            text_body=f"Your parking history export is ready for download.",
+            text_body=f"Your parking history {'changes export' if incremental else 'export'} is ready for download.",
             html_body=f"""
             <h2>Your Parking History Export is Ready!</h2>
             <p>Hello {user.username},</p>
@@ -192,15 +497,40 @@ def export_user_parking_csv(self, user_id, email):
             """
         )
         
-        self.update_state(state='SUCCESS', meta={'current': 100, 'total': 100, 'status': 'Export completed successfully'})
+        remember_export(export_key, task_id, filename, download_url)
         
-        return {
+        result = {
             'status': 'completed',
             'filename': filename,
             'download_url': download_url
         }
+        if incremental:
+            result['records_count'] = records_count
+            result['watermark'] = watermark.to_dict()
+        publish_export_event(task_id, 'SUCCESS', {'result': result})
+        return result
         
+    except ExportCancelled:
+        current_app.logger.info(f"CSV export {task_id} cancelled for user {user_id}")
+        discard_export_checkpoint(checkpoint_path)
+        forget_export(export_key)
+        report('REVOKED', {'status': 'Export cancelled'})
+        raise Ignore()
+    except OperationalError as e:
+        # Transient database failure: keep the checkpoint and resume on retry
+        db.session.rollback()
+        if self.request.retries < self.max_retries:
+            current_app.logger.warning(f"CSV export {task_id} interrupted, retrying: {str(e)}")
+            raise self.retry(exc=e)
+        current_app.logger.error(f"CSV export failed for user {user_id}: {str(e)}")
+        discard_export_checkpoint(checkpoint_path)
+        forget_export(export_key)
+        publish_export_event(task_id, 'FAILURE', {'error': str(e)})
+        raise
     except Exception as e:
         current_app.logger.error(f"CSV export failed for user {user_id}: {str(e)}")
+        discard_export_checkpoint(checkpoint_path)
+        forget_export(export_key)
         self.update_state(state='FAILURE', meta={'error': str(e)})
+        publish_export_event(task_id, 'FAILURE', {'error': str(e)})
         raise
@@ -9,13 +9,35 @@ from .user import User
 from .parking_lot import ParkingLot
 from .parking_spot import ParkingSpot
 from .reservation import Reservation
+from .export_watermark import ExportWatermark
+from .export_file import ExportFile
+from .email_outbox import EmailOutbox
+from .job_run import JobRun
+from .sync_tombstone import SyncTombstone
+from .schema_migration import SchemaMigration
+from .reservation_archive import ReservationArchive
 
 # Export all models for easy import
-__all__ = ["db", "User", "ParkingLot", "ParkingSpot", "Reservation"]
+__all__ = [
+    "db",
+    "User",
+    "ParkingLot",
+    "ParkingSpot",
+    "Reservation",
+    "ExportWatermark",
+    "ExportFile",
+    "EmailOutbox",
+    "JobRun",
+    "SyncTombstone",
+    "SchemaMigration",
+    "ReservationArchive",
+]
 
 
 def init_db(app):
-    """Initialize database with the Flask app"""
+    """Initialize database with the Flask app and apply pending migrations"""
+    from .migrations import run_migrations
+
     db.init_app(app)
     with app.app_context():
-        db.create_all()
+        run_migrations()
@@ -2,23 +2,43 @@
 Database utility functions for the Vehicle Parking App
 """
 
+import glob
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import struct
+import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from werkzeug.security import generate_password_hash
 from . import db
 from .user import User
 from .parking_lot import ParkingLot
 from .parking_spot import ParkingSpot
 from .reservation import Reservation
+from .migrations import run_migrations
+
+# Online backups: pages copied per backup API step, the pause between steps, and
+# how often writes may restart a stepped copy before the rest is copied in one step
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE = 0.005
+BACKUP_MAX_RESTARTS = 3
+
+# Incremental backups: page digest manifest and changed-page delta files
+MANIFEST_MAGIC = b"PKPAGES1"
+MANIFEST_HEADER = struct.Struct(">8sIII")
+DELTA_MAGIC = b"PKDELTA1"
+DELTA_HEADER = struct.Struct(">8sII")
+PAGE_NUMBER = struct.Struct(">I")
 
 
 def create_database(app):
-    """Create database tables and initialize with default data"""
+    """Create or upgrade database tables and initialize with default data"""
     with app.app_context():
-        # Drop all tables if they exist (for development)
-        db.drop_all()
-
-        # Create all tables
-        db.create_all()
+        # Apply pending schema migrations; existing data is kept
+        run_migrations()
 
         # Create sample data (optional, for testing)
         create_sample_data()
@@ -230,7 +250,7 @@ def reset_database(app):
     """Reset database (drop and recreate)"""
     with app.app_context():
         db.drop_all()
-        db.create_all()
+        run_migrations()
         print("Database reset successfully!")
 
 
@@ -258,29 +278,273 @@ def get_database_stats(app):
         return stats
 
 
-def backup_database(app, backup_path):
-    """Create a backup of the database"""
-    import shutil
-    import os
+def _sqlite_path():
+    """Filesystem path of the app's SQLite database (inside an app context)"""
+    url = db.engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise ValueError("Backups require a file-based SQLite database")
+    return url.database
+
+
+def _read_only_uri(path):
+    return Path(path).resolve().as_uri() + "?mode=ro"
+
+
+class _BackupStarved(Exception):
+    """Writes keep restarting a stepped backup"""
+
+
+def _online_copy(source_path, target_path, pages, pause, max_restarts):
+    """Copy a live database through the SQLite backup API, a few pages per step"""
+    last = {"remaining": None, "restarts": 0}
+
+    def progress(status, remaining, total):
+        # A commit by another connection restarts the copy from the first page
+        if last["remaining"] is not None and remaining >= last["remaining"]:
+            last["restarts"] += 1
+            if last["restarts"] > max_restarts:
+                raise _BackupStarved()
+        last["remaining"] = remaining
+        # The source is unlocked between steps, so writers get in
+        if remaining and pause:
+            time.sleep(pause)
+
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _BackupStarved:
+            # Too busy to finish in steps: copy everything in one (short) lock
+            source.backup(target, pages=-1)
+    finally:
+        target.close()
+        source.close()
+
+
+def _check_database(path, full=False):
+    """Run quick_check (integrity_check if full) on a database file"""
+    try:
+        conn = sqlite3.connect(_read_only_uri(path), uri=True)
+        try:
+            pragma = "PRAGMA integrity_check" if full else "PRAGMA quick_check"
+            return conn.execute(pragma).fetchall() == [("ok",)]
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+
+
+def _page_size(path):
+    """Page size from a database file header"""
+    with open(path, "rb") as fh:
+        fh.seek(16)
+        size = struct.unpack(">H", fh.read(2))[0]
+    return 65536 if size == 1 else size
+
+
+def _iter_pages(path, page_size):
+    with open(path, "rb") as fh:
+        while True:
+            page = fh.read(page_size)
+            if not page:
+                return
+            yield page
+
 
+def _page_digest(page):
+    return hashlib.blake2b(page, digest_size=8).digest()
+
+
+def _delta_paths(backup_path):
+    """Incremental deltas of a backup, in the order they apply"""
+    return sorted(glob.glob(glob.escape(backup_path) + ".*.delta"))
+
+
+def _manifest_path(backup_path):
+    return backup_path + ".pages"
+
+
+def _read_manifest(backup_path):
+    """Page size, digests and delta count the backup chain reflects, or None"""
+    try:
+        with open(_manifest_path(backup_path), "rb") as fh:
+            magic, page_size, page_count, delta_count = MANIFEST_HEADER.unpack(
+                fh.read(MANIFEST_HEADER.size)
+            )
+            digests = fh.read()
+    except (OSError, struct.error):
+        return None
+    if magic != MANIFEST_MAGIC or len(digests) != page_count * 8:
+        return None
+    return {
+        "page_size": page_size,
+        "digests": [digests[i:i + 8] for i in range(0, len(digests), 8)],
+        "delta_count": delta_count,
+    }
+
+
+def _write_manifest(backup_path, page_size, digests, delta_count):
+    tmp_path = _manifest_path(backup_path) + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(MANIFEST_HEADER.pack(MANIFEST_MAGIC, page_size, len(digests), delta_count))
+        fh.write(b"".join(digests))
+    os.replace(tmp_path, _manifest_path(backup_path))
+
+
+def _write_delta(snapshot_path, backup_path, manifest):
+    """
+    Store the pages of a snapshot that differ from the backup chain
+
+    Returns:
+        str: Path of the new delta file, or None if the chain cannot be
+            extended (missing or stale manifest, page size changed)
+    """
+    page_size = _page_size(snapshot_path)
+    deltas = _delta_paths(backup_path)
+    if not manifest or manifest["page_size"] != page_size or manifest["delta_count"] != len(deltas):
+        return None
+
+    old_digests = manifest["digests"]
+    digests = []
+    delta_path = f"{backup_path}.{len(deltas) + 1:04d}.delta"
+    with gzip.open(delta_path + ".tmp", "wb") as out:
+        page_count = os.path.getsize(snapshot_path) // page_size
+        out.write(DELTA_HEADER.pack(DELTA_MAGIC, page_size, page_count))
+        for number, page in enumerate(_iter_pages(snapshot_path, page_size)):
+            digest = _page_digest(page)
+            digests.append(digest)
+            if number >= len(old_digests) or old_digests[number] != digest:
+                out.write(PAGE_NUMBER.pack(number))
+                out.write(page)
+    os.replace(delta_path + ".tmp", delta_path)
+    _write_manifest(backup_path, page_size, digests, len(deltas) + 1)
+    return delta_path
+
+
+def _apply_delta(database_path, delta_path):
+    """Apply one incremental delta to a copy of its base"""
+    with gzip.open(delta_path, "rb") as delta, open(database_path, "r+b") as fh:
+        magic, page_size, page_count = DELTA_HEADER.unpack(delta.read(DELTA_HEADER.size))
+        if magic != DELTA_MAGIC:
+            raise ValueError(f"{delta_path} is not a backup delta")
+        fh.truncate(page_count * page_size)
+        while True:
+            number = delta.read(PAGE_NUMBER.size)
+            if not number:
+                break
+            (number,) = PAGE_NUMBER.unpack(number)
+            page = delta.read(page_size)
+            if len(page) != page_size or number >= page_count:
+                raise ValueError(f"{delta_path} is truncated or corrupt")
+            fh.seek(number * page_size)
+            fh.write(page)
+
+
+def backup_database(app, backup_path, incremental=False, verify=True):
+    """
+    Create a consistent backup of the live database
+
+    Pages are copied through SQLite's online backup API in steps of
+    BACKUP_PAGES_PER_STEP, pausing BACKUP_STEP_PAUSE seconds between steps so
+    writers are only blocked briefly (if commits keep restarting the copy,
+    the rest is copied in one step), into a temporary file that is checked
+    (PRAGMA quick_check) and then atomically renamed into place.
+
+    With incremental=True and an existing chain, only the pages that changed
+    since the last run are stored, in a compressed delta file next to the
+    base backup (backup_path.NNNN.delta); the first incremental run writes a
+    full base. A full (non-incremental) backup starts a new chain.
+
+    Args:
+        app: Flask app
+        backup_path (str): Base backup file
+        incremental (bool): Store only changed pages when possible
+        verify (bool): Check the copy before keeping it
+
+    Returns:
+        bool: True if a backup was written
+    """
     with app.app_context():
-        db_path = app.config["SQLALCHEMY_DATABASE_URI"].replace("sqlite:///", "")
-        if os.path.exists(db_path):
-            shutil.copy2(db_path, backup_path)
-            print(f"Database backed up to {backup_path}")
-            return True
-        return False
+        db_path = _sqlite_path()
+        if not os.path.exists(db_path):
+            return False
+
+        snapshot_path = backup_path + ".tmp"
+        _online_copy(
+            db_path,
+            snapshot_path,
+            app.config.get("BACKUP_PAGES_PER_STEP", BACKUP_PAGES_PER_STEP),
+            app.config.get("BACKUP_STEP_PAUSE", BACKUP_STEP_PAUSE),
+            app.config.get("BACKUP_MAX_RESTARTS", BACKUP_MAX_RESTARTS),
+        )
+        if verify and not _check_database(snapshot_path):
+            os.remove(snapshot_path)
+            print("Backup copy failed verification, nothing was written")
+            return False
+
+        if incremental and os.path.exists(backup_path):
+            delta_path = _write_delta(snapshot_path, backup_path, _read_manifest(backup_path))
+            if delta_path:
+                os.remove(snapshot_path)
+                print(f"Incremental database backup written to {delta_path}")
+                return True
+
+        # New base: drop the old chain first, so a crash never pairs it with this base
+        for stale in [_manifest_path(backup_path)] + _delta_paths(backup_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+        page_size = _page_size(snapshot_path)
+        digests = [_page_digest(page) for page in _iter_pages(snapshot_path, page_size)] if incremental else None
+        os.replace(snapshot_path, backup_path)
+        if incremental:
+            _write_manifest(backup_path, page_size, digests, 0)
+        print(f"Database backed up to {backup_path}")
+        return True
 
 
 def restore_database(app, backup_path):
-    """Restore database from backup"""
-    import shutil
-    import os
+    """
+    Restore database from a backup (and its incremental deltas, if any)
 
+    The backup is rebuilt in a temporary file and must pass PRAGMA
+    integrity_check; it is then copied into the live database in a single
+    backup step, so other connections see either the old or the restored
+    database, never a mix. Pooled connections are disposed afterwards.
+
+    Returns:
+        bool: True if the database was restored
+    """
     with app.app_context():
-        db_path = app.config["SQLALCHEMY_DATABASE_URI"].replace("sqlite:///", "")
-        if os.path.exists(backup_path):
-            shutil.copy2(backup_path, db_path)
-            print(f"Database restored from {backup_path}")
-            return True
-        return False
+        if not os.path.exists(backup_path):
+            return False
+        db_path = _sqlite_path()
+
+        candidate = db_path + ".restore"
+        shutil.copyfile(backup_path, candidate)
+        try:
+            try:
+                for delta_path in _delta_paths(backup_path):
+                    _apply_delta(candidate, delta_path)
+            except (OSError, EOFError, ValueError, struct.error) as e:
+                print(f"Backup delta {delta_path} is unreadable ({e}), database left unchanged")
+                return False
+            if not _check_database(candidate, full=True):
+                print(f"Backup {backup_path} failed validation, database left unchanged")
+                return False
+
+            db.session.remove()
+            db.engine.dispose()
+            source = sqlite3.connect(_read_only_uri(candidate), uri=True)
+            target = sqlite3.connect(db_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            db.engine.dispose()
+        finally:
+            os.remove(candidate)
+
+        print(f"Database restored from {backup_path}")
+        return True
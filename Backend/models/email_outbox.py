@@ -0,0 +1,64 @@
+from datetime import datetime
+from . import db
+
+
+class EmailOutbox(db.Model):
+    """Outgoing email queued by send_email and delivered by the outbox drain task"""
+
+    __tablename__ = "email_outbox"
+
+    # Primary key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Identical messages (same key) are only queued once
+    dedupe_key = db.Column(db.String(64), unique=True, nullable=False)
+
+    # Message content (bodies are dropped once the message is sent)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.JSON, nullable=False)
+    text_body = db.Column(db.Text)
+    html_body = db.Column(db.Text)
+
+    # Recipient domain, used for per-provider rate limits
+    provider = db.Column(db.String(255), nullable=False, default="default")
+
+    # Delivery state
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Claim held by the drain task currently sending the message
+    claim_token = db.Column(db.String(36), index=True)
+    claimed_at = db.Column(db.DateTime)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    # Constraints
+    __table_args__ = (
+        db.CheckConstraint(
+            "status IN ('pending', 'sending', 'sent', 'failed')",
+            name="valid_outbox_status",
+        ),
+        # The drain task claims due messages in (status, next_attempt_at) order
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def to_dict(self):
+        """Convert outbox entry to dictionary for API responses"""
+        return {
+            "id": self.id,
+            "subject": self.subject,
+            "recipients": self.recipients,
+            "provider": self.provider,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "next_attempt_at": (
+                self.next_attempt_at.isoformat() if self.next_attempt_at else None
+            ),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+        }
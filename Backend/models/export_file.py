@@ -0,0 +1,53 @@
+from datetime import datetime
+from . import db
+
+
+class ExportFile(db.Model):
+    """Metadata index entry for a generated export file in EXPORT_FOLDER"""
+
+    __tablename__ = "export_files"
+
+    # Primary key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # File name inside EXPORT_FOLDER
+    filename = db.Column(db.String(255), unique=True, nullable=False)
+
+    # Owner of the export (NULL for admin/system exports)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
+
+    # Size on disk in bytes
+    size_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_accessed_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    # Constraints
+    __table_args__ = (
+        db.CheckConstraint("size_bytes >= 0", name="non_negative_size"),
+    )
+
+    def touch(self):
+        """Record an access for LRU eviction"""
+        self.last_accessed_at = datetime.utcnow()
+
+    def is_expired(self):
+        """Check if the export is past its expiry time"""
+        return datetime.utcnow() >= self.expires_at
+
+    def to_dict(self):
+        """Convert export file entry to dictionary for API responses"""
+        return {
+            "filename": self.filename,
+            "user_id": self.user_id,
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "last_accessed_at": (
+                self.last_accessed_at.isoformat() if self.last_accessed_at else None
+            ),
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
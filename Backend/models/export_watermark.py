@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+from . import db
+
+
+class ExportWatermark(db.Model):
+    """Position of the last reservation exported per user and export consumer"""
+
+    __tablename__ = "export_watermarks"
+
+    # Primary key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Owner of the exported history
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
+
+    # Name of the export consumer (e.g. 'default' for the UI, or an integration)
+    consumer = db.Column(db.String(50), nullable=False, default="default")
+
+    # (updated_at, id) of the last reservation included in an export
+    last_updated_at = db.Column(db.DateTime)
+    last_reservation_id = db.Column(db.Integer)
+
+    # Last sync tombstone reported, so deletions are exported once
+    last_tombstone_id = db.Column(db.Integer)
+
+    # JSON [[id, updated_at], ...] of rows exported within the clock overlap
+    # window behind the watermark, skipped when that window is read again
+    recent_rows = db.Column(db.Text)
+
+    # Last delta file produced for this consumer
+    last_filename = db.Column(db.String(255))
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "consumer", name="unique_watermark_per_consumer"),
+    )
+
+    @classmethod
+    def get_or_create(cls, user_id, consumer="default"):
+        """Get the watermark for a user and consumer, creating an empty one if needed"""
+        watermark = cls.query.filter_by(user_id=user_id, consumer=consumer).first()
+        if not watermark:
+            watermark = cls(user_id=user_id, consumer=consumer)
+            db.session.add(watermark)
+        return watermark
+
+    def position(self):
+        """Get the (updated_at, reservation_id) position, or None before the first export"""
+        if self.last_updated_at is None:
+            return None
+        return (self.last_updated_at, self.last_reservation_id or 0)
+
+    def recently_exported(self):
+        """Get the [id, updated_at] pairs already exported within the overlap window"""
+        return json.loads(self.recent_rows) if self.recent_rows else []
+
+    def advance(self, position, filename=None, tombstone_id=None, recent=None):
+        """
+        Move the watermark forward after an export
+
+        Args:
+            position (tuple): New (updated_at, reservation_id) position
+            filename (str): Delta file produced
+            tombstone_id (int): Last sync tombstone reported
+            recent (list): [id, updated_at] pairs exported within the overlap window
+        """
+        if position is not None:
+            self.last_updated_at, self.last_reservation_id = position
+        if filename:
+            self.last_filename = filename
+        if tombstone_id is not None:
+            self.last_tombstone_id = tombstone_id
+        if recent is not None:
+            self.recent_rows = json.dumps(recent)
+
+    def to_dict(self):
+        """Convert watermark to dictionary for API responses"""
+        return {
+            "user_id": self.user_id,
+            "consumer": self.consumer,
+            "last_updated_at": (
+                self.last_updated_at.isoformat() if self.last_updated_at else None
+            ),
+            "last_reservation_id": self.last_reservation_id,
+            "last_tombstone_id": self.last_tombstone_id,
+            "last_filename": self.last_filename,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
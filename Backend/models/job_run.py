@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from . import db
+
+
+class JobRun(db.Model):
+    """Idempotency record of a scheduled job for one period (e.g. a day or a month)"""
+
+    __tablename__ = "job_runs"
+
+    # Primary key
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Job name and the period it processes ('2025-07-01', '2025-07', ...)
+    job_name = db.Column(db.String(100), nullable=False)
+    period = db.Column(db.String(20), nullable=False)
+
+    # Run state
+    status = db.Column(db.String(20), nullable=False, default="running")
+    attempts = db.Column(db.Integer, nullable=False, default=1)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+
+    # Timestamps
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    # Constraints
+    __table_args__ = (
+        db.UniqueConstraint("job_name", "period", name="unique_job_period"),
+        db.CheckConstraint(
+            "status IN ('running', 'completed', 'failed')", name="valid_job_run_status"
+        ),
+    )
+
+    @classmethod
+    def claim(cls, job_name, period, lease_seconds, force=False):
+        """
+        Claim a job's period for processing
+
+        A period can be claimed if it has no record yet, its last run failed,
+        or a previous run is still marked running past its lease (the worker
+        died). Completed periods are only claimed again with force=True.
+
+        Returns:
+            JobRun: The claimed record (committed), or None if the period is
+                done or being processed
+        """
+        run = cls.query.filter_by(job_name=job_name, period=period).first()
+        if run is None:
+            run = cls(job_name=job_name, period=period)
+            db.session.add(run)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker created the record first
+                db.session.rollback()
+                return None
+            return run
+
+        # One conditional UPDATE: of two workers re-claiming the same record
+        # only the one whose statement still matches gets a row count of 1
+        now = datetime.utcnow()
+        claimable = db.or_(
+            cls.status == "failed",
+            db.and_(
+                cls.status == "running",
+                cls.started_at < now - timedelta(seconds=lease_seconds),
+            ),
+        )
+        if force:
+            claimable = db.or_(claimable, cls.status == "completed")
+        claimed = (
+            cls.query.filter(cls.id == run.id, cls.attempts == run.attempts, claimable)
+            .update(
+                {
+                    "status": "running",
+                    "attempts": cls.attempts + 1,
+                    "result": None,
+                    "error": None,
+                    "started_at": now,
+                    "finished_at": None,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.session.commit()
+        if claimed != 1:
+            return None
+        db.session.refresh(run)
+        return run
+
+    @classmethod
+    def finish_attempt(cls, job_name, period, attempt, result=None, error=None):
+        """
+        Record the outcome of one attempt if it is still running (caller commits)
+
+        Returns:
+            bool: True if the attempt was still running and is now finished
+        """
+        return cls.query.filter_by(
+            job_name=job_name, period=period, attempts=attempt, status="running"
+        ).update(
+            {
+                "status": "failed" if error else "completed",
+                "result": str(result) if result is not None else None,
+                "error": error,
+                "finished_at": datetime.utcnow(),
+            },
+            synchronize_session=False,
+        ) == 1
+
+    def finish(self, result=None, error=None):
+        """Record the outcome of the run (caller commits)"""
+        self.status = "failed" if error else "completed"
+        self.result = str(result) if result is not None else None
+        self.error = error
+        self.finished_at = datetime.utcnow()
+
+    def to_dict(self):
+        """Convert job run to dictionary for API responses"""
+        return {
+            "job_name": self.job_name,
+            "period": self.period,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
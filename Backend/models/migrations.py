@@ -0,0 +1,162 @@
+"""
+Versioned schema migrations for the Vehicle Parking App
+Each migration runs once per database, in version order, and is recorded in
+schema_migrations, so new tables and indexes reach a live database without
+dropping and recreating it. Steps are idempotent (they skip objects that
+already exist), so a migration interrupted half way is safe to run again.
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import inspect, select, text
+from . import db
+from .schema_migration import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+
+def _find_index(name):
+    for table in db.metadata.tables.values():
+        for index in table.indexes:
+            if index.name == name:
+                return index
+    raise LookupError(f"No index named {name} is defined on the models")
+
+
+def create_missing_tables(connection):
+    """Create the model tables that do not exist yet, with their indexes"""
+    db.metadata.create_all(bind=connection, checkfirst=True)
+
+
+def create_tables(*names):
+    """Build a migration step creating model tables (and their indexes) by name"""
+
+    def step(connection):
+        for name in names:
+            db.metadata.tables[name].create(bind=connection, checkfirst=True)
+
+    return step
+
+
+def create_indexes(*names):
+    """Build a migration step creating model indexes by name"""
+
+    def step(connection):
+        for name in names:
+            _find_index(name).create(bind=connection, checkfirst=True)
+
+    return step
+
+
+def add_columns(table_name, *names):
+    """Build a migration step adding model columns to an existing table"""
+
+    def step(connection):
+        existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+        table = db.metadata.tables[table_name]
+        for name in names:
+            if name in existing:
+                continue
+            column_type = table.c[name].type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+    return step
+
+
+def run_steps(*steps):
+    """Build a migration step running several steps in order"""
+
+    def step(connection):
+        for each in steps:
+            each(connection)
+
+    return step
+
+
+# (version, name, step); append new migrations, never renumber applied ones
+MIGRATIONS = [
+    (1, "baseline_tables", create_missing_tables),
+    (
+        2,
+        "export_and_sync_indexes",
+        create_indexes(
+            "ix_reservations_updated_at",
+            "ix_reservations_user_updated_at",
+            "ix_reservations_user_parking_ts",
+            "ix_parking_lots_updated_at",
+            "ix_parking_spots_updated_at",
+        ),
+    ),
+    (
+        3,
+        "hot_query_indexes",
+        create_indexes(
+            "ix_parking_spots_lot_status",
+            "ix_reservations_user_active",
+            "ix_reservations_active_spot",
+        ),
+    ),
+    (4, "reservations_archive", create_tables("reservations_archive")),
+    (
+        5,
+        "export_watermark_overlap",
+        run_steps(
+            add_columns("export_watermarks", "last_tombstone_id", "recent_rows"),
+            create_indexes("ix_reservations_archive_user_updated_at"),
+        ),
+    ),
+]
+
+
+def _applied_versions(connection):
+    SchemaMigration.__table__.create(bind=connection, checkfirst=True)
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+
+def run_migrations(target=None):
+    """
+    Apply pending migrations to the app's database (inside an app context)
+
+    Args:
+        target (int): Last version to apply, all pending ones if None
+
+    Returns:
+        list: Versions applied by this run
+    """
+    with db.engine.begin() as connection:
+        applied = _applied_versions(connection)
+
+    ran = []
+    for version, name, step in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied or (target is not None and version > target):
+            continue
+        with db.engine.begin() as connection:
+            step(connection)
+            connection.execute(
+                SchemaMigration.__table__.insert().values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                )
+            )
+        logger.info(f"Applied schema migration {version}: {name}")
+        ran.append(version)
+    return ran
+
+
+def migration_status():
+    """
+    Known migrations and whether they are applied
+
+    Returns:
+        list: {version, name, applied_at} per migration, applied_at None if pending
+    """
+    with db.engine.begin() as connection:
+        _applied_versions(connection)
+        applied = dict(
+            connection.execute(
+                select(SchemaMigration.version, SchemaMigration.applied_at)
+            ).all()
+        )
+    return [
+        {"version": version, "name": name, "applied_at": applied.get(version)}
+        for version, name, _ in sorted(MIGRATIONS, key=lambda m: m[0])
+    ]
@@ -32,7 +32,7 @@ class ParkingLot(db.Model):
         db.DateTime, nullable=False, default=datetime.now, index=True
     )
     updated_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
+        db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, index=True
     )
 
     # Relationships
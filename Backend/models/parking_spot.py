@@ -26,7 +26,7 @@ class ParkingSpot(db.Model):
         db.DateTime, nullable=False, default=datetime.utcnow, index=True
     )
     updated_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
     # Relationships
@@ -39,6 +39,8 @@ class ParkingSpot(db.Model):
         db.CheckConstraint("status IN ('A', 'O')", name="valid_status"),
         db.CheckConstraint("spot_number > 0", name="positive_spot_number"),
         db.UniqueConstraint("lot_id", "spot_number", name="unique_spot_per_lot"),
+        # Booking picks a free spot of a lot; availability counts spots by status
+        db.Index("ix_parking_spots_lot_status", "lot_id", "status"),
     )
 
     def is_available(self):
@@ -61,7 +63,14 @@ class ParkingSpot(db.Model):
 
     def get_current_reservation(self):
         """Get current active reservation for this spot"""
-        return next((r for r in self.reservations if r.is_active()), None)
+        from .reservation import Reservation
+
+        # Indexed lookup instead of loading the spot's whole history
+        return Reservation.query.filter(
+            Reservation.spot_id == self.id,
+            Reservation.status == "active",
+            Reservation.leaving_timestamp.is_(None),
+        ).first()
 
     def get_spot_identifier(self):
         """Get spot identifier string"""
@@ -75,8 +84,6 @@ class ParkingSpot(db.Model):
             "lot_id": self.lot_id,
             "spot_number": self.spot_number,
             "status": self.status,
-            "spot_type": self.spot_type,
-            "vehicle_type": self.vehicle_type,
             "spot_identifier": self.get_spot_identifier(),
             "is_available": self.is_available(),
             "is_occupied": self.is_occupied(),
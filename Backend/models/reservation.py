@@ -43,7 +43,11 @@ class Reservation(db.Model):
         db.DateTime, nullable=False, default=datetime.utcnow, index=True
     )
     updated_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        index=True,
     )
 
     # Constraints
@@ -57,6 +61,24 @@ class Reservation(db.Model):
             "leaving_timestamp IS NULL OR leaving_timestamp > parking_timestamp",
             name="valid_leaving_time",
         ),
+        # Incremental exports scan a user's changes in (updated_at, id) order
+        db.Index("ix_reservations_user_updated_at", "user_id", "updated_at", "id"),
+        # History, activity exports and reports read a user's date window
+        db.Index("ix_reservations_user_parking_ts", "user_id", "parking_timestamp"),
+        # Releasing a booking looks up the user's one active reservation
+        db.Index(
+            "ix_reservations_user_active",
+            "user_id",
+            sqlite_where=db.text("status = 'active'"),
+            postgresql_where=db.text("status = 'active'"),
+        ),
+        # Spot grids join each spot to its active reservation only
+        db.Index(
+            "ix_reservations_active_spot",
+            "spot_id",
+            sqlite_where=db.text("status = 'active'"),
+            postgresql_where=db.text("status = 'active'"),
+        ),
     )
 
     def is_active(self):
@@ -91,7 +113,6 @@ class Reservation(db.Model):
             self.leaving_timestamp = datetime.now()
             self.parking_cost = self.calculate_cost()
             self.status = "completed"
-            self.updated_at = datetime.now()
 
             # Mark parking spot as available
             self.parking_spot.mark_available()
@@ -103,7 +124,6 @@ class Reservation(db.Model):
         """Cancel the reservation"""
         if self.is_active():
             self.status = "cancelled"
-            self.updated_at = datetime.utcnow()
 
             # Mark parking spot as available
             self.parking_spot.mark_available()
@@ -0,0 +1,113 @@
+from datetime import datetime
+from . import db
+
+
+class ReservationArchive(db.Model):
+    """Completed or cancelled reservation moved out of the live reservations table"""
+
+    __tablename__ = "reservations_archive"
+
+    # Primary key, the id the reservation had in the live table
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    # Owner and spot (no foreign keys: archived history outlives deleted spots)
+    spot_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+
+    # Lot and spot details as they were when archived
+    lot_id = db.Column(db.Integer)
+    lot_name = db.Column(db.String(100))
+    lot_address = db.Column(db.Text)
+    spot_number = db.Column(db.Integer)
+
+    # Reservation timing
+    parking_timestamp = db.Column(db.DateTime, nullable=False)
+    leaving_timestamp = db.Column(db.DateTime)
+    expected_leaving_time = db.Column(db.DateTime)
+
+    # Cost and payment
+    parking_cost = db.Column(db.Numeric(10, 2), default=0.0)
+    hourly_rate = db.Column(db.Numeric(10, 2), nullable=False)
+
+    # Vehicle details
+    vehicle_number = db.Column(db.String(20))
+    vehicle_model = db.Column(db.String(50))
+    vehicle_color = db.Column(db.String(20))
+
+    # Final status: 'completed' or 'cancelled'
+    status = db.Column(db.String(20), nullable=False)
+    remarks = db.Column(db.Text)
+
+    # Archive partition: month of parking_timestamp ('2024-03')
+    archive_period = db.Column(db.String(7), nullable=False, index=True)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Constraints
+    __table_args__ = (
+        db.CheckConstraint(
+            "status IN ('completed', 'cancelled')", name="valid_archived_status"
+        ),
+        # History and exports read a user's archive in date order
+        db.Index("ix_reservations_archive_user_parking_ts", "user_id", "parking_timestamp"),
+        # Incremental exports read changes that were archived before being exported
+        db.Index("ix_reservations_archive_user_updated_at", "user_id", "updated_at", "id"),
+        # Monthly reports read a date window across users
+        db.Index("ix_reservations_archive_parking_ts", "parking_timestamp"),
+    )
+
+    def is_active(self):
+        """Archived reservations are never active"""
+        return False
+
+    def is_completed(self):
+        """Check if reservation is completed"""
+        return self.status == "completed" and self.leaving_timestamp is not None
+
+    def get_parking_duration_str(self):
+        """Get formatted parking duration string"""
+        if self.leaving_timestamp:
+            duration = self.leaving_timestamp - self.parking_timestamp
+            hours = int(duration.total_seconds() // 3600)
+            minutes = int((duration.total_seconds() % 3600) // 60)
+            return f"{hours}h {minutes}m"
+        return "N/A"
+
+    def to_dict(self):
+        """Convert to the same dictionary shape as Reservation.to_dict"""
+        return {
+            "id": self.id,
+            "spot_id": self.spot_id,
+            "user_id": self.user_id,
+            "parking_timestamp": (
+                self.parking_timestamp.isoformat() if self.parking_timestamp else None
+            ),
+            "leaving_timestamp": (
+                self.leaving_timestamp.isoformat() if self.leaving_timestamp else None
+            ),
+            "expected_leaving_time": (
+                self.expected_leaving_time.isoformat()
+                if self.expected_leaving_time
+                else None
+            ),
+            "parking_cost": float(self.parking_cost or 0),
+            "hourly_rate": float(self.hourly_rate),
+            "vehicle_number": self.vehicle_number,
+            "vehicle_model": self.vehicle_model,
+            "vehicle_color": self.vehicle_color,
+            "status": self.status,
+            "remarks": self.remarks,
+            "duration_str": self.get_parking_duration_str(),
+            "is_active": False,
+            "is_completed": self.is_completed(),
+            "is_overdue": False,
+            "spot_identifier": (
+                f"{self.lot_name}-{self.spot_number}" if self.lot_name else None
+            ),
+            "lot_name": self.lot_name,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -0,0 +1,15 @@
+from datetime import datetime
+from . import db
+
+
+class SchemaMigration(db.Model):
+    """Versioned schema change applied to this database (see models/migrations.py)"""
+
+    __tablename__ = "schema_migrations"
+
+    # Migration version, applied in increasing order
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+
+    # Timestamps
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
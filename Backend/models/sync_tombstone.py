@@ -0,0 +1,52 @@
+from datetime import datetime
+from sqlalchemy import event
+from . import db
+from .parking_lot import ParkingLot
+from .reservation import Reservation
+
+
+class SyncTombstone(db.Model):
+    """Record of a deleted parking lot or reservation, for delta sync clients"""
+
+    __tablename__ = "sync_tombstones"
+
+    # Primary key, also the sync position (ids only grow)
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Deleted row: 'parking_lot' or 'reservation' and its id
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+
+    # Owner of a deleted reservation (only the owner is told about it)
+    user_id = db.Column(db.Integer)
+
+    # Timestamps
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    # Constraints
+    __table_args__ = (
+        db.CheckConstraint(
+            "entity IN ('parking_lot', 'reservation')", name="valid_tombstone_entity"
+        ),
+    )
+
+
+def _record_deletion(entity, user_id=None):
+    """Build an after_delete listener that logs the deleted row in the same flush"""
+
+    def listener(mapper, connection, target):
+        connection.execute(
+            SyncTombstone.__table__.insert().values(
+                entity=entity,
+                entity_id=target.id,
+                user_id=user_id(target) if user_id else None,
+                deleted_at=datetime.utcnow(),
+            )
+        )
+
+    return listener
+
+
+# ORM deletes only (session.delete and cascades); bulk query.delete() bypasses them
+event.listen(ParkingLot, "after_delete", _record_deletion("parking_lot"))
+event.listen(Reservation, "after_delete", _record_deletion("reservation", lambda r: r.user_id))
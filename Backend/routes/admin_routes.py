@@ -2,7 +2,7 @@
 Admin routes for Vehicle Parking Management System
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, make_response
 from flask_jwt_extended import (
     JWTManager,
     jwt_required,
@@ -10,6 +10,7 @@ from flask_jwt_extended import (
     get_jwt,
 )
 from datetime import datetime, timedelta
+import base64
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from pydantic import ValidationError
 
@@ -27,6 +28,7 @@ from schemas.parking_lot import (
     ParkingLotSummary,
     ParkingLotDelete,
 )
+from schemas.parking_spot import ParkingSpotGridQuery
 from utils.error_handlers import (
     create_success_response,
     create_error_response,
@@ -34,6 +36,11 @@ from utils.error_handlers import (
 )
 from utils.validation_utils import validate_user_permissions
 from utils.cache_manager import cached_response, cached_query, cache_manager
+from utils.queue_stats import queue_stats
+from utils.lot_availability import publish_lot_availability
+from utils.occupancy import lot_occupancy
+from utils.spot_grid import spot_grid
+from jobs.celery_app import WORKLOAD_QUEUES
 
 
 
@@ -92,6 +99,7 @@ def create_pkl():
 
         new_parking_lot.create_parking_spots()
         db.session.commit()
+        publish_lot_availability([new_parking_lot.id])
 
         return create_success_response(
             "Parking lot created successfully", new_parking_lot.to_dict()
@@ -124,6 +132,7 @@ def update_pkl(lot_id):
         parking_lot.is_active = data.get("is_active", parking_lot.is_active)
 
         db.session.commit()
+        publish_lot_availability([lot_id])
         return create_success_response("Parking lot updated successfully", parking_lot.to_dict())
     except SQLAlchemyError as e:
         current_app.logger.error(f"Database error updating parking lot: {str(e)}")
@@ -145,6 +154,7 @@ def delete_pkl(lot_id):
         if parking_lot.is_empty():
             db.session.delete(parking_lot)
             db.session.commit()
+            publish_lot_availability(removed=[lot_id])
             return create_success_response("Parking lot deleted successfully", parking_lot.to_dict())
         else:
             return create_error_response("Parking lot is not empty", status_code=400)
@@ -172,6 +182,77 @@ def get_pkl(lot_id):
     except Exception as e:
         current_app.logger.error(f"Error retrieving parking lot: {str(e)}")
 
+@admin_bp.route("/api/admin/pkl/<int:lot_id>/occupancy", methods=["GET"])
+@jwt_required()
+def get_pkl_occupancy(lot_id):
+    """
+    Get a parking lot's occupancy as a packed bitset
+
+    Bit (n - 1) is spot n, most significant bit first, set when occupied.
+    Returned as JSON with base64 bits, or as raw bytes with
+    Accept: application/octet-stream (counts in X-Spot-Count/X-Occupied).
+    The ETag is the bitset version plus the representation ('-bin' or
+    '-json'), so unchanged lots answer 304 and one representation's
+    validator never revalidates the other.
+    """
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "admin":
+        return jsonify({"error": "Unauthorized access"}), 403
+    try:
+        parking_lot = ParkingLot.query.get_or_404(lot_id)
+        occupancy = lot_occupancy(parking_lot)
+
+        binary = request.accept_mimetypes.best_match(
+            ["application/json", "application/octet-stream"]
+        ) == "application/octet-stream"
+        if binary:
+            response = make_response(occupancy["bits"])
+            response.mimetype = "application/octet-stream"
+            response.headers["X-Spot-Count"] = str(occupancy["spot_count"])
+            response.headers["X-Occupied"] = str(occupancy["occupied"])
+        else:
+            response = make_response(create_success_response(
+                "Parking lot occupancy",
+                {
+                    "lot_id": lot_id,
+                    "spot_count": occupancy["spot_count"],
+                    "occupied": occupancy["occupied"],
+                    "available": occupancy["available"],
+                    "version": occupancy["version"],
+                    "encoding": "base64",
+                    "bits": base64.b64encode(occupancy["bits"]).decode(),
+                },
+            ))
+        response.headers["Vary"] = "Accept"
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.set_etag(f'{occupancy["version"]}-{"bin" if binary else "json"}')
+        return response.make_conditional(request)
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Database error retrieving parking lot occupancy: {str(e)}")
+        return create_error_response("Database error", status_code=500)
+
+@admin_bp.route("/api/admin/pkl/<int:lot_id>/spots", methods=["GET"])
+@jwt_required()
+def get_pkl_spots(lot_id):
+    """
+    Get a page of a parking lot's spot grid (after, limit query params)
+
+    Spots come in spot number order with their active reservation, if any;
+    pass next_after from the response as after to fetch the next page.
+    """
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "admin":
+        return jsonify({"error": "Unauthorized access"}), 403
+    query = validate_request_data(ParkingSpotGridQuery, request.args.to_dict())
+    try:
+        parking_lot = ParkingLot.query.get_or_404(lot_id)
+        return create_success_response(
+            "Parking lot spots", spot_grid(parking_lot, query.after, query.limit)
+        )
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Database error retrieving parking lot spots: {str(e)}")
+        return create_error_response("Database error", status_code=500)
+
 @admin_bp.route("/api/admin/pkl/list", methods=["GET"])
 @jwt_required()
 @cached_response("parking_lots", "parking_lots_cache", 600)
@@ -191,5 +272,18 @@ def get_all_pkl():
         return create_error_response("Internal server error", status_code=500)
 
 
-
-
+@admin_bp.route("/api/admin/queues", methods=["GET"])
+@jwt_required()
+def get_queue_stats():
+    """Get depth and wait times of the background job queues per workload class"""
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "admin":
+        return jsonify({"error": "Unauthorized access"}), 403
+    try:
+        stats = queue_stats(current_app.extensions["celery"], WORKLOAD_QUEUES)
+        for queue, settings in WORKLOAD_QUEUES.items():
+            stats[queue]["priority"] = settings["priority"]
+        return create_success_response("Queue statistics", stats)
+    except Exception as e:
+        current_app.logger.error(f"Error reading queue statistics: {str(e)}")
+        return create_error_response("Job queue broker unavailable", status_code=503)
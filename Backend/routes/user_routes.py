@@ -2,7 +2,7 @@
 User routes for Vehicle Parking Management System
 """
 
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, send_file, Response, stream_with_context
 from flask_jwt_extended import (
     JWTManager,
     jwt_required,
@@ -17,8 +17,9 @@ from pydantic import ValidationError
 from config import Config
 
 # Import models and utilities
-from models import db, User, ParkingLot, Reservation, ParkingSpot
+from models import db, User, ParkingLot, Reservation, ParkingSpot, ExportWatermark
 from schemas.user import UserResponse
+from schemas.reservation import ReservationFilter
 from schemas.parking_lot import (
     ParkingLotResponse,
     ParkingLotList,
@@ -31,8 +32,27 @@ from utils.error_handlers import (
 )
 from utils.validation_utils import validate_user_permissions
 from utils.cache_manager import cached_response, cached_query, cache_manager
-from celery.result import AsyncResult
+from utils.file_delivery import send_export_file
+from utils.csv_generator import iter_user_activity_csv
+from utils.export_store import touch_export
+from utils.export_registry import (
+    export_key,
+    find_or_claim_export,
+    user_data_version,
+    remember_export_owner,
+    export_owner,
+    request_export_cancel,
+    export_channel,
+    export_status,
+    FINAL_STATES,
+)
+from utils.event_bus import subscribe, sse_event, sse_comment
+from utils.lot_availability import AVAILABILITY_CHANNEL, lot_availability, publish_lot_availability
+from utils.delta_sync import InvalidSyncToken, sync_changes
+from utils.reservation_archive import user_reservations
+from werkzeug.utils import secure_filename
 import os
+import time
 
 
 user_bp = Blueprint("user", __name__)
@@ -101,6 +121,40 @@ def get_all_pkl():
         current_app.logger.error(f"Error retrieving parking lots: {str(e)}")
         return create_error_response("Internal server error", status_code=500)
     
+@user_bp.route("/api/user/pkl/availability/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_pkl_availability():
+    """
+    Stream parking lot availability as Server-Sent Events
+
+    Sends a 'snapshot' of all lots, then a 'delta' with the new counts of the
+    lots affected by each booking, release or admin edit. The token may be
+    passed as ?jwt=<access_token> since EventSource cannot set headers. The
+    stream ends after AVAILABILITY_STREAM_TIMEOUT and clients reconnect,
+    getting a fresh snapshot.
+    """
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "user":
+        return jsonify({"error": "Unauthorized access"}), 403
+    keepalive = current_app.config.get("EVENT_STREAM_RESYNC", 15)
+    timeout = current_app.config.get("AVAILABILITY_STREAM_TIMEOUT", 600)
+
+    def events():
+        with subscribe([AVAILABILITY_CHANNEL]) as subscription:
+            snapshot = lot_availability()
+            # Give the connection back to the pool for the life of the stream
+            db.session.close()
+            yield sse_event({"lots": snapshot}, event="snapshot")
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                event = subscription.get(keepalive)
+                yield sse_event(event, event="delta") if event is not None else sse_comment()
+
+    response = Response(stream_with_context(events()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 @user_bp.route("/api/user/pkl/book/<int:lot_id>", methods=["POST"])
 @jwt_required()
 def book_pkl(lot_id):
@@ -128,6 +182,7 @@ def book_pkl(lot_id):
         db.session.add(reservation)
         available_spot.mark_occupied()
         db.session.commit()
+        publish_lot_availability([lot_id])
 
         return create_success_response("Reservation created successfully", reservation.to_dict())
     except SQLAlchemyError as e:
@@ -152,6 +207,7 @@ def release_reservation():
             return create_error_response("No active reservation", status_code=400)
         reservation.complete_reservation()
         db.session.commit()
+        publish_lot_availability([reservation.parking_spot.lot_id])
         return create_success_response("Reservation completed successfully", reservation.to_dict())
     except SQLAlchemyError as e:
         current_app.logger.error(f"Database error completing reservation: {str(e)}")
@@ -171,7 +227,7 @@ def get_all_bookings():
     try:
         user_id = jwt_data.get("sub")
         print(user_id)
-        reservations = Reservation.query.filter_by(user_id=user_id).all()
+        reservations = user_reservations(user_id)
         return create_success_response("All bookings", [reservation.to_dict() for reservation in reservations])
     except SQLAlchemyError as e:
         current_app.logger.error(f"Database error retrieving bookings: {str(e)}")
@@ -180,6 +236,54 @@ def get_all_bookings():
         current_app.logger.error(f"Error retrieving bookings: {str(e)}")
         return create_error_response("Internal server error", status_code=500)
 
+@user_bp.route("/api/user/sync", methods=["GET"])
+@jwt_required()
+def sync_user_data():
+    """
+    Delta sync of parking lots and the user's bookings
+
+    Without ?since= returns everything (full=true), archived bookings
+    included. With the version token of the previous response returns only
+    lots and bookings created or changed since then, plus the ids of deleted
+    ones (archiving is not a deletion, so clients keep archived bookings).
+    """
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "user":
+        return jsonify({"error": "Unauthorized access"}), 403
+    try:
+        user_id = int(jwt_data.get("sub"))
+        changes = sync_changes(user_id, request.args.get("since") or None)
+        return create_success_response("Changes since last sync", changes)
+    except InvalidSyncToken as e:
+        return create_error_response(str(e), status_code=400)
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Database error syncing user data: {str(e)}")
+        return create_error_response("Database error", status_code=500)
+    except Exception as e:
+        current_app.logger.error(f"Error syncing user data: {str(e)}")
+        return create_error_response("Internal server error", status_code=500)
+
+@user_bp.route("/api/user/export-activity", methods=["GET"])
+@jwt_required()
+def export_activity_csv():
+    """Stream the user's activity in a date window as CSV (date_from, date_to, status query params)"""
+    jwt_data = get_jwt()
+    if jwt_data.get("role") != "user":
+        return jsonify({"error": "Unauthorized access"}), 403
+    filters = validate_request_data(ReservationFilter, request.args.to_dict())
+    try:
+        user_id = int(jwt_data.get("sub"))
+        rows = iter_user_activity_csv(user_id, filters.date_from, filters.date_to, filters.status)
+        response = Response(stream_with_context(rows), mimetype="text/csv")
+        response.headers["Content-Disposition"] = f'attachment; filename="parking_activity_{user_id}.csv"'
+        return response
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Database error exporting activity: {str(e)}")
+        return create_error_response("Database error", status_code=500)
+    except Exception as e:
+        current_app.logger.error(f"Error exporting activity: {str(e)}")
+        return create_error_response("Internal server error", status_code=500)
+
 @user_bp.route("/api/user/export-csv", methods=["POST"])
 @jwt_required()
 def trigger_csv_export():
@@ -187,11 +291,48 @@ def trigger_csv_export():
     try:
         user_id = get_jwt_identity()
         email = request.json.get("email")
+        # "Since last export" mode: only reservations changed since this consumer's watermark
+        incremental = bool(request.json.get("incremental", False))
+        consumer = request.json.get("consumer") or "default"
+        if not isinstance(consumer, str) or len(consumer) > 50:
+            return create_error_response("Invalid export consumer", status_code=400)
 
         celery = current_app.extensions['celery']
 
+        # Identical exports share a running task and reuse the finished file
+        filters = {"incremental": incremental, "consumer": consumer}
+        if incremental:
+            watermark = ExportWatermark.query.filter_by(user_id=user_id, consumer=consumer).first()
+            filters["since"] = watermark.position() if watermark else None
+        key = export_key(user_id, filters, user_data_version(user_id))
+        action, entry = find_or_claim_export(
+            current_app.extensions.get('cache'), key, lambda task_id: celery.AsyncResult(task_id).state
+        )
+
+        if action == "ready":
+            return create_success_response(
+                "Export is ready for download.",
+                {
+                    "task_id": entry["task_id"],
+                    "status": "completed",
+                    "reused": True,
+                    "filename": entry["filename"],
+                    "download_url": entry["download_url"],
+                },
+            )
+        if action == "attach":
+            return create_success_response(
+                "An identical export is already in progress.",
+                {"task_id": entry["task_id"], "status": "in_progress", "reused": True},
+            )
 
-        task = celery.send_task('jobs.user_jobs.export_user_parking_csv', args=[user_id, email])
+        task = celery.send_task(
+            'jobs.user_jobs.export_user_parking_csv',
+            args=[user_id, email],
+            kwargs={"incremental": incremental, "consumer": consumer, "export_key": key},
+            task_id=entry["task_id"],
+        )
+        remember_export_owner(task.id, user_id)
 
         return create_success_response("'Export started. You will receive an email with the CSV file shortly.", {"task_id": task.id})
     except Exception as e:
@@ -203,7 +344,7 @@ def get_export_status(task_id):
     """Get the status of a CSV export task"""
     try:
 
-        task = AsyncResult(task_id)
+        task = current_app.extensions['celery'].AsyncResult(task_id)
         if task.state == "PENDING":
             return create_success_response("Export is in progress", {"status": task.state})
         elif task.state == "PROGRESS":
@@ -211,9 +352,12 @@ def get_export_status(task_id):
                 "state": task.state,
                 "current": task.info.get("current", 0),
                 "total": task.info.get("total", 1),
+                "percent": task.info.get("percent", 0),
                 "status": task.info.get("status", ""),
             }
             return create_success_response("Export in progress", response)
+        elif task.state == "REVOKED":
+            return create_success_response("Export cancelled", {"state": task.state})
         elif task.state == "SUCCESS":
             response = {
                 "state": task.state,
@@ -230,13 +374,82 @@ def get_export_status(task_id):
         current_app.logger.error(f"Error getting export status: {str(e)}")
         return create_error_response("Internal server error", status_code=500)
 
+@user_bp.route("/api/user/export-status/<string:task_id>/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_export_status(task_id):
+    """
+    Stream the progress of a CSV export as Server-Sent Events
+
+    Sends the current state once, then every state the task publishes until
+    it finishes. One result lookup per connection (plus one per idle
+    EVENT_STREAM_RESYNC interval, in case an event was missed); the stream
+    ends after EXPORT_STREAM_TIMEOUT and EventSource clients reconnect.
+    Only the user who started the export may stream it; the token may be
+    passed as ?jwt=<access_token> since EventSource cannot set headers.
+    """
+    owner = export_owner(task_id)
+    if owner is None:
+        return create_error_response("Export not found", status_code=404)
+    if owner != str(get_jwt_identity()):
+        return create_error_response("Unauthorized access", status_code=403)
+
+    celery = current_app.extensions['celery']
+    resync = current_app.config.get("EVENT_STREAM_RESYNC", 15)
+    timeout = current_app.config.get("EXPORT_STREAM_TIMEOUT", 300)
+
+    def events():
+        with subscribe([export_channel(task_id)]) as subscription:
+            last = export_status(celery.AsyncResult(task_id))
+            yield sse_event(last)
+            deadline = time.monotonic() + timeout
+            while last["state"] not in FINAL_STATES and time.monotonic() < deadline:
+                event = subscription.get(resync)
+                if event is None:
+                    event = export_status(celery.AsyncResult(task_id))
+                    if event == last:
+                        yield sse_comment()
+                        continue
+                last = event
+                yield sse_event(event)
+
+    response = Response(stream_with_context(events()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@user_bp.route("/api/user/export-cancel/<string:task_id>", methods=["POST"])
+@jwt_required()
+def cancel_export(task_id):
+    """Cancel a running CSV export (takes effect at the next chunk)"""
+    try:
+        user_id = get_jwt_identity()
+        owner = export_owner(task_id)
+        if owner is None:
+            return create_error_response("Export not found", status_code=404)
+        if owner != str(user_id):
+            return create_error_response("Unauthorized access", status_code=403)
+
+        request_export_cancel(task_id)
+        try:
+            # Drop the task outright if no worker has picked it up yet
+            current_app.extensions['celery'].control.revoke(task_id)
+        except Exception as e:
+            current_app.logger.warning(f"Could not revoke export task {task_id}: {str(e)}")
+
+        return create_success_response("Export cancellation requested", {"task_id": task_id})
+    except Exception as e:
+        current_app.logger.error(f"Error cancelling CSV export: {str(e)}")
+        return create_error_response("Internal server error", status_code=500)
+
 @user_bp.route("/api/user/download-csv/<filename>", methods=["GET"])
 def download_csv(filename):
-    """Download the CSV file"""
+    """Download the CSV file (compressed exports support Range and conditional requests)"""
     try:
+        filename = secure_filename(filename)
         file_path = os.path.join(current_app.config["EXPORT_FOLDER"], filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+        if os.path.isfile(file_path):
+            touch_export(filename)
+            return send_export_file(file_path)
         else:
             return create_error_response("File not found", status_code=404)
     except Exception as e:
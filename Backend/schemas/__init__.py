@@ -36,6 +36,7 @@ from .parking_spot import (
     ParkingSpotResponse,
     ParkingSpotList,
     ParkingSpotFilter,
+    ParkingSpotGridQuery,
     ParkingSpotBulkUpdate,
     SpotStatus,
     SpotType,
@@ -86,6 +87,7 @@ __all__ = [
     "ParkingSpotResponse",
     "ParkingSpotList",
     "ParkingSpotFilter",
+    "ParkingSpotGridQuery",
     "ParkingSpotBulkUpdate",
     "SpotStatus",
     "SpotType",
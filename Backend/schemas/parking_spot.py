@@ -116,6 +116,13 @@ class ParkingSpotFilter(BaseSchema):
     )
 
 
+class ParkingSpotGridQuery(BaseSchema):
+    """Schema for a page of a parking lot's spot grid"""
+
+    after: int = Field(0, ge=0, description="Return spots numbered above this one")
+    limit: int = Field(200, ge=1, le=1000, description="Spots per page")
+
+
 class ParkingSpotBulkUpdate(BaseSchema):
     """Schema for bulk updating parking spots"""
 
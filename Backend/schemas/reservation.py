@@ -200,9 +200,10 @@ class ReservationFilter(BaseSchema):
     date_to: Optional[datetime] = Field(None, description="Filter to date")
 
     @field_validator("date_to")
-    def validate_date_range(cls, v, values):
-        if v is not None and "date_from" in values and values["date_from"] is not None:
-            if v <= values["date_from"]:
+    def validate_date_range(cls, v, info):
+        date_from = info.data.get("date_from")
+        if v is not None and date_from is not None:
+            if v <= date_from:
                 raise ValueError("End date must be after start date")
         return v
 
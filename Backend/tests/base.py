@@ -0,0 +1,148 @@
+"""
+Shared test setup
+One app for the whole run on a temporary SQLite file (the in-process job
+worker threads need a database they can share), with the in-process job
+backend and mail delivery suppressed. Run from Backend/:
+
+    python -m unittest discover tests
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from config import TestingConfig
+
+_TMP = tempfile.mkdtemp(prefix="parking-tests-")
+
+
+class AppTestConfig(TestingConfig):
+    SQLALCHEMY_ECHO = False
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+    EXPORT_FOLDER = os.path.join(_TMP, "exports")
+    JOB_BACKEND = "local"
+    MAIL_SUPPRESS_SEND = True
+    MAIL_DEBUG = False
+
+
+_app = None
+
+
+def get_app():
+    """The test app, created on first use"""
+    global _app
+    if _app is None:
+        logging.disable(logging.CRITICAL)
+        from app import create_app
+
+        _app, _ = create_app(AppTestConfig)
+    return _app
+
+
+class FakeCache:
+    """In-memory stand-in for CacheManager (get/set/add/delete/incr)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expiry=None):
+        self.data[key] = value
+        return True
+
+    def add(self, key, value, expiry=None):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    def incr(self, key, expiry=None):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+
+class AppTestCase(unittest.TestCase):
+    """Fresh schema per test, run without a cache unless a test installs one"""
+
+    def setUp(self):
+        self.app = get_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        from models import db
+
+        self.db = db
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        self._cache = self.app.extensions.pop("cache", None)
+        shutil.rmtree(self.app.config["EXPORT_FOLDER"], ignore_errors=True)
+        os.makedirs(self.app.config["EXPORT_FOLDER"])
+
+    def tearDown(self):
+        self.app.extensions.pop("cache", None)
+        if self._cache is not None:
+            self.app.extensions["cache"] = self._cache
+        self.db.session.remove()
+        self.context.pop()
+
+    def install_cache(self, cache):
+        self.app.extensions["cache"] = cache
+        return cache
+
+    def create_user(self, username="driver", email=None):
+        from models import User
+
+        user = User(username=username, email=email or f"{username}@example.com", role="user")
+        user.set_password("secret")
+        self.db.session.add(user)
+        self.db.session.commit()
+        return user
+
+    def create_lot(self, name="Central", spots=10, price=10):
+        from models import ParkingLot
+
+        lot = ParkingLot(
+            prime_location_name=name, address="1 Main St", pin_code="123456",
+            number_of_spots=spots, price=price,
+        )
+        self.db.session.add(lot)
+        self.db.session.commit()
+        lot.create_parking_spots()
+        self.db.session.commit()
+        return lot
+
+    def create_reservation(self, user, spot, start, hours=2, status="completed"):
+        from models import Reservation
+
+        reservation = Reservation(
+            user_id=user.id,
+            spot_id=spot.id,
+            parking_timestamp=start,
+            leaving_timestamp=start + timedelta(hours=hours) if status == "completed" else None,
+            status=status,
+            hourly_rate=spot.parking_lot.price,
+            vehicle_number="AB12CD3456",
+        )
+        if status == "completed":
+            reservation.parking_cost = reservation.calculate_cost()
+        self.db.session.add(reservation)
+        self.db.session.commit()
+        return reservation
+
+
+def days_ago(days):
+    return datetime.utcnow() - timedelta(days=days)
+
+
+def auth_headers(user):
+    """Authorization header with an access token for the user"""
+    from routes.auth import generate_user_tokens
+
+    return {"Authorization": f"Bearer {generate_user_tokens(user)['access_token']}"}
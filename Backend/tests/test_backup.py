@@ -0,0 +1,91 @@
+import contextlib
+import io
+import os
+import sqlite3
+from tests.base import AppTestCase, days_ago
+from models import ParkingLot, Reservation, User
+from models.db_utils import backup_database, restore_database
+
+
+def integrity_check(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+
+
+class BackupRestoreTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["BACKUP_PAGES_PER_STEP"] = 2
+        self.app.config["BACKUP_STEP_PAUSE"] = 0
+        self.backup_path = os.path.join(self.app.config["EXPORT_FOLDER"], "backup.db")
+        self.lot_id = self.create_lot(spots=20).id
+        self.user_id = self.create_user().id
+        self.book(5)
+
+    def book(self, count):
+        user = self.db.session.get(User, self.user_id)
+        spots = self.db.session.get(ParkingLot, self.lot_id).parking_spots
+        for i in range(count):
+            self.create_reservation(user, spots[i % 20], start=days_ago(30 - i))
+
+    def quietly(self, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(self.app, *args, **kwargs)
+
+    def counts(self):
+        self.db.session.remove()
+        return User.query.count(), Reservation.query.count()
+
+    def test_full_backup_is_a_verified_copy(self):
+        self.assertTrue(self.quietly(backup_database, self.backup_path))
+
+        self.assertEqual(integrity_check(self.backup_path), [("ok",)])
+        conn = sqlite3.connect(self.backup_path)
+        try:
+            self.assertEqual(conn.execute("SELECT count(*) FROM reservations").fetchone()[0], 5)
+        finally:
+            conn.close()
+        self.assertFalse(os.path.exists(self.backup_path + ".pages"))
+
+    def test_incremental_backup_stores_changed_pages_in_a_delta(self):
+        self.quietly(backup_database, self.backup_path, incremental=True)
+        self.assertTrue(os.path.exists(self.backup_path + ".pages"))
+        base_size = os.path.getsize(self.backup_path)
+
+        self.book(3)
+        self.assertTrue(self.quietly(backup_database, self.backup_path, incremental=True))
+
+        delta_path = self.backup_path + ".0001.delta"
+        self.assertTrue(os.path.exists(delta_path))
+        self.assertLess(os.path.getsize(delta_path), base_size)
+        self.assertEqual(os.path.getsize(self.backup_path), base_size)
+
+    def test_restore_replays_deltas_and_passes_integrity_check(self):
+        self.quietly(backup_database, self.backup_path, incremental=True)
+        self.book(3)
+        self.quietly(backup_database, self.backup_path, incremental=True)
+        backed_up = self.counts()
+
+        self.book(4)
+        Reservation.query.filter(Reservation.id <= 2).delete()
+        self.db.session.commit()
+        self.assertNotEqual(self.counts(), backed_up)
+
+        self.assertTrue(self.quietly(restore_database, self.backup_path))
+
+        self.assertEqual(self.counts(), backed_up)
+        self.assertEqual(integrity_check(self.db.engine.url.database), [("ok",)])
+
+    def test_corrupt_backup_leaves_the_database_unchanged(self):
+        self.quietly(backup_database, self.backup_path)
+        with open(self.backup_path, "r+b") as fh:
+            fh.seek(4096)
+            fh.write(b"\xff" * 4096)
+        before = self.counts()
+
+        self.assertFalse(self.quietly(restore_database, self.backup_path))
+
+        self.assertEqual(self.counts(), before)
@@ -0,0 +1,45 @@
+from tests.base import AppTestCase, days_ago
+from utils.delta_sync import sync_changes
+from utils.reservation_archive import archive_reservations
+
+
+class SyncAcrossArchivingTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["RESERVATION_ARCHIVE_AFTER_DAYS"] = 365
+        self.user = self.create_user()
+        lot = self.create_lot()
+        spot = lot.parking_spots[0]
+        self.old_ids = [
+            self.create_reservation(self.user, spot, start=days_ago(400 + i)).id for i in range(3)
+        ]
+        self.recent_id = self.create_reservation(self.user, spot, start=days_ago(2)).id
+
+    def reservation_ids(self, changes):
+        return sorted(reservation["id"] for reservation in changes["reservations"])
+
+    def test_full_sync_includes_archived_reservations(self):
+        self.assertEqual(archive_reservations(), 3)
+
+        changes = sync_changes(self.user.id)
+
+        self.assertTrue(changes["full"])
+        self.assertEqual(self.reservation_ids(changes), sorted(self.old_ids + [self.recent_id]))
+
+    def test_delta_sync_across_archive_run_keeps_client_rows(self):
+        client = {
+            reservation["id"]: reservation
+            for reservation in sync_changes(self.user.id)["reservations"]
+        }
+        token = sync_changes(self.user.id)["version"]
+
+        self.assertEqual(archive_reservations(), 3)
+        changes = sync_changes(self.user.id, token)
+
+        self.assertFalse(changes["full"])
+        self.assertEqual(changes["deleted"]["reservations"], [])
+        for reservation in changes["reservations"]:
+            client[reservation["id"]] = reservation
+        self.assertEqual(sorted(client), sorted(self.old_ids + [self.recent_id]))
+        # After the sync a fresh full sync agrees with the client's copy
+        self.assertEqual(sorted(client), self.reservation_ids(sync_changes(self.user.id)))
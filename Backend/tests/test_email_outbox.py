@@ -0,0 +1,34 @@
+import time
+from flask_mail import email_dispatched
+from tests.base import AppTestCase
+from models import EmailOutbox
+from utils.notification import send_email
+
+
+class OutboxDeliveryWithoutCacheTest(AppTestCase):
+    def wait_for_status(self, status, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.db.session.expire_all()
+            entries = EmailOutbox.query.all()
+            if entries and all(entry.status == status for entry in entries):
+                return entries
+            time.sleep(0.05)
+        self.fail(f"Outbox not {status}: {[(e.id, e.status) for e in EmailOutbox.query]}")
+
+    def test_queued_email_is_delivered_without_cache_or_beat(self):
+        self.assertNotIn("cache", self.app.extensions)
+        self.assertFalse(self.app.config["JOB_LOCAL_BEAT"])
+        delivered = []
+
+        def record(app, message, **extra):
+            delivered.append(message.recipients)
+
+        email_dispatched.connect(record)
+        try:
+            self.assertTrue(send_email("Export ready", ["driver@example.com"], "Ready", "<p>Ready</p>"))
+            self.wait_for_status("sent")
+        finally:
+            email_dispatched.disconnect(record)
+
+        self.assertEqual(delivered, [["driver@example.com"]])
@@ -0,0 +1,54 @@
+import os
+import uuid
+from tests.base import AppTestCase, auth_headers, days_ago
+from jobs.user_jobs import export_user_parking_csv
+from utils.csv_generator import export_checkpoint_path
+from utils.export_registry import export_cancel_requested, remember_export_owner
+
+
+class ExportCancelWithoutCacheTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = self.create_user("owner")
+        self.other = self.create_user("other")
+        self.client = self.app.test_client()
+        self.task_id = str(uuid.uuid4())
+
+    def cancel(self, user, task_id=None):
+        return self.client.post(
+            f"/api/user/export-cancel/{task_id or self.task_id}", headers=auth_headers(user)
+        )
+
+    def test_owner_can_cancel(self):
+        remember_export_owner(self.task_id, self.owner.id)
+
+        response = self.cancel(self.owner)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(export_cancel_requested(self.task_id))
+
+    def test_other_user_cannot_cancel(self):
+        remember_export_owner(self.task_id, self.owner.id)
+
+        response = self.cancel(self.other)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(export_cancel_requested(self.task_id))
+
+    def test_unknown_or_malformed_task_is_not_found(self):
+        self.assertEqual(self.cancel(self.owner).status_code, 404)
+        self.assertEqual(self.cancel(self.owner, "not-a-task-id").status_code, 404)
+
+    def test_flagged_export_stops_and_discards_its_partial(self):
+        lot = self.create_lot()
+        self.create_reservation(self.owner, lot.parking_spots[0], start=days_ago(2))
+        remember_export_owner(self.task_id, self.owner.id)
+        self.cancel(self.owner)
+
+        export_user_parking_csv.apply(args=[self.owner.id, self.owner.email], task_id=self.task_id)
+
+        self.assertFalse(os.path.exists(export_checkpoint_path(self.task_id)))
+        exported = [name for name in os.listdir(self.app.config["EXPORT_FOLDER"]) if name.endswith(".gz")]
+        self.assertEqual(exported, [])
+        partials = os.listdir(os.path.dirname(export_checkpoint_path(self.task_id)))
+        self.assertFalse([name for name in partials if name.startswith("parking_history")])
@@ -0,0 +1,42 @@
+from tests.base import AppTestCase, FakeCache
+from utils.export_registry import export_key, find_or_claim_export
+
+
+class UnavailableCache(FakeCache):
+    """Cache whose writes fail (e.g. Redis errors): add returns False, nothing is stored"""
+
+    def add(self, key, value, expiry=None):
+        return False
+
+    def set(self, key, value, expiry=None):
+        return False
+
+
+class FindOrClaimExportTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.key = export_key(1, {"incremental": False}, "-:0")
+
+    def test_failed_claim_without_entry_starts_a_new_export(self):
+        action, entry = find_or_claim_export(UnavailableCache(), self.key, lambda task_id: "PENDING")
+
+        self.assertEqual(action, "start")
+        self.assertTrue(entry["task_id"])
+
+    def test_attaches_to_running_identical_export(self):
+        cache = FakeCache()
+        action, first = find_or_claim_export(cache, self.key, lambda task_id: "PENDING")
+        self.assertEqual(action, "start")
+
+        action, entry = find_or_claim_export(cache, self.key, lambda task_id: "PROGRESS")
+
+        self.assertEqual(action, "attach")
+        self.assertEqual(entry["task_id"], first["task_id"])
+
+    def test_finished_claim_is_not_attached_to(self):
+        cache = FakeCache()
+        find_or_claim_export(cache, self.key, lambda task_id: "PENDING")
+
+        action, _ = find_or_claim_export(cache, self.key, lambda task_id: "FAILURE")
+
+        self.assertEqual(action, "start")
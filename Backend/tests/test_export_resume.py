@@ -0,0 +1,87 @@
+import gzip
+import io
+import os
+from unittest import mock
+import zstandard
+from tests.base import AppTestCase, days_ago
+from utils import csv_generator
+from utils.csv_generator import _export_chunked, export_checkpoint_path, load_export_checkpoint
+
+
+class Interrupted(Exception):
+    pass
+
+
+def decompress(path, compression):
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if compression == "gzip":
+        return gzip.decompress(data)
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+    return reader.read()
+
+
+class ExportResumeTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        lot = self.create_lot()
+        for i in range(5):
+            self.create_reservation(self.user, lot.parking_spots[i], start=days_ago(10 - i))
+        # Two rows per chunk, so five rows take three chunks
+        chunks = csv_generator._iter_reservation_chunks
+        patcher = mock.patch.object(
+            csv_generator, "_iter_reservation_chunks",
+            lambda *args, **kwargs: chunks(*args, chunk_size=2, **kwargs),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.checkpoint_path = export_checkpoint_path("resume-task")
+
+    def interrupt_after_first_chunk(self, compression):
+        def on_progress(rows_done, total_rows):
+            raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            _export_chunked(self.user, "resumed.csv", "history", compression=compression,
+                            checkpoint_path=self.checkpoint_path, on_progress=on_progress)
+        self.assertEqual(load_export_checkpoint(self.checkpoint_path)["rows"], 2)
+
+    def resume(self, compression):
+        progress = []
+        result = _export_chunked(
+            self.user, "ignored.csv", "history", compression=compression,
+            checkpoint_path=self.checkpoint_path,
+            on_progress=lambda rows_done, total_rows: progress.append(rows_done),
+        )
+        return result, progress
+
+    def assert_resumes_to_the_uninterrupted_output(self, compression):
+        expected = _export_chunked(self.user, "single.csv", "history", compression=compression)
+
+        self.interrupt_after_first_chunk(compression)
+        result, progress = self.resume(compression)
+
+        self.assertEqual(progress, [4, 5])
+        self.assertEqual(result["records_count"], 5)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+        self.assertEqual(
+            decompress(result["filepath"], compression),
+            decompress(expected["filepath"], compression),
+        )
+
+    def test_gzip_resume(self):
+        self.assert_resumes_to_the_uninterrupted_output("gzip")
+
+    def test_zstd_resume(self):
+        self.assert_resumes_to_the_uninterrupted_output("zstd")
+
+    def test_missing_partial_restarts_the_export(self):
+        expected = _export_chunked(self.user, "single.csv", "history", compression="gzip")
+        self.interrupt_after_first_chunk("gzip")
+        os.remove(load_export_checkpoint(self.checkpoint_path)["partial_path"])
+
+        result, progress = self.resume("gzip")
+
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(decompress(result["filepath"], "gzip"), decompress(expected["filepath"], "gzip"))
@@ -0,0 +1,53 @@
+import os
+import time
+from tests.base import AppTestCase, days_ago
+from utils.csv_generator import _export_chunked, discard_export_checkpoint, export_checkpoint_path
+from utils.export_store import INPROGRESS_DIR, cleanup_stale_partials
+
+
+class Abort(Exception):
+    pass
+
+
+def abort(rows_written, total_rows):
+    raise Abort()
+
+
+class PartialExportCleanupTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        lot = self.create_lot()
+        self.create_reservation(self.user, lot.parking_spots[0], start=days_ago(3))
+        self.partial_dir = os.path.join(self.app.config["EXPORT_FOLDER"], INPROGRESS_DIR)
+
+    def _partials(self):
+        return sorted(os.listdir(self.partial_dir)) if os.path.isdir(self.partial_dir) else []
+
+    def test_aborted_export_keeps_partial_for_resume_until_discarded(self):
+        checkpoint_path = export_checkpoint_path("task-1")
+        with self.assertRaises(Abort):
+            _export_chunked(self.user, "keep.csv", "history", compression="none",
+                            checkpoint_path=checkpoint_path, on_progress=abort)
+        self.assertEqual(self._partials(), ["keep.csv", "task-1.json"])
+
+        discard_export_checkpoint(checkpoint_path)
+
+        self.assertEqual(self._partials(), [])
+
+    def test_aborted_export_without_checkpoint_removes_partial(self):
+        with self.assertRaises(Abort):
+            _export_chunked(self.user, "gone.csv", "history", compression="none", on_progress=abort)
+
+        self.assertEqual(self._partials(), [])
+
+    def test_sweep_removes_only_partials_older_than_claim_ttl(self):
+        os.makedirs(self.partial_dir, exist_ok=True)
+        for name in ("old.csv.gz", "old.json", "fresh.csv.gz"):
+            open(os.path.join(self.partial_dir, name), "w").close()
+        stale = time.time() - self.app.config["EXPORT_CLAIM_TTL"] - 60
+        for name in ("old.csv.gz", "old.json"):
+            os.utime(os.path.join(self.partial_dir, name), (stale, stale))
+
+        self.assertEqual(cleanup_stale_partials(), 2)
+        self.assertEqual(self._partials(), ["fresh.csv.gz"])
@@ -0,0 +1,37 @@
+import json
+import uuid
+from tests.base import AppTestCase, auth_headers
+from utils.export_registry import remember_export_owner
+
+
+class ExportStreamAccessTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["EXPORT_STREAM_TIMEOUT"] = 0
+        self.owner = self.create_user("owner")
+        self.other = self.create_user("other")
+        self.client = self.app.test_client()
+        self.task_id = str(uuid.uuid4())
+        remember_export_owner(self.task_id, self.owner.id)
+
+    def stream(self, task_id=None, **kwargs):
+        return self.client.get(f"/api/user/export-status/{task_id or self.task_id}/stream", **kwargs)
+
+    def test_requires_a_token(self):
+        self.assertEqual(self.stream().status_code, 401)
+
+    def test_other_user_cannot_stream(self):
+        self.assertEqual(self.stream(headers=auth_headers(self.other)).status_code, 403)
+
+    def test_unknown_task_is_not_found(self):
+        self.assertEqual(self.stream(str(uuid.uuid4()), headers=auth_headers(self.owner)).status_code, 404)
+
+    def test_owner_streams_with_a_query_string_token(self):
+        token = auth_headers(self.owner)["Authorization"].split()[1]
+
+        response = self.stream(query_string={"jwt": token})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/event-stream")
+        first = response.get_data(as_text=True).split("\n\n")[0]
+        self.assertEqual(json.loads(first.split("data: ", 1)[1])["state"], "PENDING")
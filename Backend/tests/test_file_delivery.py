@@ -0,0 +1,98 @@
+import gzip
+import os
+import zstandard
+from tests.base import AppTestCase
+
+CSV = ("reservation_id,status\n" + "".join(f"{i},Completed\n" for i in range(2000))).encode()
+
+
+class ExportDownloadTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.app.test_client()
+        self.stored = {
+            "export.csv.gz": gzip.compress(CSV),
+            "export.csv.zst": zstandard.ZstdCompressor().compress(CSV),
+            "plain.csv": CSV,
+        }
+        for name, data in self.stored.items():
+            with open(os.path.join(self.app.config["EXPORT_FOLDER"], name), "wb") as fh:
+                fh.write(data)
+
+    def tearDown(self):
+        self.app.config["EXPORT_ACCEL_REDIRECT_PREFIX"] = None
+        super().tearDown()
+
+    def download(self, filename, accept_encoding=None, **headers):
+        if accept_encoding is not None:
+            headers["Accept-Encoding"] = accept_encoding
+        return self.client.get(f"/api/user/download-csv/{filename}", headers=headers)
+
+    def assert_stored_bytes(self, response, filename, encoding):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], encoding)
+        self.assertEqual(response.get_data(), self.stored[filename])
+        self.assertRegex(response.headers["Content-Disposition"], r'filename="?export\.csv"?$')
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    def assert_decompressed(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.headers["Accept-Ranges"], "none")
+        self.assertEqual(response.get_data(), CSV)
+        self.assertRegex(response.headers["Content-Disposition"], r'filename="?export\.csv"?$')
+
+    def test_gzip_is_sent_as_stored_when_accepted(self):
+        self.assert_stored_bytes(self.download("export.csv.gz", "gzip, deflate, br"), "export.csv.gz", "gzip")
+
+    def test_zstd_is_sent_as_stored_when_accepted(self):
+        self.assert_stored_bytes(self.download("export.csv.zst", "gzip, zstd"), "export.csv.zst", "zstd")
+
+    def test_clients_without_the_encoding_get_a_decompressed_stream(self):
+        self.assert_decompressed(self.download("export.csv.gz"))
+        self.assert_decompressed(self.download("export.csv.gz", "identity"))
+        self.assert_decompressed(self.download("export.csv.gz", "gzip;q=0, br"))
+        self.assert_decompressed(self.download("export.csv.zst", "gzip, deflate"))
+
+    def test_uncompressed_export_has_no_content_encoding(self):
+        response = self.download("plain.csv", "gzip")
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_data(), CSV)
+
+    def test_range_applies_to_the_stored_bytes(self):
+        response = self.download("export.csv.gz", "gzip", Range="bytes=0-9")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), self.stored["export.csv.gz"][:10])
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_decompressed_stream_ignores_range(self):
+        response = self.download("export.csv.gz", "identity", Range="bytes=0-9")
+
+        self.assert_decompressed(response)
+
+    def test_conditional_request_is_not_modified(self):
+        etag = self.download("export.csv.gz", "gzip").headers["ETag"]
+
+        response = self.download("export.csv.gz", "gzip", **{"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b"")
+
+    def test_accel_redirect_hands_accepted_encodings_to_the_proxy(self):
+        self.app.config["EXPORT_ACCEL_REDIRECT_PREFIX"] = "/protected-exports/"
+
+        response = self.download("export.csv.gz", "gzip")
+
+        self.assertEqual(response.headers["X-Accel-Redirect"], "/protected-exports/export.csv.gz")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.get_data(), b"")
+
+    def test_accel_redirect_is_skipped_when_decompressing(self):
+        self.app.config["EXPORT_ACCEL_REDIRECT_PREFIX"] = "/protected-exports/"
+
+        response = self.download("export.csv.gz", "identity")
+
+        self.assertNotIn("X-Accel-Redirect", response.headers)
+        self.assert_decompressed(response)
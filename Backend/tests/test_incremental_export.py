@@ -0,0 +1,72 @@
+import csv
+import gzip
+import io
+import os
+from datetime import timedelta
+from tests.base import AppTestCase, days_ago
+from jobs.user_jobs import export_user_parking_csv
+from models import ExportWatermark, Reservation
+from utils.reservation_archive import archive_reservations
+
+
+class IncrementalExportTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.lot = self.create_lot()
+        self.first = self.create_reservation(self.user, self.lot.parking_spots[0], start=days_ago(3))
+        self.second = self.create_reservation(self.user, self.lot.parking_spots[1], start=days_ago(2))
+
+    def export(self):
+        result = export_user_parking_csv.apply(
+            args=[self.user.id, self.user.email], kwargs={"incremental": True}
+        ).get()
+        path = os.path.join(self.app.config["EXPORT_FOLDER"], result["filename"])
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            rows = list(csv.DictReader(io.StringIO(fh.read())))
+        return {int(row["reservation_id"]): row["status"] for row in rows}
+
+    def watermark(self):
+        self.db.session.expire_all()
+        return ExportWatermark.query.filter_by(user_id=self.user.id).one()
+
+    def test_watermark_round_trip_exports_only_new_changes(self):
+        self.assertEqual(set(self.export()), {self.first.id, self.second.id})
+        self.assertEqual(self.watermark().last_reservation_id, self.second.id)
+
+        self.assertEqual(self.export(), {})
+
+        self.first.remarks = "Paid at the gate"
+        self.db.session.commit()
+        third = self.create_reservation(self.user, self.lot.parking_spots[2], start=days_ago(1))
+
+        self.assertEqual(set(self.export()), {self.first.id, third.id})
+        self.assertEqual(self.watermark().last_reservation_id, third.id)
+
+    def test_late_commit_behind_the_watermark_is_exported_once(self):
+        self.export()
+        last_updated_at = self.watermark().last_updated_at
+
+        # Stamped before the watermark, committed after the export read past it
+        late = self.create_reservation(self.user, self.lot.parking_spots[2], start=days_ago(1))
+        late.updated_at = last_updated_at - timedelta(seconds=1)
+        self.db.session.commit()
+
+        self.assertEqual(self.export(), {late.id: "Completed"})
+        self.assertEqual(self.export(), {})
+        self.assertEqual(self.watermark().position()[0], last_updated_at)
+
+    def test_deleted_and_archived_changes_are_reported(self):
+        old = self.create_reservation(self.user, self.lot.parking_spots[2], start=days_ago(400))
+        old_id, second_id = old.id, self.second.id
+        self.create_reservation(self.user, self.lot.parking_spots[3], start=days_ago(1))
+        self.export()
+
+        self.db.session.delete(self.second)
+        old.remarks = "Refunded"
+        self.db.session.commit()
+        self.assertEqual(archive_reservations(), 1)
+        self.assertIsNone(self.db.session.get(Reservation, old_id))
+
+        self.assertEqual(self.export(), {old_id: "Completed", second_id: "Deleted"})
+        self.assertEqual(self.export(), {})
@@ -0,0 +1,99 @@
+import threading
+import time
+from datetime import datetime
+from unittest import mock
+from sqlalchemy.orm import Query
+from tests.base import AppTestCase
+from jobs import user_jobs
+from models import JobRun
+
+
+class JobRunClaimTest(AppTestCase):
+    def test_failed_period_is_claimed_by_one_of_two_racing_workers(self):
+        run = JobRun.claim("nightly", "2025-07-01", lease_seconds=60)
+        run.finish(error="boom")
+        self.db.session.commit()
+        self.db.session.remove()
+
+        competitor_claims = []
+
+        def competitor():
+            with self.app.app_context():
+                competitor_claims.append(JobRun.claim("nightly", "2025-07-01", lease_seconds=60))
+                self.db.session.remove()
+
+        original_first = Query.first
+        raced = []
+
+        def first_then_race(query):
+            # The other worker claims between this worker's read and its write
+            row = original_first(query)
+            if not raced:
+                raced.append(True)
+                thread = threading.Thread(target=competitor)
+                thread.start()
+                thread.join()
+            return row
+
+        with mock.patch.object(Query, "first", first_then_race):
+            claimed = JobRun.claim("nightly", "2025-07-01", lease_seconds=60)
+
+        self.assertIsNotNone(competitor_claims[0])
+        self.assertIsNone(claimed)
+        self.db.session.expire_all()
+        self.assertEqual(JobRun.query.one().attempts, 2)
+
+    def test_completed_period_needs_force(self):
+        run = JobRun.claim("nightly", "2025-07-01", lease_seconds=60)
+        run.finish(result="done")
+        self.db.session.commit()
+
+        self.assertIsNone(JobRun.claim("nightly", "2025-07-01", lease_seconds=60))
+        self.assertEqual(JobRun.claim("nightly", "2025-07-01", lease_seconds=60, force=True).attempts, 2)
+
+
+class DispatchedRunTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPORT_EXECUTOR"] = "celery"
+        self.app.config["REPORT_CHART_BACKEND"] = "svg"
+        self.app.config["REPORT_CHUNK_SIZE"] = 1
+        lot = self.create_lot()
+        for i in range(2):
+            user = self.create_user(f"driver{i}")
+            self.create_reservation(user, lot.parking_spots[i], start=datetime(2025, 7, 3 + i, 9))
+
+    def wait_for_run(self, job_name, period, timeout=15):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.db.session.expire_all()
+            run = JobRun.query.filter_by(job_name=job_name, period=period).one()
+            if run.status != "running":
+                return run
+            time.sleep(0.05)
+        self.fail(f"{job_name} {period} still running")
+
+    def test_monthly_run_is_running_until_the_chord_completes_it(self):
+        summary = user_jobs.generate_monthly_report.run("2025-07")
+        self.assertIn("dispatched", summary)
+
+        run = self.wait_for_run("generate_monthly_report", "2025-07")
+        self.assertEqual(run.status, "completed")
+        # Written by the chord callback, not at dispatch
+        self.assertIn("2/2", run.result)
+
+    def test_failed_reports_fail_the_run_and_allow_a_rerun(self):
+        with mock.patch.object(user_jobs, "_send_monthly_report", side_effect=RuntimeError("smtp down")):
+            user_jobs.generate_monthly_report.run("2025-07")
+            run = self.wait_for_run("generate_monthly_report", "2025-07")
+
+        self.assertEqual(run.status, "failed")
+        user_jobs.generate_monthly_report.run("2025-07")
+        self.assertEqual(self.wait_for_run("generate_monthly_report", "2025-07").status, "completed")
+
+    def test_daily_reminders_complete_from_the_chord_callback(self):
+        user_jobs.send_daily_reminders.run()
+
+        run = self.wait_for_run("send_daily_reminders", datetime.utcnow().date().isoformat())
+        self.assertEqual(run.status, "completed")
+        self.assertIn("2 users", run.result)
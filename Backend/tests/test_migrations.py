@@ -0,0 +1,88 @@
+from sqlalchemy import inspect
+from tests.base import AppTestCase
+from models import User
+from models.migrations import MIGRATIONS, migration_status, run_migrations
+
+# Tables of the baseline schema (before versioned migrations), and the
+# indexes added to them since
+BASELINE_TABLES = {"users", "parking_lots", "parking_spots", "reservations"}
+NEW_INDEXES = {
+    "reservations": [
+        "ix_reservations_updated_at",
+        "ix_reservations_user_updated_at",
+        "ix_reservations_user_parking_ts",
+        "ix_reservations_user_active",
+        "ix_reservations_active_spot",
+    ],
+    "parking_lots": ["ix_parking_lots_updated_at"],
+    "parking_spots": ["ix_parking_spots_updated_at", "ix_parking_spots_lot_status"],
+}
+
+
+class MigrationTest(AppTestCase):
+    def execute(self, sql):
+        with self.db.engine.begin() as connection:
+            connection.exec_driver_sql(sql)
+
+    def make_baseline(self):
+        """Turn the fresh schema into the baseline one, keeping its data"""
+        for indexes in NEW_INDEXES.values():
+            for name in indexes:
+                self.execute(f"DROP INDEX {name}")
+        for table in reversed(self.db.metadata.sorted_tables):
+            if table.name not in BASELINE_TABLES:
+                self.execute(f"DROP TABLE {table.name}")
+
+    def inspector(self):
+        return inspect(self.db.engine)
+
+    def test_baseline_database_is_migrated_in_place(self):
+        self.create_user("kept")
+        self.make_baseline()
+        self.db.session.remove()
+
+        applied = run_migrations()
+
+        self.assertEqual(applied, sorted(version for version, _, _ in MIGRATIONS))
+        inspector = self.inspector()
+        for table, indexes in NEW_INDEXES.items():
+            self.assertLessEqual(set(indexes), {index["name"] for index in inspector.get_indexes(table)})
+        self.assertEqual(set(inspector.get_table_names()), set(self.db.metadata.tables))
+        self.assertEqual(User.query.filter_by(username="kept").count(), 1)
+
+    def test_rerun_applies_nothing_and_records_every_version_once(self):
+        self.make_baseline()
+        run_migrations()
+
+        self.assertEqual(run_migrations(), [])
+        status = migration_status()
+        self.assertEqual([entry["version"] for entry in status], sorted(v for v, _, _ in MIGRATIONS))
+        self.assertTrue(all(entry["applied_at"] for entry in status))
+
+    def test_interrupted_migration_runs_again_safely(self):
+        run_migrations()
+        # Objects exist but the version was never recorded
+        self.execute("DELETE FROM schema_migrations WHERE version >= 3")
+
+        self.assertEqual(run_migrations(), [v for v, _, _ in sorted(MIGRATIONS) if v >= 3])
+
+    def test_new_columns_are_added_to_an_existing_table(self):
+        run_migrations()
+        self.execute("DROP INDEX ix_reservations_archive_user_updated_at")
+        for name in ("last_tombstone_id", "recent_rows"):
+            self.execute(f"ALTER TABLE export_watermarks DROP COLUMN {name}")
+        self.execute("DELETE FROM schema_migrations WHERE version = 5")
+
+        self.assertEqual(run_migrations(), [5])
+        inspector = self.inspector()
+        columns = {column["name"] for column in inspector.get_columns("export_watermarks")}
+        self.assertLessEqual({"last_tombstone_id", "recent_rows"}, columns)
+        indexes = {index["name"] for index in inspector.get_indexes("reservations_archive")}
+        self.assertIn("ix_reservations_archive_user_updated_at", indexes)
+
+    def test_target_stops_at_a_version(self):
+        self.make_baseline()
+
+        self.assertEqual(run_migrations(target=2), [1, 2])
+        pending = [entry["version"] for entry in migration_status() if entry["applied_at"] is None]
+        self.assertEqual(pending, [v for v, _, _ in sorted(MIGRATIONS) if v > 2])
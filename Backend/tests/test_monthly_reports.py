@@ -0,0 +1,75 @@
+from datetime import datetime
+from unittest import mock
+from tests.base import AppTestCase
+from jobs import user_jobs
+from models import EmailOutbox, JobRun
+from utils.report_data import month_window, monthly_report_user_ids
+
+
+class LocalReportRenderingTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPORT_CHART_BACKEND"] = "svg"
+        self.app.config["REPORT_LOCAL_WORKERS"] = 2
+        lot = self.create_lot()
+        for i in range(3):
+            user = self.create_user(f"driver{i}")
+            self.create_reservation(user, lot.parking_spots[i], start=datetime(2025, 7, 3 + i, 9))
+        self.start_dt, self.end_dt = month_window("2025-07")
+        self.chunks = user_jobs._chunked(monthly_report_user_ids(self.start_dt, self.end_dt), 2)
+
+    def render(self):
+        return user_jobs._render_reports_locally(self.start_dt, self.end_dt, "July 2025", self.chunks)
+
+    def test_daemonic_worker_renders_in_process(self):
+        daemon = mock.Mock(daemon=True)
+        with mock.patch.object(user_jobs.multiprocessing, "current_process", return_value=daemon), \
+                mock.patch.object(user_jobs, "ProcessPoolExecutor") as pool:
+            results = self.render()
+
+        pool.assert_not_called()
+        self.assertEqual(sum(result["sent"] for result in results), 3)
+        self.assertEqual(EmailOutbox.query.count(), 3)
+
+    def test_pool_uses_spawned_processes(self):
+        results = self.render()
+
+        self.assertEqual(sum(result["sent"] for result in results), 3)
+        self.assertFalse([failure for result in results for failure in result["failed"]])
+
+
+class LocalReportRunTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config["REPORT_EXECUTOR"] = "local"
+        self.app.config["REPORT_CHART_BACKEND"] = "svg"
+        lot = self.create_lot()
+        self.users = [self.create_user(f"driver{i}") for i in range(2)]
+        for i, user in enumerate(self.users):
+            self.create_reservation(user, lot.parking_spots[i], start=datetime(2025, 7, 3 + i, 9))
+
+    def run_month(self, send):
+        # Render in this process so the patched sender is used
+        daemon = mock.Mock(daemon=True)
+        with mock.patch.object(user_jobs.multiprocessing, "current_process", return_value=daemon), \
+                mock.patch.object(user_jobs, "_send_monthly_report", side_effect=send):
+            return user_jobs.generate_monthly_report.run("2025-07")
+
+    def test_failed_report_fails_the_run_and_allows_a_rerun(self):
+        failing_id = self.users[0].id
+
+        def send(user, html_report, month_year):
+            if user["id"] == failing_id:
+                raise RuntimeError("smtp down")
+
+        summary = self.run_month(send)
+
+        run = JobRun.query.filter_by(job_name="generate_monthly_report", period="2025-07").one()
+        self.assertEqual(run.status, "failed")
+        self.assertEqual(run.error, summary)
+        self.assertIn("1 failed", summary)
+
+        self.run_month(lambda *args: None)
+        self.db.session.expire_all()
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(run.attempts, 2)
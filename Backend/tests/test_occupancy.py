@@ -0,0 +1,36 @@
+from tests.base import AppTestCase, auth_headers
+
+
+class OccupancyEtagTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user("admin")
+        self.admin.role = "admin"
+        self.db.session.commit()
+        self.lot = self.create_lot(spots=12)
+        self.client = self.app.test_client()
+        self.url = f"/api/admin/pkl/{self.lot.id}/occupancy"
+
+    def get(self, accept, if_none_match=None):
+        headers = {**auth_headers(self.admin), "Accept": accept}
+        if if_none_match:
+            headers["If-None-Match"] = if_none_match
+        return self.client.get(self.url, headers=headers)
+
+    def test_representations_have_distinct_etags(self):
+        json_etag = self.get("application/json").headers["ETag"]
+        binary_etag = self.get("application/octet-stream").headers["ETag"]
+
+        self.assertNotEqual(json_etag, binary_etag)
+        self.assertTrue(json_etag.endswith('-json"'))
+        self.assertTrue(binary_etag.endswith('-bin"'))
+
+    def test_each_etag_only_revalidates_its_own_representation(self):
+        json_etag = self.get("application/json").headers["ETag"]
+        binary_etag = self.get("application/octet-stream").headers["ETag"]
+
+        self.assertEqual(self.get("application/json", json_etag).status_code, 304)
+        self.assertEqual(self.get("application/octet-stream", binary_etag).status_code, 304)
+        crossed = self.get("application/octet-stream", json_etag)
+        self.assertEqual(crossed.status_code, 200)
+        self.assertEqual(crossed.mimetype, "application/octet-stream")
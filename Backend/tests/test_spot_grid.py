@@ -0,0 +1,33 @@
+from tests.base import AppTestCase, days_ago
+from utils.spot_grid import spot_grid
+
+
+class SpotGridPaginationTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lot = self.create_lot(spots=4)
+        driver = self.create_user("driver")
+        spot = self.lot.parking_spots[1]
+        # Two active reservations on one spot must not disturb paging
+        self.first = self.create_reservation(driver, spot, start=days_ago(1), status="active")
+        self.create_reservation(driver, spot, start=days_ago(0.5), status="active")
+
+    def test_last_page_has_no_cursor_despite_duplicate_join_rows(self):
+        grid = spot_grid(self.lot, after=0, limit=4)
+
+        self.assertEqual([spot["spot_number"] for spot in grid["spots"]], [1, 2, 3, 4])
+        self.assertIsNone(grid["next_after"])
+
+    def test_pages_cover_each_spot_once(self):
+        first = spot_grid(self.lot, after=0, limit=2)
+        second = spot_grid(self.lot, after=first["next_after"], limit=2)
+
+        self.assertEqual([spot["spot_number"] for spot in first["spots"]], [1, 2])
+        self.assertEqual(first["next_after"], 2)
+        self.assertEqual([spot["spot_number"] for spot in second["spots"]], [3, 4])
+        self.assertIsNone(second["next_after"])
+
+    def test_spot_shows_its_oldest_active_reservation(self):
+        spot = spot_grid(self.lot, after=1, limit=1)["spots"][0]
+
+        self.assertEqual(spot["current_reservation"]["id"], self.first.id)
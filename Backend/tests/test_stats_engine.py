@@ -0,0 +1,28 @@
+import unittest
+from datetime import datetime
+import numpy as np
+from utils import stats_engine
+
+
+class EpochSecondsTest(unittest.TestCase):
+    def test_matches_timedelta_arithmetic_and_maps_none_to_nan(self):
+        parked = datetime(2025, 7, 3, 9, 15, 30, 250000)
+
+        seconds = stats_engine.epoch_seconds([parked, None])
+
+        self.assertEqual(seconds[0], (parked - datetime(1970, 1, 1)).total_seconds())
+        self.assertTrue(np.isnan(seconds[1]))
+
+    def test_empty(self):
+        self.assertEqual(stats_engine.epoch_seconds([]).shape, (0,))
+
+
+class LotUsageCountsTest(unittest.TestCase):
+    def test_unknown_lots_are_counted_under_sentinel(self):
+        usage = stats_engine.lot_usage_counts(["Central", None, "Harbour", "Central", None, None])
+
+        self.assertEqual(usage, {stats_engine.UNKNOWN_LOT: 3, "Central": 2, "Harbour": 1})
+        self.assertEqual(list(usage), [stats_engine.UNKNOWN_LOT, "Central", "Harbour"])
+
+    def test_empty(self):
+        self.assertEqual(stats_engine.lot_usage_counts([]), {})
@@ -11,9 +11,18 @@ from datetime import datetime, timedelta
 from typing import Any, Optional, Union, Dict, List
 from flask import current_app, request, g
 import hashlib
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Delete a lock only while it still holds the caller's token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 class CacheManager:
     """Redis-based cache manager with decorators and utility methods"""
     
@@ -82,6 +91,82 @@ class CacheManager:
             logger.error(f"Cache set error for key {key}: {e}")
             return False
     
+    def add(self, key: str, value: Any, expiry: int = None) -> bool:
+        """Set value only if key does not exist yet (atomic claim)"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            serialized_value = json.dumps(value, default=str)
+            return bool(self.redis_client.set(key, serialized_value, ex=expiry, nx=True))
+        except Exception as e:
+            logger.error(f"Cache add error for key {key}: {e}")
+            return False
+    
+    def incr(self, key: str, expiry: int = None) -> Optional[int]:
+        """Atomically increment a counter, setting its expiry when it is created"""
+        if not self.redis_client:
+            return None
+        
+        try:
+            count = self.redis_client.incr(key)
+            if expiry and count == 1:
+                self.redis_client.expire(key, expiry)
+            return count
+        except Exception as e:
+            logger.error(f"Cache incr error for key {key}: {e}")
+            return None
+    
+    def acquire_lock(self, key: str, lease: int) -> Optional[str]:
+        """Take a lock that expires after lease seconds; returns its token, or None if held"""
+        if not self.redis_client:
+            return None
+        
+        token = uuid.uuid4().hex
+        try:
+            if self.redis_client.set(key, token, ex=lease, nx=True):
+                return token
+        except Exception as e:
+            logger.error(f"Cache lock error for key {key}: {e}")
+        return None
+    
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock if it is still held with this token (not expired and re-taken)"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            return bool(self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.error(f"Cache unlock error for key {key}: {e}")
+            return False
+    
+    def push_recent(self, key: str, value: Any, limit: int) -> bool:
+        """Prepend a value to a list that keeps only the newest `limit` entries"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.lpush(key, json.dumps(value, default=str))
+            pipe.ltrim(key, 0, limit - 1)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Cache push error for key {key}: {e}")
+            return False
+    
+    def get_recent(self, key: str) -> List[Any]:
+        """Get the values of a push_recent list, newest first"""
+        if not self.redis_client:
+            return []
+        
+        try:
+            return [json.loads(value) for value in self.redis_client.lrange(key, 0, -1)]
+        except Exception as e:
+            logger.error(f"Cache list error for key {key}: {e}")
+            return []
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self.redis_client:
@@ -1,13 +1,398 @@
 import csv
-import os
+import heapq
 import io
-from datetime import datetime
+import json
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta
+from operator import attrgetter
 from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from models import db
 from models.reservation import Reservation
+from models.reservation_archive import ReservationArchive
+from models.sync_tombstone import SyncTombstone
 from models.user import User
 from models.parking_lot import ParkingLot
+from models.parking_spot import ParkingSpot
+from utils.export_store import INPROGRESS_DIR, register_export
+
+# Column order of the user parking history export
+PARKING_CSV_FIELDNAMES = [
+    'reservation_id', 'slot_id', 'spot_id', 'parking_lot_name', 'parking_lot_address',
+    'parking_timestamp', 'leaving_timestamp', 'duration_hours', 'parking_cost',
+    'currency', 'status', 'remarks', 'created_at'
+]
+
+# File suffix appended to export filenames for each supported compression
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+    'none': '',
+}
+
+# Rows fetched per database round trip (and per checkpoint) while exporting
+EXPORT_CHUNK_SIZE = 500
+
+# Keyset orderings for chunked exports: ((primary column, tie-breaker), descending)
+EXPORT_ORDERINGS = {
+    'history': (('parking_timestamp', 'id'), True),
+    'changes': (('updated_at', 'id'), False),
+}
+
+# Orderings that also read archived reservations (a change may be archived
+# before the next incremental export picks it up)
+ARCHIVE_ORDERINGS = {'history', 'changes'}
+
+
+class _ExportSink:
+    """
+    Chunked, resumable writer for compressed export files
+
+    Every chunk is flushed to a byte boundary the file can be truncated back
+    to, so an interrupted export can resume from its last checkpoint:
+    gzip output is a single member written with full flushes (CRC and size
+    are carried in the checkpoint), zstd output gets one frame per chunk.
+    """
+
+    def __init__(self, filepath, compression='none', state=None):
+        self.compression = compression
+        if state:
+            self.raw = open(filepath, 'r+b')
+            self.raw.truncate(state['offset'])
+            self.raw.seek(state['offset'])
+            self.crc, self.size = state.get('crc', 0), state.get('size', 0)
+        else:
+            self.raw = open(filepath, 'wb')
+            self.crc, self.size = 0, 0
+            if compression == 'gzip':
+                # Minimal gzip header: deflate, no name, no mtime, unknown OS
+                self.raw.write(b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff')
+
+        if compression == 'gzip':
+            self._deflate = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        elif compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("zstd compression requires the 'zstandard' package")
+            self._zstd = zstandard.ZstdCompressor(level=3)
+        elif compression != 'none':
+            raise ValueError("compression must be 'gzip', 'zstd' or 'none'")
+
+    def write_chunk(self, data):
+        """Write one chunk of CSV text and return the checkpoint state after it"""
+        data = data.encode('utf-8')
+        if self.compression == 'gzip':
+            self.crc = zlib.crc32(data, self.crc)
+            self.size += len(data)
+            self.raw.write(self._deflate.compress(data))
+            self.raw.write(self._deflate.flush(zlib.Z_FULL_FLUSH))
+        elif self.compression == 'zstd':
+            self.raw.write(self._zstd.compress(data))
+        else:
+            self.raw.write(data)
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        return {'offset': self.raw.tell(), 'crc': self.crc, 'size': self.size}
+
+    def finish(self):
+        """Terminate the stream and close the file"""
+        if self.compression == 'gzip':
+            self.raw.write(self._deflate.flush(zlib.Z_FINISH))
+            self.raw.write(struct.pack('<II', self.crc & 0xffffffff, self.size & 0xffffffff))
+        self.raw.close()
+
+    def close(self):
+        """Close the file without terminating the stream (it stays resumable)"""
+        self.raw.close()
+
+
+def _export_compression(compression=None):
+    """Resolve the compression to use for an export, falling back to config"""
+    compression = compression or current_app.config.get('EXPORT_COMPRESSION', 'none')
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError("compression must be 'gzip', 'zstd' or 'none'")
+    return compression
+
+
+def _with_compression_suffix(filename, compression):
+    """Append the compression suffix to filename unless it is already present"""
+    suffix = COMPRESSION_SUFFIXES[compression]
+    if suffix and not filename.endswith(suffix):
+        filename += suffix
+    return filename
+
+
+def _keyset_query(user_id, ordering, after=None, since=None, model=Reservation):
+    """
+    Build a user's reservation query in keyset order, starting after a cursor
+
+    Args:
+        user_id (int): Owner of the reservations
+        ordering (str): Key of EXPORT_ORDERINGS
+        after (tuple): Cursor (column values of the last row already read)
+        since (tuple): Lower bound for ascending orderings (e.g. a watermark)
+        model: Reservation, or ReservationArchive for archived history
+    """
+    names, descending = EXPORT_ORDERINGS[ordering]
+    first, second = (getattr(model, name) for name in names)
+    query = model.query.filter(model.user_id == user_id)
+    for bound in (since, after):
+        if not bound:
+            continue
+        if descending:
+            query = query.filter(or_(first < bound[0], and_(first == bound[0], second < bound[1])))
+        else:
+            query = query.filter(or_(first > bound[0], and_(first == bound[0], second > bound[1])))
+    if descending:
+        return query.order_by(first.desc(), second.desc())
+    return query.order_by(first.asc(), second.asc())
+
+
+def _count_rows(user_id, ordering, since=None):
+    """Number of rows a chunked export in this ordering will write"""
+    total = _keyset_query(user_id, ordering, since=since).order_by(None).count()
+    if ordering in ARCHIVE_ORDERINGS:
+        total += _keyset_query(
+            user_id, ordering, since=since, model=ReservationArchive
+        ).order_by(None).count()
+    return total
+
+
+def _tombstone_query(user_id, after, upto):
+    """A user's reservation deletions logged after one tombstone id, up to another"""
+    return SyncTombstone.query.filter(
+        SyncTombstone.entity == 'reservation',
+        SyncTombstone.user_id == user_id,
+        SyncTombstone.id > after,
+        SyncTombstone.id <= upto,
+    ).order_by(SyncTombstone.id)
+
 
-def generate_parking_csv(user_id, output_format='file', filename=None):
+def _iter_reservation_chunks(user_id, ordering, after=None, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield (reservations, cursor) chunks using keyset pagination
+
+    Orderings in ARCHIVE_ORDERINGS read up to chunk_size rows past the cursor
+    from both the live and the archive table and keep the first chunk_size of
+    the merged order, so one cursor (and checkpoint) covers both tables.
+    """
+    names, descending = EXPORT_ORDERINGS[ordering]
+    cursor_of = attrgetter(*names)
+    while True:
+        chunk = _keyset_query(user_id, ordering, after=after, since=since)\
+            .options(joinedload(Reservation.parking_spot).joinedload(ParkingSpot.parking_lot))\
+            .limit(chunk_size).all()
+        if ordering in ARCHIVE_ORDERINGS:
+            archived = _keyset_query(
+                user_id, ordering, after=after, since=since, model=ReservationArchive
+            ).limit(chunk_size).all()
+            if archived:
+                chunk = sorted(chunk + archived, key=cursor_of, reverse=descending)[:chunk_size]
+        if not chunk:
+            return
+        after = cursor_of(chunk[-1])
+        yield chunk, after
+        if len(chunk) < chunk_size:
+            return
+
+
+def load_export_checkpoint(checkpoint_path):
+    """Load an export checkpoint, or None if there is none"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, 'r', encoding='utf-8') as fh:
+        checkpoint = json.load(fh)
+    for key in ('cursor', 'since'):
+        if checkpoint.get(key):
+            checkpoint[key] = (datetime.fromisoformat(checkpoint[key][0]), checkpoint[key][1])
+    return checkpoint
+
+
+def _save_export_checkpoint(checkpoint_path, checkpoint):
+    """Atomically persist an export checkpoint"""
+    data = dict(checkpoint)
+    for key in ('cursor', 'since'):
+        if data.get(key):
+            data[key] = [data[key][0].isoformat(), data[key][1]]
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def export_checkpoint_path(task_id):
+    """Location of the checkpoint for an export task"""
+    export_folder = current_app.config.get('EXPORT_FOLDER', './exports')
+    return os.path.join(export_folder, INPROGRESS_DIR, f"{task_id}.json")
+
+
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_export_checkpoint(checkpoint_path):
+    """Remove a checkpoint and the partial file it refers to"""
+    checkpoint = load_export_checkpoint(checkpoint_path)
+    if checkpoint:
+        _remove_partial(checkpoint['partial_path'])
+    if checkpoint_path:
+        _remove_partial(checkpoint_path)
+
+
+def _export_chunked(user, filename, ordering, since=None, compression=None,
+                    checkpoint_path=None, on_progress=None, exported=None,
+                    dedupe_window=None, tombstones=None):
+    """
+    Write a user's reservations to EXPORT_FOLDER chunk by chunk
+
+    With a checkpoint_path, every completed chunk is checkpointed and a later
+    call with the same checkpoint_path resumes after the last completed chunk
+    (reusing the filename recorded in the checkpoint), or starts over if the
+    partial file is gone.
+
+    Args:
+        user (User): Owner of the export
+        filename (str): Export filename without compression suffix
+        ordering (str): 'history' (newest first) or 'changes' (oldest change first)
+        since (tuple): Lower bound for the 'changes' ordering
+        compression (str): 'gzip', 'zstd' or 'none', defaults to EXPORT_COMPRESSION
+        checkpoint_path (str): Where to keep the resume checkpoint
+        on_progress (callable): Called as on_progress(rows_done, total_rows)
+            after every chunk; may raise to abort (the checkpoint is kept;
+            without one the partial file is deleted)
+        exported (list): [id, updated_at] pairs of rows already exported, skipped
+        dedupe_window (timedelta): Keep the pairs of rows read this far behind
+            the cursor, returned as 'recent'
+        tombstones (tuple): (after, upto) range of sync tombstones whose
+            reservations are written as deleted rows after the reservations
+
+    Returns:
+        dict: filepath, records_count, the cursor of the last row read, the
+            recently read [id, updated_at] pairs and the last tombstone id reported
+    """
+    export_folder = current_app.config.get('EXPORT_FOLDER', './exports')
+    checkpoint = load_export_checkpoint(checkpoint_path)
+    if checkpoint and not os.path.exists(checkpoint['partial_path']):
+        # The partial was swept or lost in a crash: nothing to resume, start over
+        current_app.logger.warning(f"Partial export {checkpoint['filename']} is gone, restarting it")
+        discard_export_checkpoint(checkpoint_path)
+        checkpoint = None
+
+    if checkpoint:
+        compression = checkpoint['compression']
+        filename = checkpoint['filename']
+        since = checkpoint.get('since')
+    else:
+        compression = _export_compression(compression)
+        filename = _with_compression_suffix(filename, compression)
+        partial_dir = os.path.join(export_folder, INPROGRESS_DIR)
+        os.makedirs(partial_dir, exist_ok=True)
+        checkpoint = {
+            'filename': filename,
+            'compression': compression,
+            'partial_path': os.path.join(partial_dir, filename),
+            'since': since,
+            'exported': exported or [],
+            'recent': [],
+            'tombstones': list(tombstones) if tombstones else None,
+            'tombstone_cursor': tombstones[0] if tombstones else None,
+            'cursor': None,
+            'rows': 0,
+            'read': 0,
+            'state': None,
+        }
+
+    skip = {tuple(pair) for pair in checkpoint['exported']}
+    total = _count_rows(user.id, ordering, since=since)
+    if checkpoint['tombstones']:
+        total += _tombstone_query(user.id, *checkpoint['tombstones']).order_by(None).count()
+    sink = _ExportSink(checkpoint['partial_path'], compression, checkpoint['state'])
+    try:
+        if checkpoint['state'] is None:
+            header = io.StringIO()
+            csv.DictWriter(header, fieldnames=PARKING_CSV_FIELDNAMES).writeheader()
+            checkpoint['state'] = sink.write_chunk(header.getvalue())
+            if checkpoint_path:
+                _save_export_checkpoint(checkpoint_path, checkpoint)
+
+        for chunk, cursor in _iter_reservation_chunks(
+            user.id, ordering, after=checkpoint['cursor'], since=since
+        ):
+            pairs = [[reservation.id, reservation.updated_at.isoformat()] for reservation in chunk]
+            rows = [
+                _reservation_csv_row(reservation)
+                for reservation, pair in zip(chunk, pairs) if tuple(pair) not in skip
+            ]
+            if dedupe_window:
+                horizon = cursor[0] - dedupe_window
+                checkpoint['recent'] = [
+                    pair for pair in checkpoint['recent'] + pairs
+                    if datetime.fromisoformat(pair[1]) >= horizon
+                ]
+            checkpoint['read'] += len(chunk)
+            _write_export_chunk(sink, checkpoint, checkpoint_path, rows, cursor=cursor)
+            if on_progress:
+                on_progress(checkpoint['read'], total)
+
+        while checkpoint['tombstones']:
+            upto = checkpoint['tombstones'][1]
+            deleted = _tombstone_query(
+                user.id, checkpoint['tombstone_cursor'], upto
+            ).limit(EXPORT_CHUNK_SIZE).all()
+            if not deleted:
+                break
+            checkpoint['tombstone_cursor'] = deleted[-1].id
+            checkpoint['read'] += len(deleted)
+            _write_export_chunk(
+                sink, checkpoint, checkpoint_path,
+                [_deleted_csv_row(tombstone) for tombstone in deleted],
+            )
+            if on_progress:
+                on_progress(checkpoint['read'], total)
+    except BaseException:
+        sink.close()
+        if not checkpoint_path:
+            # Nothing can resume it
+            _remove_partial(checkpoint['partial_path'])
+        raise
+
+    sink.finish()
+    filepath = os.path.join(export_folder, filename)
+    os.replace(checkpoint['partial_path'], filepath)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    register_export(filepath, user_id=user.id)
+
+    return {
+        'filepath': filepath,
+        'records_count': checkpoint['rows'],
+        'cursor': checkpoint['cursor'],
+        'recent': checkpoint['recent'],
+        'tombstone_id': checkpoint['tombstones'][1] if checkpoint['tombstones'] else None,
+    }
+
+
+def _write_export_chunk(sink, checkpoint, checkpoint_path, rows, cursor=None):
+    """Append CSV rows to the export and checkpoint the position after them"""
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=PARKING_CSV_FIELDNAMES).writerows(rows)
+    checkpoint['state'] = sink.write_chunk(buffer.getvalue())
+    if cursor:
+        checkpoint['cursor'] = cursor
+    checkpoint['rows'] += len(rows)
+    if checkpoint_path:
+        _save_export_checkpoint(checkpoint_path, checkpoint)
+
+
+def generate_parking_csv(user_id, output_format='file', filename=None, compression=None,
+                         checkpoint_path=None, on_progress=None):
     """
     Generate CSV export of user's parking history
     
@@ -15,6 +400,11 @@ def generate_parking_csv(user_id, output_format='file', filename=None):
         user_id (int): User ID to export data for
         output_format (str): 'file' or 'string' - format of output
         filename (str): Optional filename, auto-generated if None
+        compression (str): 'gzip', 'zstd' or 'none' for file output,
+            defaults to the EXPORT_COMPRESSION setting
+        checkpoint_path (str): Optional checkpoint location making file
+            output resumable chunk by chunk
+        on_progress (callable): Optional on_progress(rows_written, total_rows)
     
     Returns:
         str: File path if output_format='file', CSV string if output_format='string'
@@ -24,33 +414,22 @@ def generate_parking_csv(user_id, output_format='file', filename=None):
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        # Get all reservations for user
-        reservations = Reservation.query.filter_by(user_id=user_id)\
-            .order_by(Reservation.parking_timestamp.desc()).all()
-        
-        # Generate filename if not provided
-        if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"parking_history_{user.username}_{timestamp}.csv"
-        
-        # Prepare CSV data
-        csv_data = _prepare_reservation_csv_data(reservations)
-        
         if output_format == 'file':
-            # Write to file
-            export_folder = current_app.config.get('EXPORT_FOLDER', './exports')
-            os.makedirs(export_folder, exist_ok=True)
-            filepath = os.path.join(export_folder, filename)
+            # Generate filename if not provided
+            if not filename:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"parking_history_{user.username}_{timestamp}.csv"
             
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                _write_csv_data(csvfile, csv_data)
-            
-            return filepath
+            result = _export_chunked(
+                user, filename, 'history', compression=compression,
+                checkpoint_path=checkpoint_path, on_progress=on_progress,
+            )
+            return result['filepath']
         
         elif output_format == 'string':
-            # Return as string
+            # Stream the user's live and archived reservations, newest first
             output = io.StringIO()
-            _write_csv_data(output, csv_data)
+            _write_csv_data(output, _iter_reservation_csv_rows(_iter_user_history(user.id)))
             csv_string = output.getvalue()
             output.close()
             return csv_string
@@ -62,63 +441,131 @@ def generate_parking_csv(user_id, output_format='file', filename=None):
         current_app.logger.error(f"Error generating parking CSV for user {user_id}: {str(e)}")
         raise
 
-def _prepare_reservation_csv_data(reservations):
-    """Prepare reservation data for CSV export"""
-    data = []
+def generate_parking_delta_csv(user_id, since=None, filename=None, compression=None,
+                               checkpoint_path=None, on_progress=None, exported=None,
+                               tombstone_id=None):
+    """
+    Generate CSV of reservations created, changed or deleted since a watermark position
     
-    for reservation in reservations:
-        # Calculate duration
-        duration_hours = None
-        if reservation.parking_timestamp and reservation.leaving_timestamp:
-            duration_seconds = (reservation.leaving_timestamp - reservation.parking_timestamp).total_seconds()
-            duration_hours = round(duration_seconds / 3600, 2)
+    Changes are read from SYNC_CLOCK_OVERLAP_SECONDS before the watermark, so
+    a row committed late by a concurrent transaction with an earlier
+    updated_at is not skipped; rows already exported in that window are
+    left out. Deletions logged after tombstone_id are written as rows with
+    status 'Deleted'.
+    
+    Args:
+        user_id (int): User ID to export data for
+        since (tuple): (updated_at, reservation_id) of the last exported row,
+            None to export the full history
+        filename (str): Optional filename, auto-generated if None
+        compression (str): 'gzip', 'zstd' or 'none', defaults to EXPORT_COMPRESSION
+        checkpoint_path (str): Optional checkpoint location making the export
+            resumable chunk by chunk
+        on_progress (callable): Optional on_progress(rows_done, total_rows)
+        exported (list): [id, updated_at] pairs exported within the overlap
+            window by the previous export
+        tombstone_id (int): Last sync tombstone reported by the previous export
+    
+    Returns:
+        dict: filepath, records_count, the new watermark position (never
+            behind `since`), tombstone_id and the recent [id, updated_at]
+            pairs to pass as `exported` next time
+    """
+    try:
+        user = User.query.get(user_id)
+        if not user:
+            raise ValueError(f"User {user_id} not found")
         
-        # Format timestamps
-        parking_time = reservation.parking_timestamp.strftime('%Y-%m-%d %H:%M:%S') if reservation.parking_timestamp else ''
-        leaving_time = reservation.leaving_timestamp.strftime('%Y-%m-%d %H:%M:%S') if reservation.leaving_timestamp else 'Still Parked'
+        if not filename:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"parking_history_delta_{user.username}_{timestamp}.csv"
         
-        # Get parking lot info
-        parking_lot = reservation.parking_spot.parking_lot if reservation.parking_spot else None
-        lot_name = parking_lot.prime_location_name if parking_lot else 'Unknown'
-        lot_address = parking_lot.address if parking_lot else 'Unknown'
+        overlap = timedelta(seconds=current_app.config.get('SYNC_CLOCK_OVERLAP_SECONDS', 5))
+        # Taken before any rows are read, so a later deletion is reported next time
+        last_tombstone = db.session.query(db.func.max(SyncTombstone.id)).scalar() or 0
+        
+        # Walk the (user_id, updated_at, id) indexes from the overlap window onwards
+        result = _export_chunked(
+            user, filename, 'changes', since=(since[0] - overlap, 0) if since else None,
+            compression=compression, checkpoint_path=checkpoint_path, on_progress=on_progress,
+            exported=exported if since else None, dedupe_window=overlap,
+            tombstones=(tombstone_id or 0, last_tombstone) if since else None,
+        )
         
-        row = {
-            'reservation_id': reservation.id,
-            'slot_id': reservation.parking_spot.id if reservation.parking_spot else 'N/A',
-            'spot_id': f"SPOT-{reservation.parking_spot.id}" if reservation.parking_spot else 'N/A',
-            'parking_lot_name': lot_name,
-            'parking_lot_address': lot_address,
-            'parking_timestamp': parking_time,
-            'leaving_timestamp': leaving_time,
-            'duration_hours': duration_hours if duration_hours else 'N/A',
-            'parking_cost': f"{reservation.parking_cost:.2f}" if reservation.parking_cost else '0.00',
-            'currency': 'USD',
-            'status': 'Completed' if reservation.leaving_timestamp else 'Active',
-            'remarks': getattr(reservation, 'remarks', '') or '',
-            'created_at': reservation.created_at.strftime('%Y-%m-%d %H:%M:%S') if hasattr(reservation, 'created_at') and reservation.created_at else ''
+        positions = [position for position in (result['cursor'], since) if position]
+        watermark = max(positions) if positions else None
+        recent = [
+            pair for pair in result['recent']
+            if watermark and datetime.fromisoformat(pair[1]) >= watermark[0] - overlap
+        ]
+        
+        return {
+            'filepath': result['filepath'],
+            'records_count': result['records_count'],
+            'watermark': watermark,
+            'tombstone_id': result['tombstone_id'] or last_tombstone,
+            'recent': recent,
         }
-        data.append(row)
     
-    return data
-
-def _write_csv_data(file_obj, data):
-    """Write CSV data to file object"""
-    if not data:
-        # Write empty CSV with headers
-        fieldnames = [
-            'reservation_id', 'slot_id', 'spot_id', 'parking_lot_name', 'parking_lot_address',
-            'parking_timestamp', 'leaving_timestamp', 'duration_hours', 'parking_cost',
-            'currency', 'status', 'remarks', 'created_at'
-        ]
-        writer = csv.DictWriter(file_obj, fieldnames=fieldnames)
-        writer.writeheader()
-        return
+    except Exception as e:
+        current_app.logger.error(f"Error generating parking delta CSV for user {user_id}: {str(e)}")
+        raise
+
+def _reservation_csv_row(reservation):
+    """Build the CSV row for a single reservation"""
+    # Calculate duration
+    duration_hours = None
+    if reservation.parking_timestamp and reservation.leaving_timestamp:
+        duration_seconds = (reservation.leaving_timestamp - reservation.parking_timestamp).total_seconds()
+        duration_hours = round(duration_seconds / 3600, 2)
     
-    # Write data
-    fieldnames = list(data[0].keys())
-    writer = csv.DictWriter(file_obj, fieldnames=fieldnames)
+    # Format timestamps
+    parking_time = reservation.parking_timestamp.strftime('%Y-%m-%d %H:%M:%S') if reservation.parking_timestamp else ''
+    leaving_time = reservation.leaving_timestamp.strftime('%Y-%m-%d %H:%M:%S') if reservation.leaving_timestamp else 'Still Parked'
+    
+    # Get parking lot info (archived reservations carry their own copy)
+    if isinstance(reservation, ReservationArchive):
+        spot_id = reservation.spot_id
+        lot_name = reservation.lot_name or 'Unknown'
+        lot_address = reservation.lot_address or 'Unknown'
+    else:
+        spot_id = reservation.parking_spot.id if reservation.parking_spot else None
+        parking_lot = reservation.parking_spot.parking_lot if reservation.parking_spot else None
+        lot_name = parking_lot.prime_location_name if parking_lot else 'Unknown'
+        lot_address = parking_lot.address if parking_lot else 'Unknown'
+    
+    return {
+        'reservation_id': reservation.id,
+        'slot_id': spot_id if spot_id else 'N/A',
+        'spot_id': f"SPOT-{spot_id}" if spot_id else 'N/A',
+        'parking_lot_name': lot_name,
+        'parking_lot_address': lot_address,
+        'parking_timestamp': parking_time,
+        'leaving_timestamp': leaving_time,
+        'duration_hours': duration_hours if duration_hours else 'N/A',
+        'parking_cost': f"{reservation.parking_cost:.2f}" if reservation.parking_cost else '0.00',
+        'currency': 'USD',
+        'status': 'Completed' if reservation.leaving_timestamp else 'Active',
+        'remarks': getattr(reservation, 'remarks', '') or '',
+        'created_at': reservation.created_at.strftime('%Y-%m-%d %H:%M:%S') if hasattr(reservation, 'created_at') and reservation.created_at else ''
+    }
+
+def _deleted_csv_row(tombstone):
+    """Build the CSV row reporting a deleted reservation"""
+    row = dict.fromkeys(PARKING_CSV_FIELDNAMES, '')
+    row.update(reservation_id=tombstone.entity_id, status='Deleted')
+    return row
+
+def _iter_reservation_csv_rows(reservations):
+    """Lazily convert reservations into CSV rows"""
+    for reservation in reservations:
+        yield _reservation_csv_row(reservation)
+
+def _write_csv_data(file_obj, rows):
+    """Write CSV rows to file object, header first even when there are no rows"""
+    writer = csv.DictWriter(file_obj, fieldnames=PARKING_CSV_FIELDNAMES)
     writer.writeheader()
-    writer.writerows(data)
+    writer.writerows(rows)
 
 def generate_admin_parking_lots_csv(filename=None):
     """
@@ -187,6 +634,7 @@ def generate_admin_parking_lots_csv(filename=None):
                             'total_revenue', 'created_at']
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
+        register_export(filepath)
         
         return filepath
     
@@ -273,6 +721,7 @@ def generate_reservations_summary_csv(start_date=None, end_date=None, filename=N
                             'status', 'created_at']
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
+        register_export(filepath)
         
         return filepath
     
@@ -280,7 +729,60 @@ def generate_reservations_summary_csv(start_date=None, end_date=None, filename=N
         current_app.logger.error(f"Error generating reservations summary CSV: {str(e)}")
         raise
 
-def generate_user_activity_csv(user_id, start_date=None, end_date=None):
+def _iter_user_history(user_id, start_date=None, end_date=None, status=None):
+    """
+    Stream a user's live and archived reservations newest first
+
+    Runs one date-bounded query per table over its (user_id, parking_timestamp)
+    index and merges the two ordered streams.
+    """
+    names, descending = EXPORT_ORDERINGS['history']
+    streams = []
+    for model in (Reservation, ReservationArchive):
+        query = _keyset_query(user_id, 'history', model=model)
+        if start_date:
+            query = query.filter(model.parking_timestamp >= start_date)
+        if end_date:
+            query = query.filter(model.parking_timestamp <= end_date)
+        if status:
+            query = query.filter(model.status == status)
+        if model is Reservation:
+            query = query.options(joinedload(Reservation.parking_spot).joinedload(ParkingSpot.parking_lot))
+        streams.append(query.yield_per(EXPORT_CHUNK_SIZE))
+    return heapq.merge(*streams, key=attrgetter(*names), reverse=descending)
+
+def iter_user_activity_csv(user_id, start_date=None, end_date=None, status=None):
+    """
+    Stream CSV text of a user's activity within a date range
+
+    Reads the live and archived reservations in the range through
+    _iter_user_history and yields the header followed by one text block
+    per chunk.
+    
+    Args:
+        user_id (int): User ID
+        start_date (datetime): Start date filter
+        end_date (datetime): End date filter
+        status (str): Optional reservation status filter
+    
+    Yields:
+        str: CSV text
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=PARKING_CSV_FIELDNAMES)
+    writer.writeheader()
+    pending = 0
+    for reservation in _iter_user_history(user_id, start_date, end_date, status):
+        writer.writerow(_reservation_csv_row(reservation))
+        pending += 1
+        if pending == EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+def generate_user_activity_csv(user_id, start_date=None, end_date=None, status=None):
     """
     Generate CSV of specific user's activity within date range
     
@@ -288,6 +790,7 @@ def generate_user_activity_csv(user_id, start_date=None, end_date=None):
         user_id (int): User ID
         start_date (datetime): Start date filter
         end_date (datetime): End date filter
+        status (str): Optional reservation status filter
     
     Returns:
         str: CSV content as string
@@ -297,19 +800,8 @@ def generate_user_activity_csv(user_id, start_date=None, end_date=None):
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        # Build query
-        query = Reservation.query.filter_by(user_id=user_id)
-        
-        if start_date:
-            query = query.filter(Reservation.parking_timestamp >= start_date)
-        if end_date:
-            query = query.filter(Reservation.parking_timestamp <= end_date)
-        
-        reservations = query.order_by(Reservation.parking_timestamp.desc()).all()
-        
-        # Use existing function to generate CSV data
-        return generate_parking_csv(user_id, output_format='string')
+        return ''.join(iter_user_activity_csv(user.id, start_date, end_date, status))
     
     except Exception as e:
         current_app.logger.error(f"Error generating user activity CSV for user {user_id}: {str(e)}")
-        raise
\ No newline at end of file
+        raise
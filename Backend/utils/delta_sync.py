@@ -0,0 +1,155 @@
+"""
+Delta sync of parking lots and a user's reservations
+A sync returns an opaque version token; given the previous token only the
+lots and reservations created, changed or deleted since then are returned,
+found through the indexed updated_at columns and the sync_tombstones log.
+A full sync includes archived reservations; archiving moves rows without
+changing or deleting them, so delta syncs leave the client's copies alone.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, union
+from models import db
+from models.parking_lot import ParkingLot
+from models.parking_spot import ParkingSpot
+from models.reservation import Reservation
+from models.sync_tombstone import SyncTombstone
+from utils.reservation_archive import user_reservations
+
+TOKEN_VERSION = "1"
+
+# Token timestamps are naive microseconds since this epoch (no timezone conversion)
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class InvalidSyncToken(ValueError):
+    """The version token was not issued by this server"""
+
+
+def encode_token(position):
+    """Opaque, URL-safe version token for a sync position"""
+    parts = [
+        TOKEN_VERSION,
+        (position["lots"] - _EPOCH) // _MICROSECOND,
+        (position["reservations"] - _EPOCH) // _MICROSECOND,
+        position["tombstone"],
+        (position["issued_at"] - _EPOCH) // _MICROSECOND,
+    ]
+    return ".".join(str(part) for part in parts)
+
+
+def decode_token(token):
+    """Parse a version token, raising InvalidSyncToken if it is malformed"""
+    parts = token.split(".")
+    if parts[0] != TOKEN_VERSION or len(parts) != 5:
+        raise InvalidSyncToken("Malformed sync token")
+    try:
+        lots, reservations, tombstone, issued_at = (int(part) for part in parts[1:])
+        return {
+            "lots": _EPOCH + lots * _MICROSECOND,
+            "reservations": _EPOCH + reservations * _MICROSECOND,
+            "tombstone": tombstone,
+            "issued_at": _EPOCH + issued_at * _MICROSECOND,
+        }
+    except (ValueError, OverflowError) as e:
+        raise InvalidSyncToken("Malformed sync token") from e
+
+
+def current_position():
+    """
+    Sync position as of now
+
+    Taken before any rows are read, so a change committed while a sync is
+    running shows up in the next one. Lots and spots are stamped in local
+    time and reservations in UTC, hence one clock per table family.
+    """
+    return {
+        "lots": datetime.now(),
+        "reservations": datetime.utcnow(),
+        "tombstone": db.session.query(db.func.max(SyncTombstone.id)).scalar() or 0,
+        "issued_at": datetime.utcnow(),
+    }
+
+
+def _changed_lot_ids(since):
+    """Lots whose details changed, or whose spots were taken or freed, since a time"""
+    return union(
+        select(ParkingLot.id).where(ParkingLot.updated_at >= since),
+        select(ParkingSpot.lot_id).where(ParkingSpot.updated_at >= since),
+    )
+
+
+def sync_changes(user_id, token=None):
+    """
+    Lots and reservations of a user changed since a version token
+
+    Args:
+        user_id (int): Owner of the reservations
+        token (str): Token from the previous sync, None for a full sync
+
+    Returns:
+        dict: {version, full, lots, reservations, deleted: {lots, reservations}}
+
+    Raises:
+        InvalidSyncToken: If the token cannot be parsed
+    """
+    since = decode_token(token) if token else None
+    position = current_position()
+
+    retention = timedelta(days=current_app.config.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+    if since and since["issued_at"] < position["issued_at"] - retention:
+        # Deletions this old may have been purged: start over
+        since = None
+
+    lots_query = ParkingLot.query
+    reservations_query = None
+    deleted = {"lots": [], "reservations": []}
+
+    if since:
+        # Re-read a short window before the token so rows committed late by
+        # a concurrent transaction with an earlier timestamp are not skipped
+        overlap = timedelta(seconds=current_app.config.get("SYNC_CLOCK_OVERLAP_SECONDS", 5))
+        lots_query = lots_query.filter(ParkingLot.id.in_(_changed_lot_ids(since["lots"] - overlap)))
+        # Archived rows never change again, so only the live table can have news
+        reservations_query = Reservation.query.filter(
+            Reservation.user_id == user_id,
+            Reservation.updated_at >= since["reservations"] - overlap,
+        ).order_by(Reservation.id)
+
+        tombstones = (
+            db.session.query(SyncTombstone.entity, SyncTombstone.entity_id)
+            .filter(
+                SyncTombstone.id > since["tombstone"],
+                SyncTombstone.id <= position["tombstone"],
+                db.or_(
+                    SyncTombstone.entity == "parking_lot",
+                    SyncTombstone.user_id == user_id,
+                ),
+            )
+            .order_by(SyncTombstone.id)
+        )
+        for entity, entity_id in tombstones:
+            deleted["lots" if entity == "parking_lot" else "reservations"].append(entity_id)
+
+    if reservations_query is None:
+        # Full sync: the whole history, live and archived
+        reservations_query = user_reservations(user_id)
+
+    return {
+        "version": encode_token(position),
+        "full": since is None,
+        "lots": [lot.to_dict() for lot in lots_query.order_by(ParkingLot.id)],
+        "reservations": [reservation.to_dict() for reservation in reservations_query],
+        "deleted": deleted,
+    }
+
+
+def purge_tombstones(now=None):
+    """Delete tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS (caller commits)"""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=current_app.config.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+    return SyncTombstone.query.filter(SyncTombstone.deleted_at < cutoff).delete(
+        synchronize_session=False
+    )
@@ -0,0 +1,244 @@
+"""
+Durable email outbox
+send_email enqueues messages into the email_outbox table; the drain task
+claims due messages in batches, sends them over one SMTP connection under
+per-provider rate limits and retries failures with exponential backoff
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from celery import current_app as celery_app
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db
+from models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TASK = "jobs.email_jobs.drain_email_outbox"
+
+# Keys looked up per query when checking for duplicates
+DEDUPE_LOOKUP_SIZE = 500
+
+# Rate limit window in seconds
+RATE_WINDOW = 60
+
+
+def outbox_dedupe_key(subject, recipients, text_body, html_body, day=None):
+    """
+    Default dedupe key: identical content to the same recipients on the same (UTC) day
+
+    Callers with a natural identity (e.g. one monthly report per user and
+    month) should pass their own dedupe_key instead.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        json.dumps(sorted(recipients)),
+        subject,
+        text_body or "",
+        html_body or "",
+        (day or datetime.utcnow().date()).isoformat(),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _provider(recipients):
+    """Recipient domain used for rate limiting"""
+    address = recipients[0] if recipients else ""
+    return address.rsplit("@", 1)[-1].lower() if "@" in address else "default"
+
+
+def _digest_key(key):
+    """Store caller-supplied keys at a fixed length"""
+    return key if len(key) == 64 else hashlib.sha256(key.encode()).hexdigest()
+
+
+def enqueue_emails(messages):
+    """
+    Queue many emails with one commit
+
+    Args:
+        messages (iterable): Dicts with subject, recipients, text_body,
+            html_body and optionally dedupe_key
+
+    Returns:
+        int: Number of messages queued (duplicates are skipped)
+    """
+    entries = {}
+    for message in messages:
+        html_body = message.get("html_body")
+        if html_body is not None and not isinstance(html_body, str):
+            html_body = "".join(html_body)
+        key = message.get("dedupe_key")
+        key = _digest_key(key) if key else outbox_dedupe_key(
+            message["subject"], message["recipients"], message.get("text_body"), html_body
+        )
+        entries[key] = EmailOutbox(
+            dedupe_key=key,
+            subject=message["subject"],
+            recipients=list(message["recipients"]),
+            text_body=message.get("text_body"),
+            html_body=html_body,
+            provider=_provider(message["recipients"]),
+        )
+
+    keys = list(entries)
+    for i in range(0, len(keys), DEDUPE_LOOKUP_SIZE):
+        existing = db.session.query(EmailOutbox.dedupe_key).filter(
+            EmailOutbox.dedupe_key.in_(keys[i:i + DEDUPE_LOOKUP_SIZE])
+        )
+        for (key,) in existing:
+            entries.pop(key, None)
+
+    if not entries:
+        return 0
+
+    try:
+        db.session.add_all(entries.values())
+        db.session.commit()
+        queued = len(entries)
+    except IntegrityError:
+        # A concurrent producer queued some of the same messages: insert one by one
+        db.session.rollback()
+        queued = 0
+        for entry in entries.values():
+            try:
+                db.session.add(entry)
+                db.session.commit()
+                queued += 1
+            except IntegrityError:
+                db.session.rollback()
+
+    if queued:
+        kick_outbox_drain()
+    return queued
+
+
+def kick_outbox_drain():
+    """
+    Ask for a drain run now instead of waiting for the beat schedule
+
+    With Celery workers a burst of enqueues is debounced through the cache
+    into one drain task, and the 30 second beat drain picks up anything
+    queued while a kick was debounced. Without a cache, or with the in-process
+    job backend (which runs no beat unless JOB_LOCAL_BEAT is set), every
+    enqueue starts a drain: drains claim messages atomically, so concurrent
+    runs never send a message twice.
+    """
+    cache = current_app.extensions.get("cache")
+    debounce = cache and current_app.config.get("JOB_BACKEND") != "local"
+    if debounce and not cache.add("email_outbox:kick", True, 5):
+        return
+    try:
+        celery_app.send_task(DRAIN_TASK)
+    except Exception as e:
+        logger.error(f"Could not start email outbox drain: {e}")
+
+
+def claim_outbox_batch(batch_size, now=None):
+    """
+    Claim due messages for sending
+
+    Messages stuck in 'sending' longer than EMAIL_OUTBOX_CLAIM_TIMEOUT (the
+    drain that claimed them died) are claimed again.
+
+    Returns:
+        list: Claimed EmailOutbox entries
+    """
+    now = now or datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config.get("EMAIL_OUTBOX_CLAIM_TIMEOUT", 300))
+    due = db.or_(
+        db.and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+        db.and_(EmailOutbox.status == "sending", EmailOutbox.claimed_at < stale),
+    )
+    ids = [
+        entry_id for (entry_id,) in db.session.query(EmailOutbox.id)
+        .filter(due)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+    ]
+    if not ids:
+        return []
+
+    # Only rows still due are taken, so concurrent drains never share a message
+    token = str(uuid.uuid4())
+    EmailOutbox.query.filter(EmailOutbox.id.in_(ids), due).update(
+        {"status": "sending", "claim_token": token, "claimed_at": now},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id).all()
+
+
+class ProviderRateLimiter:
+    """
+    Per-provider send budget per RATE_WINDOW seconds
+
+    Counts are shared between drain workers through the cache; without a
+    cache they are tracked per drain run.
+    """
+
+    def __init__(self, limits, cache=None):
+        self.limits = limits or {}
+        self.cache = cache
+        self.local_counts = Counter()
+        self.window = int(time.time() // RATE_WINDOW)
+
+    def allow(self, provider):
+        """Take one send from the provider's budget, False if it is exhausted"""
+        limit = self.limits.get(provider, self.limits.get("default"))
+        if not limit:
+            return True
+        count = None
+        if self.cache:
+            count = self.cache.incr(f"email_rate:{provider}:{self.window}", RATE_WINDOW * 2)
+        if count is None:
+            self.local_counts[provider] += 1
+            count = self.local_counts[provider]
+        return count <= limit
+
+    def next_window(self):
+        """Start of the next rate limit window"""
+        return datetime.utcfromtimestamp((self.window + 1) * RATE_WINDOW)
+
+
+def mark_sent(entries, now=None):
+    """Record delivered messages and drop their bodies (caller commits)"""
+    now = now or datetime.utcnow()
+    for entry in entries:
+        entry.status = "sent"
+        entry.sent_at = now
+        entry.attempts += 1
+        entry.last_error = None
+        entry.claim_token = None
+        entry.text_body = None
+        entry.html_body = None
+
+
+def mark_failed(entry, error, now=None):
+    """Schedule a retry with exponential backoff, or give up after the last attempt (caller commits)"""
+    now = now or datetime.utcnow()
+    entry.attempts += 1
+    entry.last_error = error
+    entry.claim_token = None
+    if entry.attempts >= current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5):
+        entry.status = "failed"
+        logger.error(f"Giving up on email {entry.id} to {entry.recipients}: {error}")
+        return
+    base = current_app.config.get("EMAIL_OUTBOX_RETRY_BASE", 60)
+    entry.status = "pending"
+    entry.next_attempt_at = now + timedelta(seconds=min(base * 2 ** (entry.attempts - 1), 6 * 3600))
+
+
+def defer(entry, until):
+    """Put a claimed message back without counting an attempt (caller commits)"""
+    entry.status = "pending"
+    entry.claim_token = None
+    entry.next_attempt_at = until
@@ -0,0 +1,165 @@
+"""
+Publish/subscribe of live events (export progress, lot availability)
+Events go through Redis pub/sub when the cache is connected, so any API node
+can serve subscribers of events published by workers or other nodes; without
+Redis they are delivered in-process (single node, JOB_BACKEND = 'local')
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per in-process subscriber before new ones are dropped
+LOCAL_QUEUE_SIZE = 100
+
+
+class _LocalBus:
+    """In-process fan-out to subscriber queues"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def publish(self, channel, message):
+        with self.lock:
+            targets = list(self.subscribers.get(channel, ()))
+        for target in targets:
+            try:
+                target.put_nowait(message)
+            except queue.Full:
+                logger.warning(f"Dropping event on {channel}: subscriber is not keeping up")
+        return len(targets)
+
+    def subscribe(self, channels):
+        target = queue.Queue(LOCAL_QUEUE_SIZE)
+        with self.lock:
+            for channel in channels:
+                self.subscribers.setdefault(channel, set()).add(target)
+        return target
+
+    def unsubscribe(self, channels, target):
+        with self.lock:
+            for channel in channels:
+                targets = self.subscribers.get(channel)
+                if targets:
+                    targets.discard(target)
+                    if not targets:
+                        del self.subscribers[channel]
+
+
+_local_bus = _LocalBus()
+
+
+def _redis_client():
+    cache = current_app.extensions.get("cache")
+    return cache.redis_client if cache and cache.redis_client else None
+
+
+def publish(channel, payload):
+    """
+    Publish an event to a channel
+
+    Args:
+        channel (str): Channel name, e.g. 'export:<task_id>'
+        payload (dict): JSON-serializable event
+
+    Returns:
+        int: Number of subscribers reached (0 on error)
+    """
+    message = json.dumps(payload, default=str)
+    client = _redis_client()
+    if client is None:
+        return _local_bus.publish(channel, message)
+    try:
+        return client.publish(channel, message)
+    except Exception as e:
+        logger.error(f"Event publish error on {channel}: {e}")
+        return 0
+
+
+class Subscription:
+    """Events received on a set of channels; use through subscribe()"""
+
+    def __init__(self, channels, client=None):
+        self.channels = list(channels)
+        self.pubsub = None
+        self.local = None
+        if client is not None:
+            self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+            self.pubsub.subscribe(*self.channels)
+        else:
+            self.local = _local_bus.subscribe(self.channels)
+
+    def get(self, timeout):
+        """
+        Wait up to timeout seconds for the next event
+
+        Returns:
+            dict: The event payload, or None if nothing arrived in time
+        """
+        if self.local is not None:
+            try:
+                return json.loads(self.local.get(timeout=timeout))
+            except queue.Empty:
+                return None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # Subscribe confirmations come back as None before the deadline
+            message = self.pubsub.get_message(timeout=remaining)
+            if message and message.get("type") == "message":
+                return json.loads(message["data"])
+
+    def close(self):
+        if self.pubsub is not None:
+            try:
+                self.pubsub.close()
+            except Exception as e:
+                logger.error(f"Event unsubscribe error: {e}")
+        if self.local is not None:
+            _local_bus.unsubscribe(self.channels, self.local)
+
+
+@contextmanager
+def subscribe(channels):
+    """
+    Subscribe to channels for the duration of the block
+
+    Subscribe before reading the current state the events describe, so no
+    change can slip in between the read and the subscription.
+    """
+    client = _redis_client()
+    try:
+        subscription = Subscription(channels, client)
+    except Exception as e:
+        logger.error(f"Event subscribe error, falling back to in-process events: {e}")
+        subscription = Subscription(channels)
+    try:
+        yield subscription
+    finally:
+        subscription.close()
+
+
+def sse_event(data, event=None, event_id=None):
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_comment(text="keepalive"):
+    """SSE comment line, keeps idle connections and proxies from timing out"""
+    return f": {text}\n\n"
@@ -0,0 +1,211 @@
+"""
+Content-addressed registry of CSV exports
+Identical export requests share one Celery task while it runs and reuse the
+finished file until the user's reservation data changes; progress of a
+running export is published on its event channel for streaming clients
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from flask import current_app
+from sqlalchemy import func
+from models import db
+from models.reservation import Reservation
+from utils.event_bus import publish
+from utils.export_store import INPROGRESS_DIR
+
+# Celery states in which an export can still be attached to
+IN_FLIGHT_STATES = {"PENDING", "RECEIVED", "STARTED", "PROGRESS", "RETRY"}
+# States after which an export sends no more progress
+FINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+
+def user_data_version(user_id):
+    """
+    Get the version of a user's reservation data
+
+    Uses the (user_id, updated_at) index: the newest change plus the row count
+    (so deletions also produce a new version).
+    """
+    last_updated_at, row_count = (
+        db.session.query(func.max(Reservation.updated_at), func.count(Reservation.id))
+        .filter(Reservation.user_id == user_id)
+        .one()
+    )
+    return f"{last_updated_at.isoformat() if last_updated_at else '-'}:{row_count}"
+
+
+def export_key(user_id, filters, data_version):
+    """Build the content address of an export from its owner, filters and data version"""
+    payload = json.dumps(
+        {"user_id": str(user_id), "filters": filters, "version": data_version},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _registry_key(key):
+    return f"export:{key}"
+
+
+def _file_exists(filename):
+    return os.path.isfile(os.path.join(current_app.config["EXPORT_FOLDER"], filename))
+
+
+def find_or_claim_export(cache, key, task_state):
+    """
+    Resolve an export request against the registry
+
+    Args:
+        cache (CacheManager): Cache used as registry, may be None
+        key (str): Content address from export_key()
+        task_state (callable): Returns the Celery state for a task id
+
+    Returns:
+        tuple: (action, entry) where action is 'ready' (finished file can be
+            reused), 'attach' (identical export is running) or 'start' (entry
+            holds the claimed task id for a new export)
+    """
+    task_id = str(uuid.uuid4())
+    if not cache:
+        return "start", {"task_id": task_id}
+
+    claim_ttl = current_app.config.get("EXPORT_CLAIM_TTL", 3600)
+    entry = cache.get(_registry_key(key))
+
+    if entry:
+        if entry.get("filename") and _file_exists(entry["filename"]):
+            return "ready", entry
+        if not entry.get("filename") and task_state(entry["task_id"]) in IN_FLIGHT_STATES:
+            return "attach", entry
+        # Finished file was evicted or the task failed: start over
+        cache.delete(_registry_key(key))
+
+    claim = {"task_id": task_id}
+    if cache.add(_registry_key(key), claim, claim_ttl):
+        return "start", claim
+
+    # Lost the race against an identical request: attach to its task. If the
+    # claim failed without a readable entry (cache error), no task is running.
+    entry = cache.get(_registry_key(key))
+    if entry and entry.get("filename") and _file_exists(entry["filename"]):
+        return "ready", entry
+    if entry and not entry.get("filename") and task_state(entry["task_id"]) in IN_FLIGHT_STATES:
+        return "attach", entry
+    return "start", claim
+
+
+def remember_export(key, task_id, filename, download_url):
+    """Record the finished file for an export key so repeat requests reuse it"""
+    cache = current_app.extensions.get("cache")
+    if not cache or not key:
+        return
+    ttl = current_app.config.get("EXPORT_REUSE_TTL", 6 * 24 * 3600)
+    cache.set(
+        _registry_key(key),
+        {"task_id": task_id, "filename": filename, "download_url": download_url},
+        ttl,
+    )
+
+
+def forget_export(key):
+    """Drop a registry entry, e.g. after its export failed"""
+    cache = current_app.extensions.get("cache")
+    if cache and key:
+        cache.delete(_registry_key(key))
+
+
+def _task_marker_path(task_id, kind):
+    """
+    Path of a per-task marker file next to the export's checkpoint
+
+    Ownership and cancel flags live on the export volume (shared by the web
+    app and the export workers) rather than in the cache, so cancelling works
+    without Redis; the export store sweep removes them with stale partials.
+    Returns None for anything that is not a task id.
+    """
+    try:
+        task_id = str(uuid.UUID(task_id))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return os.path.join(current_app.config["EXPORT_FOLDER"], INPROGRESS_DIR, f"{task_id}.{kind}")
+
+
+def remember_export_owner(task_id, user_id):
+    """Record which user started an export task (checked before cancelling)"""
+    path = _task_marker_path(task_id, "owner")
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(str(user_id))
+    os.replace(tmp_path, path)
+
+
+def export_owner(task_id):
+    """Get the user id that started an export task, or None if unknown"""
+    path = _task_marker_path(task_id, "owner")
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return fh.read().strip() or None
+    except (TypeError, FileNotFoundError):
+        return None
+
+
+def request_export_cancel(task_id):
+    """Flag a running export for cancellation at its next chunk boundary"""
+    path = _task_marker_path(task_id, "cancel")
+    if not path:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "a").close()
+    return True
+
+
+def export_cancel_requested(task_id):
+    """Check whether cancellation was requested for an export task"""
+    path = _task_marker_path(task_id, "cancel")
+    return bool(path and os.path.exists(path))
+
+
+def export_channel(task_id):
+    """Event channel carrying an export task's progress"""
+    return f"export:{task_id}"
+
+
+def publish_export_event(task_id, state, meta=None):
+    """Push an export's new state to subscribers of its channel"""
+    publish(export_channel(task_id), {"state": state, **(meta or {})})
+
+
+def export_status(result):
+    """
+    Snapshot of an export task in the shape of its published events
+
+    Args:
+        result (AsyncResult): The export task's result handle
+
+    Returns:
+        dict: state plus progress fields, the result or the error
+    """
+    state = result.state
+    if state == "PROGRESS":
+        info = result.info or {}
+        return {
+            "state": state,
+            "current": info.get("current", 0),
+            "total": info.get("total", 1),
+            "percent": info.get("percent", 0),
+            "status": info.get("status", ""),
+        }
+    if state == "SUCCESS":
+        return {"state": state, "result": result.result}
+    if state == "REVOKED":
+        return {"state": state, "status": "Export cancelled"}
+    if state == "FAILURE":
+        return {"state": state, "error": str(result.info)}
+    return {"state": state}
@@ -0,0 +1,211 @@
+"""
+Export storage manager
+Tracks export files in the export_files index, enforces per-user and global
+byte quotas with LRU eviction at write time and expires files through an
+index query instead of scanning EXPORT_FOLDER; abandoned partial exports are
+swept from EXPORT_FOLDER/.inprogress
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from models import db
+from models.export_file import ExportFile
+
+logger = logging.getLogger(__name__)
+
+# Index rows deleted per round trip during cleanup
+CLEANUP_BATCH_SIZE = 500
+
+# Subfolder of EXPORT_FOLDER holding partial exports and their checkpoints
+INPROGRESS_DIR = ".inprogress"
+
+
+def _export_path(filename):
+    return os.path.join(current_app.config.get("EXPORT_FOLDER", "./exports"), filename)
+
+
+def _remove_file(entry):
+    """Delete an export from disk and the index (caller commits)"""
+    try:
+        os.remove(_export_path(entry.filename))
+    except FileNotFoundError:
+        pass
+    db.session.delete(entry)
+
+
+def _used_bytes(user_id=None):
+    """Total indexed bytes, for one user or globally"""
+    query = db.session.query(func.coalesce(func.sum(ExportFile.size_bytes), 0))
+    if user_id is not None:
+        query = query.filter(ExportFile.user_id == user_id)
+    return query.scalar()
+
+
+def _evict_lru(needed_bytes, quota, user_id=None, keep=None):
+    """
+    Evict least recently used exports until needed_bytes fit in quota
+
+    Returns:
+        int: Number of files evicted
+    """
+    used = _used_bytes(user_id)
+    if used + needed_bytes <= quota:
+        return 0
+
+    query = ExportFile.query
+    if user_id is not None:
+        query = query.filter(ExportFile.user_id == user_id)
+    if keep is not None:
+        query = query.filter(ExportFile.filename != keep)
+
+    evicted = 0
+    for entry in query.order_by(ExportFile.last_accessed_at.asc()).yield_per(100):
+        if used + needed_bytes <= quota:
+            break
+        used -= entry.size_bytes
+        _remove_file(entry)
+        evicted += 1
+        logger.info(f"Evicted export file {entry.filename} ({entry.size_bytes} bytes)")
+    return evicted
+
+
+def register_export(filepath, user_id=None):
+    """
+    Add a freshly written export to the index, evicting older exports if the
+    owner's or the global quota would be exceeded
+
+    Args:
+        filepath (str): Path of the written file in EXPORT_FOLDER
+        user_id (int): Owner of the export, None for admin/system exports
+
+    Returns:
+        ExportFile: Index entry for the file
+    """
+    filename = os.path.basename(filepath)
+    size = os.path.getsize(filepath)
+    ttl_days = current_app.config.get("EXPORT_TTL_DAYS", 7)
+    user_quota = current_app.config.get("EXPORT_USER_QUOTA_BYTES")
+    global_quota = current_app.config.get("EXPORT_GLOBAL_QUOTA_BYTES")
+
+    if user_id is not None and user_quota:
+        _evict_lru(size, user_quota, user_id=user_id, keep=filename)
+    if global_quota:
+        _evict_lru(size, global_quota, keep=filename)
+
+    now = datetime.utcnow()
+    entry = ExportFile.query.filter_by(filename=filename).first()
+    if not entry:
+        entry = ExportFile(filename=filename, created_at=now)
+        db.session.add(entry)
+    entry.user_id = int(user_id) if user_id is not None else None
+    entry.size_bytes = size
+    entry.last_accessed_at = now
+    entry.expires_at = now + timedelta(days=ttl_days)
+    db.session.commit()
+    return entry
+
+
+def touch_export(filename):
+    """Mark an export as recently used (called on download)"""
+    entry = ExportFile.query.filter_by(filename=filename).first()
+    if entry:
+        entry.touch()
+        db.session.commit()
+    return entry
+
+
+def cleanup_expired_exports(now=None):
+    """
+    Delete expired exports found through the expires_at index
+
+    Returns:
+        int: Number of files deleted
+    """
+    now = now or datetime.utcnow()
+    deleted = 0
+    while True:
+        expired = (
+            ExportFile.query.filter(ExportFile.expires_at <= now)
+            .order_by(ExportFile.expires_at.asc())
+            .limit(CLEANUP_BATCH_SIZE)
+            .all()
+        )
+        if not expired:
+            break
+        for entry in expired:
+            _remove_file(entry)
+            logger.info(f"Deleted expired export file: {entry.filename}")
+        db.session.commit()
+        deleted += len(expired)
+    return deleted
+
+
+def cleanup_stale_partials(now=None):
+    """
+    Delete partial exports, checkpoints and task markers abandoned by their task
+
+    A running export rewrites its partial file and checkpoint every chunk, so
+    anything in EXPORT_FOLDER/.inprogress untouched for EXPORT_CLAIM_TTL
+    belongs to a task that was killed and not retried (or finished long ago,
+    for owner and cancel markers). The folder only holds
+    in-progress work, so scanning it stays cheap.
+
+    Returns:
+        int: Number of files deleted
+    """
+    partial_dir = _export_path(INPROGRESS_DIR)
+    if not os.path.isdir(partial_dir):
+        return 0
+
+    cutoff = (now or time.time()) - current_app.config.get("EXPORT_CLAIM_TTL", 3600)
+    deleted = 0
+    with os.scandir(partial_dir) as entries:
+        for item in entries:
+            try:
+                if item.is_file() and item.stat().st_mtime < cutoff:
+                    os.remove(item.path)
+                    deleted += 1
+                    logger.info(f"Deleted abandoned partial export: {item.name}")
+            except FileNotFoundError:
+                # Finished or discarded by its task meanwhile
+                pass
+    return deleted
+
+
+def index_untracked_exports():
+    """
+    One-off reconciliation: index files in EXPORT_FOLDER that predate the
+    export store, using their modification time as creation time
+
+    Returns:
+        int: Number of files indexed
+    """
+    export_folder = current_app.config.get("EXPORT_FOLDER", "./exports")
+    if not os.path.isdir(export_folder):
+        return 0
+
+    ttl_days = current_app.config.get("EXPORT_TTL_DAYS", 7)
+    known = {name for (name,) in db.session.query(ExportFile.filename)}
+    indexed = 0
+    with os.scandir(export_folder) as entries:
+        for item in entries:
+            if not item.is_file() or item.name in known:
+                continue
+            stat = item.stat()
+            modified = datetime.utcfromtimestamp(stat.st_mtime)
+            db.session.add(
+                ExportFile(
+                    filename=item.name,
+                    size_bytes=stat.st_size,
+                    created_at=modified,
+                    last_accessed_at=modified,
+                    expires_at=modified + timedelta(days=ttl_days),
+                )
+            )
+            indexed += 1
+    db.session.commit()
+    return indexed
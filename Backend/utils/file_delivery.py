@@ -0,0 +1,106 @@
+"""
+Delivery of generated export files to HTTP clients
+Negotiates Content-Encoding, supports Range/conditional requests and
+optionally hands the transfer off to the front proxy
+"""
+
+import gzip
+import os
+from flask import Response, current_app, request, send_file, stream_with_context
+
+# Content-Encoding for each compressed export suffix
+ENCODING_BY_SUFFIX = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+# Bytes read per iteration when decompressing for clients without encoding support
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def _split_encoding(filename):
+    """Return (download name, content encoding) for a stored export filename"""
+    base, suffix = os.path.splitext(filename)
+    encoding = ENCODING_BY_SUFFIX.get(suffix)
+    if encoding:
+        return base, encoding
+    return filename, None
+
+
+def _client_accepts(encoding):
+    """Check whether the client accepts the given content encoding"""
+    return request.accept_encodings.quality(encoding) > 0
+
+
+def _accel_redirect_response(filename, download_name, encoding):
+    """Let the front proxy (nginx X-Accel-Redirect style) stream the file"""
+    prefix = current_app.config['EXPORT_ACCEL_REDIRECT_PREFIX']
+    header = current_app.config.get('EXPORT_ACCEL_REDIRECT_HEADER', 'X-Accel-Redirect')
+
+    response = Response(mimetype='text/csv')
+    response.headers[header] = prefix.rstrip('/') + '/' + filename
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _decompressed_stream(file_path, encoding):
+    """Yield decompressed blocks of a compressed export"""
+    if encoding == 'gzip':
+        opener = gzip.open
+    else:
+        import zstandard
+        opener = zstandard.open
+
+    with opener(file_path, 'rb') as fh:
+        while True:
+            block = fh.read(STREAM_BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+def send_export_file(file_path):
+    """
+    Send an export file, letting the client or proxy do the heavy lifting
+
+    Compressed exports are served as-is with a Content-Encoding header when the
+    client accepts it, so Range and If-None-Match/If-Modified-Since requests
+    apply to the stored bytes. Clients that do not accept the encoding get a
+    decompressed stream instead (without Range support).
+
+    Args:
+        file_path (str): Path of the export inside EXPORT_FOLDER
+
+    Returns:
+        Response: Flask response for the download
+    """
+    filename = os.path.basename(file_path)
+    download_name, encoding = _split_encoding(filename)
+    negotiated = encoding is None or _client_accepts(encoding)
+
+    if negotiated and current_app.config.get('EXPORT_ACCEL_REDIRECT_PREFIX'):
+        response = _accel_redirect_response(filename, download_name, encoding)
+    elif negotiated:
+        response = send_file(
+            file_path,
+            mimetype='text/csv',
+            as_attachment=True,
+            download_name=download_name,
+            conditional=True,
+            etag=True,
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    else:
+        response = Response(
+            stream_with_context(_decompressed_stream(file_path, encoding)),
+            mimetype='text/csv',
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        response.headers['Accept-Ranges'] = 'none'
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
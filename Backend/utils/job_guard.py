@@ -0,0 +1,132 @@
+"""
+Overlap and idempotency guard for scheduled jobs
+A Redis lease lock keeps two runs of a job from overlapping, and a job_runs
+record per (job, period) makes a given day or month get processed only once.
+Jobs that fan their work out to other tasks stay 'running' until the fan-out
+reports back through finish_job_run.
+"""
+
+import logging
+from contextlib import contextmanager
+from flask import current_app
+from models import db
+from models.job_run import JobRun
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def job_lease(job_name, lease_seconds):
+    """
+    Hold the job's lease lock for the duration of the block
+
+    Yields True if the lock was taken (or no cache is configured, in which
+    case the job_runs record is the only guard) and False if another run
+    holds it. The lock expires after lease_seconds if the worker dies.
+    """
+    cache = current_app.extensions.get('cache')
+    if not cache:
+        yield True
+        return
+
+    key = f"job_lock:{job_name}"
+    token = cache.acquire_lock(key, lease_seconds)
+    if not token:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        cache.release_lock(key, token)
+
+
+class Dispatched:
+    """
+    Result of a job whose work continues in other tasks (e.g. a chord)
+
+    The run stays 'running' until the fan-out calls finish_job_run; if that
+    never happens, the run goes stale after SCHEDULED_JOB_LEASE and the
+    period can be claimed again.
+    """
+
+    def __init__(self, summary):
+        self.summary = summary
+
+
+class Failed:
+    """
+    Result of a job that ran to the end but did not do all of its work
+
+    The run is recorded as failed with the summary as its error, so a later
+    run without force processes the period again.
+    """
+
+    def __init__(self, summary):
+        self.summary = summary
+
+
+def run_scheduled_job(job_name, period, func, force=False):
+    """
+    Run func once for the job's period, skipping overlapping runs
+
+    Args:
+        job_name (str): Name of the scheduled job
+        period (str): Period the run processes, e.g. '2025-07-01' or '2025-07'
+        func (callable): Called with the claimed JobRun; does the work and
+            returns a result summary, Dispatched if other tasks finish it
+            or Failed if part of the work failed
+        force (bool): Run again even if the period is already completed
+
+    Returns:
+        The result of func, or a message explaining why the run was skipped
+    """
+    lease_seconds = current_app.config.get('SCHEDULED_JOB_LEASE', 1800)
+
+    with job_lease(job_name, lease_seconds) as acquired:
+        if not acquired:
+            logger.info(f"{job_name} is already running, skipping this run")
+            return f"{job_name} already running, skipped"
+
+        run = JobRun.claim(job_name, period, lease_seconds, force=force)
+        if run is None:
+            logger.info(f"{job_name} already processed or processing {period}, skipping this run")
+            return f"{job_name} already processed or in progress for {period}, skipped"
+
+        try:
+            result = func(run)
+        except Exception as e:
+            db.session.rollback()
+            run.finish(error=str(e))
+            db.session.commit()
+            raise
+
+        if isinstance(result, Dispatched):
+            run.result = result.summary
+            db.session.commit()
+            return result.summary
+
+        if isinstance(result, Failed):
+            run.finish(result=result.summary, error=result.summary)
+            db.session.commit()
+            return result.summary
+
+        run.finish(result=result)
+        db.session.commit()
+        return result
+
+
+def finish_job_run(job_name, period, attempt, result=None, error=None):
+    """
+    Record the outcome of a dispatched run
+
+    Only the attempt that dispatched the work is finished, so a late callback
+    cannot close a newer run that re-claimed the period after the lease.
+
+    Returns:
+        bool: True if the run was finished
+    """
+    finished = JobRun.finish_attempt(job_name, period, attempt, result=result, error=error)
+    db.session.commit()
+    if not finished:
+        logger.warning(f"{job_name} run {attempt} for {period} was no longer running")
+    return finished
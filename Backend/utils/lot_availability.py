@@ -0,0 +1,78 @@
+"""
+Live parking lot availability
+Spot counts per lot come from one grouped query; after bookings, releases and
+admin lot edits commit, the new counts of the affected lots are published on
+the event bus for the availability stream
+"""
+
+import logging
+from sqlalchemy import case, func
+from models import db
+from models.parking_lot import ParkingLot
+from models.parking_spot import ParkingSpot
+from utils.event_bus import publish
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_CHANNEL = "lots:availability"
+
+
+def lot_availability(lot_ids=None):
+    """
+    Spot counts of parking lots
+
+    Args:
+        lot_ids (iterable): Lots to count, all lots if None
+
+    Returns:
+        list: Compact per-lot entries {id, available, occupied, total, active, price}
+    """
+    query = (
+        db.session.query(
+            ParkingLot.id,
+            ParkingLot.number_of_spots,
+            ParkingLot.is_active,
+            ParkingLot.price,
+            func.coalesce(func.sum(case((ParkingSpot.status == "A", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((ParkingSpot.status == "O", 1), else_=0)), 0),
+        )
+        .outerjoin(ParkingSpot, ParkingSpot.lot_id == ParkingLot.id)
+        .group_by(ParkingLot.id)
+        .order_by(ParkingLot.id)
+    )
+    if lot_ids is not None:
+        query = query.filter(ParkingLot.id.in_(list(lot_ids)))
+
+    return [
+        {
+            "id": lot_id,
+            "available": int(available),
+            "occupied": int(occupied),
+            "total": total,
+            "active": is_active,
+            "price": float(price),
+        }
+        for lot_id, total, is_active, price, available, occupied in query
+    ]
+
+
+def publish_lot_availability(lot_ids=(), removed=()):
+    """
+    Push the current availability of changed lots to stream subscribers
+
+    Call after the change is committed. Entries carry the lots' full counts,
+    not increments, so a missed event is corrected by the next one. Errors
+    are logged and never fail the request that made the change.
+
+    Args:
+        lot_ids (iterable): Lots whose spots or details changed
+        removed (iterable): Lots that were deleted
+    """
+    try:
+        lot_ids = list(lot_ids)
+        event = {"lots": lot_availability(lot_ids) if lot_ids else []}
+        if removed:
+            event["removed"] = list(removed)
+        publish(AVAILABILITY_CHANNEL, event)
+    except Exception as e:
+        logger.error(f"Could not publish availability of lots {list(lot_ids)}: {e}")
@@ -1,11 +1,55 @@
+import smtplib
 from flask_mail import Message
 from flask import current_app
+from utils.email_outbox import enqueue_emails
 
 
-def send_email(subject, recipients, text_body, html_body):
-    """Send an email using Flask-Mail."""
-    msg = Message(subject, recipients=recipients)
-    msg.body = text_body
-    msg.html = html_body
-    current_app.extensions['mail'].send(msg)
+def send_email(subject, recipients, text_body, html_body, dedupe_key=None):
+    """Queue an email in the outbox; the outbox drain task delivers it.
 
+    html_body may be a string or an iterable of chunks (e.g. a streamed
+    template render), which is joined once when the message is queued.
+    Messages with the same dedupe_key (by default: same recipients and
+    content on the same day) are only queued once.
+
+    Returns:
+        bool: True if queued, False if it was a duplicate
+    """
+    return enqueue_emails([{
+        'subject': subject,
+        'recipients': recipients,
+        'text_body': text_body,
+        'html_body': html_body,
+        'dedupe_key': dedupe_key,
+    }]) == 1
+
+
+def send_bulk_email(messages):
+    """Send many emails over a single SMTP connection.
+
+    The connection is opened once for the whole batch (Flask-Mail reconnects
+    after MAIL_MAX_EMAILS messages if set) and reopened once if the server
+    drops it. A failing message does not stop the rest of the batch.
+
+    Args:
+        messages (iterable): Dicts with subject, recipients, text_body and html_body
+
+    Returns:
+        tuple: (list of sent messages, list of (message, error) for failed ones)
+    """
+    sent, failed = [], []
+    with current_app.extensions['mail'].connect() as connection:
+        for message in messages:
+            msg = Message(message['subject'], recipients=message['recipients'])
+            msg.body = message['text_body']
+            msg.html = message['html_body']
+            try:
+                try:
+                    connection.send(msg)
+                except smtplib.SMTPServerDisconnected:
+                    connection.host = connection.configure_host()
+                    connection.send(msg)
+                sent.append(message)
+            except Exception as e:
+                failed.append((message, str(e)))
+    return sent, failed
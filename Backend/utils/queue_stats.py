@@ -0,0 +1,101 @@
+"""
+Celery queue depth and wait time per workload class
+Depth and the age of the oldest waiting task are read from the Redis broker;
+wait times of started tasks are sampled by the workers into the cache
+"""
+
+import json
+import logging
+import time
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Wait time samples kept per queue
+WAIT_SAMPLES = 200
+
+
+def _wait_key(queue):
+    return f"queue_wait:{queue}"
+
+
+def record_queue_wait(request):
+    """
+    Sample how long a task waited in its queue (called as the task starts)
+
+    Uses the enqueued_at header stamped at publish time; direct calls and
+    eager tasks have no delivery info and are ignored.
+    """
+    delivery_info = request.get('delivery_info') or {}
+    queue = delivery_info.get('routing_key')
+    enqueued_at = request.get('enqueued_at') or (request.get('headers') or {}).get('enqueued_at')
+    if not queue or not enqueued_at:
+        return
+
+    cache = current_app.extensions.get('cache')
+    if cache:
+        cache.push_recent(_wait_key(queue), round(time.time() - float(enqueued_at), 3), WAIT_SAMPLES)
+
+
+def _broker_keys(queue, transport_options):
+    """Redis list keys holding a queue's messages, one per priority level"""
+    sep = transport_options.get('sep', ':')
+    steps = transport_options.get('priority_steps') or [0]
+    return [queue if step == steps[0] else f"{queue}{sep}{step}" for step in steps]
+
+
+def _enqueued_at(raw_message):
+    try:
+        return float(json.loads(raw_message)['headers']['enqueued_at'])
+    except (TypeError, ValueError, KeyError):
+        return None
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def queue_stats(celery, queues):
+    """
+    Depth and wait times for each queue
+
+    Args:
+        celery (Celery): App whose broker is inspected (Redis transport)
+        queues (iterable): Queue names
+
+    Returns:
+        dict: {queue: {depth, oldest_wait_seconds, recent_wait: {samples, avg, p95, max}}}
+    """
+    transport_options = celery.conf.broker_transport_options or {}
+    cache = current_app.extensions.get('cache')
+    now = time.time()
+    stats = {}
+
+    with celery.connection_for_read() as connection:
+        client = connection.default_channel.client
+        for queue in queues:
+            depth = 0
+            oldest = None
+            for key in _broker_keys(queue, transport_options):
+                length = client.llen(key)
+                if not length:
+                    continue
+                depth += length
+                # Messages are pushed on the left and consumed from the right
+                enqueued_at = _enqueued_at(client.lindex(key, -1))
+                if enqueued_at and (oldest is None or enqueued_at < oldest):
+                    oldest = enqueued_at
+
+            waits = cache.get_recent(_wait_key(queue)) if cache else []
+            stats[queue] = {
+                'depth': depth,
+                'oldest_wait_seconds': round(now - oldest, 3) if oldest else None,
+                'recent_wait': {
+                    'samples': len(waits),
+                    'avg': round(sum(waits) / len(waits), 3) if waits else None,
+                    'p95': _percentile(waits, 0.95) if waits else None,
+                    'max': max(waits) if waits else None,
+                },
+            }
+    return stats
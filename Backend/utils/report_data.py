@@ -0,0 +1,179 @@
+"""
+Set-based data preparation for monthly reports
+A single ordered query over the month's reservations is folded into per-user
+aggregates (totals, lot usage, daily costs, detailed stats, recent rows), so
+report rendering never touches the ORM. Per-user metrics are computed from
+columnar arrays by utils.stats_engine. Archived reservations are included, so
+reports of any month cover the reservations archive as well
+"""
+
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import select, union, union_all
+from models import db
+from models.user import User
+from models.parking_lot import ParkingLot
+from models.parking_spot import ParkingSpot
+from models.reservation import Reservation
+from models.reservation_archive import ReservationArchive
+
+# Rows fetched per database round trip while aggregating
+AGGREGATE_FETCH_SIZE = 2000
+
+# Reservations listed in the report table
+RECENT_RESERVATIONS_LIMIT = 10
+
+
+def month_window(month=None, today=None):
+    """
+    Get the [start, end) datetimes of a calendar month
+
+    Args:
+        month (str): 'YYYY-MM', defaults to the month before `today`
+        today (datetime): Reference date, defaults to now
+
+    Returns:
+        tuple: (start, end) with end exclusive
+    """
+    if month:
+        start = datetime.strptime(month, "%Y-%m")
+    else:
+        today = today or datetime.now()
+        last_day_previous_month = datetime(today.year, today.month, 1) - timedelta(days=1)
+        start = datetime(last_day_previous_month.year, last_day_previous_month.month, 1)
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
+def monthly_report_user_ids(start, end):
+    """
+    Get the ids of active users with reservations in [start, end)
+
+    Used to split report generation into chunks of users.
+
+    Returns:
+        list: User ids in ascending order
+    """
+    user_ids = union(*(
+        select(model.user_id)
+        .join(User, User.id == model.user_id)
+        .where(
+            User.role == 'user',
+            User.is_active.is_(True),
+            model.parking_timestamp >= start,
+            model.parking_timestamp < end,
+        )
+        for model in (Reservation, ReservationArchive)
+    )).subquery()
+    query = db.session.query(user_ids.c.user_id).order_by(user_ids.c.user_id)
+    return [user_id for (user_id,) in query]
+
+
+def _monthly_rows(start, end, user_ids=None):
+    """Stream (user_id, username, email, parking, leaving, cost, lot_name) ordered by user"""
+    live = (
+        select(
+            Reservation.user_id,
+            User.username,
+            User.email,
+            Reservation.parking_timestamp,
+            Reservation.leaving_timestamp,
+            Reservation.parking_cost,
+            ParkingLot.prime_location_name.label('lot_name'),
+        )
+        .join(User, User.id == Reservation.user_id)
+        .join(ParkingSpot, ParkingSpot.id == Reservation.spot_id)
+        .join(ParkingLot, ParkingLot.id == ParkingSpot.lot_id)
+    )
+    # Archived rows carry their lot name, so no spot or lot join is needed
+    archived = (
+        select(
+            ReservationArchive.user_id,
+            User.username,
+            User.email,
+            ReservationArchive.parking_timestamp,
+            ReservationArchive.leaving_timestamp,
+            ReservationArchive.parking_cost,
+            ReservationArchive.lot_name,
+        )
+        .join(User, User.id == ReservationArchive.user_id)
+    )
+
+    selects = []
+    for query, model in ((live, Reservation), (archived, ReservationArchive)):
+        query = query.where(
+            User.role == 'user',
+            User.is_active.is_(True),
+            model.parking_timestamp >= start,
+            model.parking_timestamp < end,
+        )
+        if user_ids is not None:
+            query = query.where(model.user_id.in_(user_ids))
+        selects.append(query)
+
+    rows = union_all(*selects).subquery()
+    return db.session.query(rows).order_by(
+        rows.c.user_id, rows.c.parking_timestamp.desc()
+    ).yield_per(AGGREGATE_FETCH_SIZE)
+
+
+def _aggregate_user(user_id, rows):
+    """Fold one user's rows (newest first) into report aggregates"""
+    # NumPy is only loaded by report workers, never by the web app
+    from utils import stats_engine
+
+    rows = list(rows)
+    _, username, email = rows[0][:3]
+    parking_times = [row[3] for row in rows]
+    leaving_times = [row[4] for row in rows]
+    costs = [float(row[5] or 0) for row in rows]
+    lot_names = [row[6] for row in rows]
+
+    parking = stats_engine.epoch_seconds(parking_times)
+    leaving = stats_engine.epoch_seconds(leaving_times)
+    lot_usage = stats_engine.lot_usage_counts(lot_names)
+
+    recent = [
+        {
+            'date': parked.strftime('%m/%d') if parked else 'N/A',
+            'lot_name': lot_name,
+            'duration_hours': (left - parked).total_seconds() / 3600 if parked and left else None,
+            'cost': cost,
+            'completed': left is not None,
+        }
+        for parked, left, cost, lot_name in zip(
+            parking_times[:RECENT_RESERVATIONS_LIMIT],
+            leaving_times[:RECENT_RESERVATIONS_LIMIT],
+            costs[:RECENT_RESERVATIONS_LIMIT],
+            lot_names[:RECENT_RESERVATIONS_LIMIT],
+        )
+    ]
+
+    return {
+        'user': {'id': user_id, 'username': username, 'email': email},
+        'total_bookings': len(costs),
+        'total_cost': sum(costs),
+        'lot_usage': lot_usage,
+        'most_used_lot': next(iter(lot_usage.items()), None),
+        'daily_costs': stats_engine.daily_cost_series(parking, costs),
+        'detailed_stats': stats_engine.detailed_stats(parking, leaving, costs),
+        'recent_reservations': recent,
+    }
+
+
+def iter_monthly_user_aggregates(start, end, user_ids=None):
+    """
+    Yield per-user report aggregates for users with activity in [start, end)
+
+    Args:
+        start (datetime): Window start (inclusive)
+        end (datetime): Window end (exclusive)
+        user_ids (list): Optionally restrict to these users
+
+    Yields:
+        dict: user, total_bookings, total_cost, lot_usage, most_used_lot,
+            daily_costs, detailed_stats and recent_reservations
+    """
+    for user_id, rows in groupby(_monthly_rows(start, end, user_ids), key=itemgetter(0)):
+        yield _aggregate_user(user_id, rows)
@@ -1,58 +1,169 @@
+import hashlib
+import json
+import logging
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import base64
 import io
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-from flask import current_app
+from functools import lru_cache
+from flask import current_app, has_app_context
+from utils import svg_charts
 
-def generate_monthly_html_report(report_data):
+logger = logging.getLogger(__name__)
+
+# Rendered charts kept per process, keyed by a hash of backend, chart and input series
+CHART_CACHE_SIZE = 256
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+# Report templates live in Backend/templates/reports
+TEMPLATE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'reports'
+)
+MONTHLY_REPORT_TEMPLATE = 'monthly_report.html'
+
+
+@lru_cache(maxsize=None)
+def _pyplot():
+    """
+    Import pyplot on first chart render
+
+    Keeps matplotlib out of the web app's import graph; only report workers
+    pay its import time and memory.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _chart_cache_key(backend, kind, series):
+    """Hash a chart's input series (in plotting order) together with how it is drawn"""
+    payload = json.dumps([backend, kind, list(series.items())], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _render_chart(backend, kind, series):
+    """
+    Render a chart through the selected backend, reusing an identical earlier render
+
+    Args:
+        backend (str): 'png' (matplotlib) or 'svg' (utils.svg_charts)
+        kind (str): 'usage' or 'cost_trend'
+        series (dict): Input series of the chart
+
+    Returns:
+        str: PNG data URI or SVG markup, None if the chart could not be drawn
+    """
+    key = _chart_cache_key(backend, kind, series)
+    with _chart_cache_lock:
+        chart = _chart_cache.get(key)
+        if chart is not None:
+            _chart_cache.move_to_end(key)
+            return chart
+
+    chart = CHART_RENDERERS[backend][kind](series)
+
+    if chart is not None:
+        with _chart_cache_lock:
+            _chart_cache[key] = chart
+            while len(_chart_cache) > CHART_CACHE_SIZE:
+                _chart_cache.popitem(last=False)
+    return chart
+
+
+def _chart_backend():
+    """Get REPORT_CHART_BACKEND when running inside the app, 'png' otherwise"""
+    if has_app_context():
+        return current_app.config.get('REPORT_CHART_BACKEND', 'png')
+    return 'png'
+
+
+def generate_monthly_html_report(report_data, chart_backend=None):
     """
     Generate a comprehensive monthly HTML report for user parking activity
     
     Args:
-        report_data (dict): Dictionary containing:
-            - user: User object
+        report_data (dict): Precomputed aggregates (see utils.report_data) containing:
+            - user: Dict with id, username and email
             - month_year: String like "January 2024"
             - total_bookings: Integer
             - total_cost: Float
             - most_used_lot: Tuple (lot_name, count)
             - lot_usage: Dict {lot_name: count}
-            - reservations: List of Reservation objects
+            - daily_costs: Dict {'YYYY-MM-DD': cost}
+            - detailed_stats: Dict of duration/weekday statistics
+            - recent_reservations: List of row dicts, newest first
+        chart_backend (str): 'png' or 'svg', defaults to REPORT_CHART_BACKEND
     
     Returns:
         str: HTML content of the report
     """
     try:
+        return ''.join(stream_monthly_html_report(report_data, chart_backend))
+    except Exception as e:
+        logger.error(f"Error generating HTML report: {str(e)}")
+        return _generate_error_report(str(e))
+
+
+def stream_monthly_html_report(report_data, chart_backend=None):
+    """
+    Render the monthly HTML report piece by piece with the cached template
+
+    Takes the same arguments as generate_monthly_html_report. Errors before
+    rendering starts yield the error report instead; errors while rendering
+    propagate to the consumer.
+
+    Yields:
+        str: Chunks of the report HTML
+    """
+    try:
+        template = _report_environment().get_template(MONTHLY_REPORT_TEMPLATE)
+
         # Generate charts if data available
         chart_data = {}
         if report_data['lot_usage']:
-            chart_data['usage_chart'] = _generate_usage_chart(report_data['lot_usage'])
-            chart_data['cost_trend'] = _generate_cost_trend_chart(report_data['reservations'])
-        
-        # Prepare additional statistics
-        stats = _calculate_detailed_stats(report_data['reservations'])
-        
-        # Load and render HTML template
-        html_content = _render_report_template({
-            **report_data,
-            'charts': chart_data,
-            'detailed_stats': stats,
-            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
-        })
-        
-        return html_content
-        
+            backend = chart_backend or _chart_backend()
+            chart_data['usage_chart'] = _render_chart(backend, 'usage', report_data['lot_usage'])
+            chart_data['cost_trend'] = _render_chart(backend, 'cost_trend', report_data['daily_costs'])
     except Exception as e:
-        current_app.logger.error(f"Error generating HTML report: {str(e)}")
-        return _generate_error_report(str(e))
+        logger.error(f"Error generating HTML report: {str(e)}")
+        yield _generate_error_report(str(e))
+        return
+
+    yield from template.generate(
+        **report_data,
+        charts=chart_data,
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+    )
+
+
+def render_monthly_reports(batch, month_year, chart_backend=None):
+    """
+    Render the HTML reports for a chunk of users
+
+    Needs no app context or database access, so it can run in a worker process.
+
+    Args:
+        batch (list): Per-user aggregates from utils.report_data
+        month_year (str): String like "January 2024"
+        chart_backend (str): 'png' or 'svg', defaults to REPORT_CHART_BACKEND
+
+    Returns:
+        list: HTML content of each report, in batch order
+    """
+    return [
+        generate_monthly_html_report({**aggregates, 'month_year': month_year}, chart_backend)
+        for aggregates in batch
+    ]
 
 def _generate_usage_chart(lot_usage):
     """Generate parking lot usage pie chart"""
     try:
+        plt = _pyplot()
         plt.figure(figsize=(8, 6))
         plt.style.use('seaborn-v0_8')
         
@@ -76,22 +187,12 @@ def _generate_usage_chart(lot_usage):
         return f"data:image/png;base64,{chart_base64}"
         
     except Exception as e:
-        current_app.logger.error(f"Error generating usage chart: {str(e)}")
+        logger.error(f"Error generating usage chart: {str(e)}")
         return None
 
-def _generate_cost_trend_chart(reservations):
-    """Generate daily cost trend chart"""
+def _generate_cost_trend_chart(daily_costs):
+    """Generate daily cost trend chart from {'YYYY-MM-DD': cost}"""
     try:
-        if not reservations:
-            return None
-            
-        # Group reservations by date
-        daily_costs = {}
-        for reservation in reservations:
-            if reservation.parking_timestamp and reservation.parking_cost:
-                date_key = reservation.parking_timestamp.strftime('%Y-%m-%d')
-                daily_costs[date_key] = daily_costs.get(date_key, 0) + reservation.parking_cost
-        
         if not daily_costs:
             return None
             
@@ -99,6 +200,7 @@ def _generate_cost_trend_chart(reservations):
         sorted_dates = sorted(daily_costs.keys())
         costs = [daily_costs[date] for date in sorted_dates]
         
+        plt = _pyplot()
         plt.figure(figsize=(12, 6))
         plt.style.use('seaborn-v0_8')
         
@@ -123,326 +225,28 @@ def _generate_cost_trend_chart(reservations):
         return f"data:image/png;base64,{chart_base64}"
         
     except Exception as e:
-        current_app.logger.error(f"Error generating cost trend chart: {str(e)}")
+        logger.error(f"Error generating cost trend chart: {str(e)}")
         return None
 
-def _calculate_detailed_stats(reservations):
-    """Calculate detailed statistics from reservations"""
-    stats = {
-        'avg_duration': 0,
-        'total_duration': 0,
-        'avg_cost_per_hour': 0,
-        'peak_usage_day': 'N/A',
-        'weekend_vs_weekday': {'weekend': 0, 'weekday': 0}
-    }
-    
-    if not reservations:
-        return stats
-    
-    total_duration_hours = 0
-    duration_count = 0
-    day_usage = {}
-    
-    for reservation in reservations:
-        # Calculate duration
-        if reservation.parking_timestamp and reservation.leaving_timestamp:
-            duration = (reservation.leaving_timestamp - reservation.parking_timestamp).total_seconds() / 3600
-            total_duration_hours += duration
-            duration_count += 1
-            
-            # Day of week analysis
-            day_name = reservation.parking_timestamp.strftime('%A')
-            day_usage[day_name] = day_usage.get(day_name, 0) + 1
-            
-            # Weekend vs weekday
-            if day_name in ['Saturday', 'Sunday']:
-                stats['weekend_vs_weekday']['weekend'] += 1
-            else:
-                stats['weekend_vs_weekday']['weekday'] += 1
-    
-    # Calculate averages
-    if duration_count > 0:
-        stats['avg_duration'] = round(total_duration_hours / duration_count, 2)
-        stats['total_duration'] = round(total_duration_hours, 2)
-        
-        total_cost = sum(r.parking_cost for r in reservations if r.parking_cost)
-        if total_duration_hours > 0:
-            stats['avg_cost_per_hour'] = round(total_cost / total_duration_hours, 2)
-    
-    # Peak usage day
-    if day_usage:
-        stats['peak_usage_day'] = max(day_usage.items(), key=lambda x: x[1])[0]
-    
-    return stats
+CHART_RENDERERS = {
+    'png': {'usage': _generate_usage_chart, 'cost_trend': _generate_cost_trend_chart},
+    'svg': {'usage': svg_charts.usage_pie_chart, 'cost_trend': svg_charts.cost_trend_chart},
+}
 
-def _render_report_template(data):
-    """Render the HTML template with data"""
-    
-    template_html = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Monthly Parking Report - {{ month_year }}</title>
-    <style>
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f8f9fa;
-            color: #333;
-        }
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-        .header h1 {
-            margin: 0;
-            font-size: 2.5em;
-            font-weight: 300;
-        }
-        .header p {
-            margin: 10px 0 0 0;
-            opacity: 0.9;
-            font-size: 1.1em;
-        }
-        .content {
-            padding: 30px;
-        }
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        .stat-card {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 8px;
-            text-align: center;
-            border-left: 4px solid #667eea;
-        }
-        .stat-value {
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-            margin-bottom: 5px;
-        }
-        .stat-label {
-            color: #666;
-            font-size: 0.9em;
-        }
-        .section {
-            margin-bottom: 30px;
-        }
-        .section h2 {
-            color: #333;
-            border-bottom: 2px solid #667eea;
-            padding-bottom: 10px;
-            margin-bottom: 20px;
-        }
-        .chart-container {
-            text-align: center;
-            margin: 20px 0;
-        }
-        .chart-container img {
-            max-width: 100%;
-            height: auto;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .reservations-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }
-        .reservations-table th,
-        .reservations-table td {
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #ddd;
-        }
-        .reservations-table th {
-            background-color: #667eea;
-            color: white;
-            font-weight: 600;
-        }
-        .reservations-table tr:hover {
-            background-color: #f5f5f5;
-        }
-        .footer {
-            background: #f8f9fa;
-            padding: 20px;
-            text-align: center;
-            color: #666;
-            font-size: 0.9em;
-        }
-        .highlight {
-            background: linear-gradient(120deg, #a8e6cf 0%, #dcedc1 100%);
-            padding: 15px;
-            border-radius: 8px;
-            margin: 15px 0;
-        }
-        @media (max-width: 600px) {
-            .stats-grid {
-                grid-template-columns: 1fr;
-            }
-            .container {
-                margin: 10px;
-            }
-            body {
-                padding: 10px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚗 Monthly Parking Report</h1>
-            <p>{{ month_year }} | {{ user.username }}</p>
-        </div>
-        
-        <div class="content">
-            <!-- Summary Statistics -->
-            <div class="section">
-                <h2>📊 Summary Statistics</h2>
-                <div class="stats-grid">
-                    <div class="stat-card">
-                        <div class="stat-value">{{ total_bookings }}</div>
-                        <div class="stat-label">Total Bookings</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">${{ "%.2f"|format(total_cost) }}</div>
-                        <div class="stat-label">Total Cost</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{{ "%.1f"|format(detailed_stats.avg_duration) }}h</div>
-                        <div class="stat-label">Avg Duration</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">${{ "%.2f"|format(detailed_stats.avg_cost_per_hour) }}</div>
-                        <div class="stat-label">Cost per Hour</div>
-                    </div>
-                </div>
-            </div>
-
-            {% if most_used_lot %}
-            <div class="highlight">
-                <strong>🏆 Most Used Parking Lot:</strong> {{ most_used_lot[0] }} ({{ most_used_lot[1] }} visits)
-            </div>
-            {% endif %}
-
-            <!-- Charts Section -->
-            {% if charts.usage_chart %}
-            <div class="section">
-                <h2>📈 Usage Analytics</h2>
-                <div class="chart-container">
-                    <img src="{{ charts.usage_chart }}" alt="Parking Lot Usage Distribution">
-                </div>
-            </div>
-            {% endif %}
-
-            {% if charts.cost_trend %}
-            <div class="section">
-                <h2>💰 Cost Trends</h2>
-                <div class="chart-container">
-                    <img src="{{ charts.cost_trend }}" alt="Daily Cost Trend">
-                </div>
-            </div>
-            {% endif %}
-
-            <!-- Detailed Statistics -->
-            <div class="section">
-                <h2>📋 Detailed Insights</h2>
-                <div class="stats-grid">
-                    <div class="stat-card">
-                        <div class="stat-value">{{ detailed_stats.peak_usage_day }}</div>
-                        <div class="stat-label">Peak Usage Day</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{{ detailed_stats.weekend_vs_weekday.weekend }}</div>
-                        <div class="stat-label">Weekend Bookings</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{{ detailed_stats.weekend_vs_weekday.weekday }}</div>
-                        <div class="stat-label">Weekday Bookings</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{{ "%.1f"|format(detailed_stats.total_duration) }}h</div>
-                        <div class="stat-label">Total Duration</div>
-                    </div>
-                </div>
-            </div>
-
-            <!-- Recent Reservations -->
-            {% if reservations %}
-            <div class="section">
-                <h2>🎫 Recent Reservations</h2>
-                <table class="reservations-table">
-                    <thead>
-                        <tr>
-                            <th>Date</th>
-                            <th>Parking Lot</th>
-                            <th>Duration</th>
-                            <th>Cost</th>
-                            <th>Status</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for reservation in reservations[:10] %}
-                        <tr>
-                            <td>{{ reservation.parking_timestamp.strftime('%m/%d') if reservation.parking_timestamp else 'N/A' }}</td>
-                            <td>{{ reservation.parking_spot.parking_lot.prime_location_name }}</td>
-                            <td>
-                                {% if reservation.leaving_timestamp and reservation.parking_timestamp %}
-                                    {{ "%.1f"|format((reservation.leaving_timestamp - reservation.parking_timestamp).total_seconds() / 3600) }}h
-                                {% else %}
-                                    Active
-                                {% endif %}
-                            </td>
-                            <td>${{ "%.2f"|format(reservation.parking_cost) if reservation.parking_cost else '0.00' }}</td>
-                            <td>
-                                {% if reservation.leaving_timestamp %}
-                                    ✅ Completed
-                                {% else %}
-                                    🅿️ Active
-                                {% endif %}
-                            </td>
-                        </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-                {% if reservations|length > 10 %}
-                <p><em>Showing 10 most recent reservations out of {{ reservations|length }} total.</em></p>
-                {% endif %}
-            </div>
-            {% endif %}
-        </div>
-        
-        <div class="footer">
-            <p>Report generated on {{ generated_at }}</p>
-            <p>Vehicle Parking Management System | MAD II Project</p>
-        </div>
-    </div>
-</body>
-</html>
+@lru_cache(maxsize=None)
+def _report_environment():
     """
-    
-    template = Template(template_html)
-    return template.render(**data)
+    Jinja environment for report templates, created once per process
+
+    Compiled templates stay in the environment's cache, and the bytecode cache
+    (in the system temp directory) lets fresh worker processes skip compiling.
+    """
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        bytecode_cache=FileSystemBytecodeCache(),
+        autoescape=select_autoescape(['html']),
+        auto_reload=False,
+    )
 
 def _generate_error_report(error_message):
     """Generate a simple error report"""
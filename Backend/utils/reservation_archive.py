@@ -0,0 +1,121 @@
+"""
+Hot/cold split of reservations
+Completed and cancelled reservations older than RESERVATION_ARCHIVE_AFTER_DAYS
+are moved in batches from the live reservations table to reservations_archive,
+partitioned by month, so the live table and its indexes stay small. History
+reads (bookings list, CSV exports, monthly reports) merge both tables.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func, select
+from models import db
+from models.parking_lot import ParkingLot
+from models.parking_spot import ParkingSpot
+from models.reservation import Reservation
+from models.reservation_archive import ReservationArchive
+
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+# Reservation columns copied as-is into the archive
+_COPIED_COLUMNS = [
+    "id", "spot_id", "user_id", "parking_timestamp", "leaving_timestamp",
+    "expected_leaving_time", "parking_cost", "hourly_rate", "vehicle_number",
+    "vehicle_model", "vehicle_color", "status", "remarks", "created_at", "updated_at",
+]
+
+
+def archive_cutoff(now=None):
+    """Reservations finished before this time are archived"""
+    now = now or datetime.utcnow()
+    return now - timedelta(days=current_app.config.get("RESERVATION_ARCHIVE_AFTER_DAYS", 365))
+
+
+def _archivable_batch(cutoff, newest_id, batch_size):
+    """Next batch of finished reservations to archive, with their lot details"""
+    columns = [getattr(Reservation, name) for name in _COPIED_COLUMNS]
+    return db.session.execute(
+        select(
+            *columns,
+            ParkingSpot.lot_id,
+            ParkingSpot.spot_number,
+            ParkingLot.prime_location_name.label("lot_name"),
+            ParkingLot.address.label("lot_address"),
+        )
+        .outerjoin(ParkingSpot, ParkingSpot.id == Reservation.spot_id)
+        .outerjoin(ParkingLot, ParkingLot.id == ParkingSpot.lot_id)
+        .where(
+            Reservation.status.in_(ARCHIVED_STATUSES),
+            func.coalesce(Reservation.leaving_timestamp, Reservation.updated_at) < cutoff,
+            Reservation.id < newest_id,
+        )
+        .order_by(Reservation.id)
+        .limit(batch_size)
+    ).mappings().all()
+
+
+def archive_reservations(now=None, batch_size=None):
+    """
+    Move old finished reservations to the archive, committing each batch
+
+    Every batch is copied and deleted in one transaction, so an interrupted
+    run leaves each reservation in exactly one of the two tables.
+
+    Args:
+        now (datetime): Reference time, defaults to now (UTC)
+        batch_size (int): Reservations per transaction, defaults to
+            RESERVATION_ARCHIVE_BATCH_SIZE
+
+    Returns:
+        int: Number of reservations archived
+    """
+    cutoff = archive_cutoff(now)
+    batch_size = batch_size or current_app.config.get("RESERVATION_ARCHIVE_BATCH_SIZE", 1000)
+
+    # SQLite hands out max(id) + 1 for new rows: keeping the newest reservation
+    # live guarantees archived ids are never reused by the live table
+    newest_id = db.session.query(func.max(Reservation.id)).scalar()
+    if newest_id is None:
+        return 0
+
+    archived = 0
+    while True:
+        rows = _archivable_batch(cutoff, newest_id, batch_size)
+        if not rows:
+            break
+        archived_at = datetime.utcnow()
+        db.session.execute(
+            ReservationArchive.__table__.insert(),
+            [
+                dict(
+                    row,
+                    archive_period=row["parking_timestamp"].strftime("%Y-%m"),
+                    archived_at=archived_at,
+                )
+                for row in rows
+            ],
+        )
+        # Core delete: a move is not a deletion, so no sync tombstones are written
+        db.session.execute(
+            delete(Reservation.__table__).where(
+                Reservation.__table__.c.id.in_([row["id"] for row in rows])
+            )
+        )
+        db.session.commit()
+        archived += len(rows)
+        if len(rows) < batch_size:
+            break
+    return archived
+
+
+def user_reservations(user_id):
+    """
+    A user's live and archived reservations
+
+    Returns:
+        list: Reservation and ReservationArchive rows in id (booking) order
+    """
+    live = Reservation.query.filter(Reservation.user_id == user_id).all()
+    archived = ReservationArchive.query.filter(ReservationArchive.user_id == user_id).all()
+    return sorted(live + archived, key=lambda reservation: reservation.id)
+
@@ -0,0 +1,107 @@
+"""
+Spot grid of a parking lot
+One page of spots in spot number order, each outer-joined to its active
+reservation only (partial index ix_reservations_active_spot), so listing a
+busy lot costs one query per page regardless of its reservation history
+"""
+
+from sqlalchemy.orm import aliased
+from models import db
+from models.parking_spot import ParkingSpot
+from models.reservation import Reservation
+from models.user import User
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def spot_grid(lot, after=0, limit=200):
+    """
+    A page of a parking lot's spots with their active reservations
+
+    Keyset paginated on spot_number (unique per lot), so a page is a range
+    scan of unique_spot_per_lot however deep into the lot it starts.
+
+    Args:
+        lot (ParkingLot): Lot to list
+        after (int): Return spots numbered above this one
+        limit (int): Maximum number of spots
+
+    Returns:
+        dict: {lot_id, lot_name, spots, next_after}; next_after is the
+            cursor of the next page, None on the last one
+    """
+    # The page is cut over distinct spots first, so the extra row probing for
+    # a next page is always another spot
+    page = (
+        db.session.query(
+            ParkingSpot.id,
+            ParkingSpot.spot_number,
+            ParkingSpot.status,
+            ParkingSpot.updated_at,
+        )
+        .filter(ParkingSpot.lot_id == lot.id, ParkingSpot.spot_number > after)
+        .order_by(ParkingSpot.spot_number)
+        .limit(limit + 1)
+        .subquery()
+    )
+    # One active reservation per spot on the page (the oldest, should a spot
+    # ever have several), looked up per spot in ix_reservations_active_spot
+    active = aliased(Reservation)
+    first_active_id = (
+        db.session.query(db.func.min(active.id))
+        .filter(active.spot_id == page.c.id, active.status == "active")
+        .scalar_subquery()
+    )
+    rows = (
+        db.session.query(
+            page.c.id,
+            page.c.spot_number,
+            page.c.status,
+            page.c.updated_at,
+            Reservation.id,
+            Reservation.user_id,
+            User.username,
+            Reservation.vehicle_number,
+            Reservation.parking_timestamp,
+            Reservation.expected_leaving_time,
+            Reservation.hourly_rate,
+        )
+        .select_from(page)
+        .outerjoin(Reservation, Reservation.id == first_active_id)
+        .outerjoin(User, User.id == Reservation.user_id)
+        .order_by(page.c.spot_number)
+    ).all()
+
+    spots = []
+    for (
+        spot_id, spot_number, status, updated_at,
+        reservation_id, user_id, username, vehicle_number,
+        parking_timestamp, expected_leaving_time, hourly_rate,
+    ) in rows[:limit]:
+        spots.append({
+            "id": spot_id,
+            "spot_number": spot_number,
+            "spot_identifier": f"{lot.prime_location_name}-{spot_number}",
+            "status": status,
+            "updated_at": _isoformat(updated_at),
+            "current_reservation": {
+                "id": reservation_id,
+                "user_id": user_id,
+                "username": username,
+                "vehicle_number": vehicle_number,
+                "parking_timestamp": _isoformat(parking_timestamp),
+                "expected_leaving_time": _isoformat(expected_leaving_time),
+                "hourly_rate": float(hourly_rate),
+            } if reservation_id else None,
+        })
+
+    # The extra spot fetched past the limit tells whether another page follows
+    has_more = len(rows) > limit
+    return {
+        "lot_id": lot.id,
+        "lot_name": lot.prime_location_name,
+        "spots": spots,
+        "next_after": spots[-1]["spot_number"] if has_more else None,
+    }
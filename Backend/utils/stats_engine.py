@@ -0,0 +1,141 @@
+"""
+Vectorized reservation statistics
+Computes durations, daily cost series, weekday/weekend splits, peak days and
+lot usage from columnar NumPy arrays instead of per-row Python loops
+
+Times are epoch seconds of the stored (naive) timestamps, NaN when missing
+(e.g. leaving time of an active reservation). NumPy is heavy, so import this
+module inside the functions that use it rather than at web app import time.
+"""
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+
+# 1970-01-01 was a Thursday (Monday = 0)
+EPOCH_WEEKDAY = 3
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Label counted for reservations whose lot is unknown (deleted lot, outer join miss)
+UNKNOWN_LOT = 'Unknown'
+
+
+def epoch_seconds(values):
+    """
+    Convert a sequence of datetimes to float epoch seconds
+
+    Naive datetimes are taken at face value so day buckets match the stored
+    wall-clock dates; None becomes NaN. The conversion is one NumPy cast to
+    datetime64 (microsecond resolution, so durations keep sub-second precision).
+
+    Returns:
+        np.ndarray: float64 array
+    """
+    times = np.array(values, dtype='datetime64[us]')
+    seconds = times.astype(np.int64) / 1e6
+    seconds[np.isnat(times)] = np.nan
+    return seconds
+
+
+def _day_index(seconds):
+    """Whole days since the epoch for each (finite) timestamp"""
+    return np.floor_divide(seconds, SECONDS_PER_DAY).astype(np.int64)
+
+
+def weekday_index(seconds):
+    """Weekday (Monday = 0) of each (finite) timestamp"""
+    return (_day_index(seconds) + EPOCH_WEEKDAY) % 7
+
+
+def durations_hours(parking, leaving):
+    """Duration in hours of each reservation, NaN while it is active"""
+    return (np.asarray(leaving, dtype=np.float64) - np.asarray(parking, dtype=np.float64)) / SECONDS_PER_HOUR
+
+
+def detailed_stats(parking, leaving, costs):
+    """
+    Duration, cost rate and weekday statistics over completed reservations
+
+    Args:
+        parking (np.ndarray): Parking epoch seconds
+        leaving (np.ndarray): Leaving epoch seconds, NaN while active
+        costs (np.ndarray): Parking costs
+
+    Returns:
+        dict: avg_duration, total_duration, avg_cost_per_hour,
+            peak_usage_day and weekend_vs_weekday counts
+    """
+    parking = np.asarray(parking, dtype=np.float64)
+    leaving = np.asarray(leaving, dtype=np.float64)
+    costs = np.asarray(costs, dtype=np.float64)
+
+    stats = {
+        'avg_duration': 0,
+        'total_duration': 0,
+        'avg_cost_per_hour': 0,
+        'peak_usage_day': 'N/A',
+        'weekend_vs_weekday': {'weekend': 0, 'weekday': 0}
+    }
+
+    completed = np.isfinite(parking) & np.isfinite(leaving)
+    count = int(completed.sum())
+    if not count:
+        return stats
+
+    total_hours = float(durations_hours(parking[completed], leaving[completed]).sum())
+    stats['avg_duration'] = round(total_hours / count, 2)
+    stats['total_duration'] = round(total_hours, 2)
+    if total_hours > 0:
+        stats['avg_cost_per_hour'] = round(float(np.nansum(costs)) / total_hours, 2)
+
+    usage = np.bincount(weekday_index(parking[completed]), minlength=7)
+    weekend = int(usage[5:].sum())
+    stats['weekend_vs_weekday'] = {'weekend': weekend, 'weekday': count - weekend}
+    stats['peak_usage_day'] = WEEKDAY_NAMES[int(np.argmax(usage))]
+
+    return stats
+
+
+def daily_cost_series(parking, costs):
+    """
+    Total cost per calendar day of parking start
+
+    Args:
+        parking (np.ndarray): Parking epoch seconds
+        costs (np.ndarray): Parking costs
+
+    Returns:
+        dict: {'YYYY-MM-DD': cost} in date order, days without cost omitted
+    """
+    parking = np.asarray(parking, dtype=np.float64)
+    costs = np.nan_to_num(np.asarray(costs, dtype=np.float64))
+
+    charged = np.isfinite(parking) & (costs != 0)
+    if not charged.any():
+        return {}
+
+    days, inverse = np.unique(_day_index(parking[charged]), return_inverse=True)
+    totals = np.bincount(inverse, weights=costs[charged])
+    labels = np.datetime_as_string(days.astype('datetime64[D]'))
+    return {str(label): float(total) for label, total in zip(labels, totals)}
+
+
+def lot_usage_counts(lot_ids):
+    """
+    Number of reservations per lot
+
+    Args:
+        lot_ids (np.ndarray): Lot name of each reservation, None counted as
+            UNKNOWN_LOT (np.unique cannot sort None among names)
+
+    Returns:
+        dict: {lot: count}, most used first
+    """
+    lot_ids = np.array(lot_ids, dtype=object)
+    lot_ids[np.equal(lot_ids, None)] = UNKNOWN_LOT
+    lots, counts = np.unique(lot_ids, return_counts=True)
+    lots = lots.tolist()
+    order = np.argsort(-counts, kind='stable')
+    return {lots[i]: int(counts[i]) for i in order}
@@ -0,0 +1,135 @@
+"""
+Lightweight SVG charts for HTML reports
+Builds compact inline SVG markup straight from the report series, without
+matplotlib, for the REPORT_CHART_BACKEND = 'svg' option
+"""
+
+import math
+from html import escape
+
+# Matplotlib's Set3 palette, so both backends colour lots the same way
+PALETTE = (
+    "#8dd3c7", "#ffffb3", "#bebada", "#fb8072", "#80b1d3", "#fdb462",
+    "#b3de69", "#fccde5", "#d9d9d9", "#bc80bd", "#ccebc5", "#ffed6f",
+)
+
+FONT = "font-family=\"Segoe UI, Tahoma, sans-serif\""
+
+
+def _svg(width, height, body, title):
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" role="img" aria-label="{escape(title)}">'
+        f'<text x="{width / 2:g}" y="22" text-anchor="middle" font-size="15" '
+        f'font-weight="bold" {FONT}>{escape(title)}</text>'
+        f"{''.join(body)}</svg>"
+    )
+
+
+def usage_pie_chart(lot_usage, title="Parking Lot Usage Distribution"):
+    """
+    Render a pie chart of bookings per lot
+
+    Args:
+        lot_usage (dict): {lot_name: count}
+        title (str): Chart title
+
+    Returns:
+        str: SVG markup, or None if there is nothing to plot
+    """
+    total = sum(lot_usage.values())
+    if not total:
+        return None
+
+    cx, cy, r = 130, 160, 110
+    body = []
+    angle = -math.pi / 2
+    for index, (lot, count) in enumerate(lot_usage.items()):
+        color = PALETTE[index % len(PALETTE)]
+        share = count / total
+        if share >= 1:
+            body.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+        elif share > 0:
+            end = angle + share * 2 * math.pi
+            x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            x2, y2 = cx + r * math.cos(end), cy + r * math.sin(end)
+            large_arc = 1 if share > 0.5 else 0
+            body.append(
+                f'<path d="M{cx},{cy} L{x1:.1f},{y1:.1f} '
+                f'A{r},{r} 0 {large_arc} 1 {x2:.1f},{y2:.1f} Z" '
+                f'fill="{color}" stroke="#fff" stroke-width="1"/>'
+            )
+            angle = end
+
+        # Legend entry
+        y = 60 + index * 22
+        body.append(f'<rect x="270" y="{y - 11}" width="12" height="12" fill="{color}"/>')
+        body.append(
+            f'<text x="290" y="{y}" font-size="12" {FONT}>'
+            f"{escape(str(lot))} ({share * 100:.1f}%)</text>"
+        )
+
+    height = max(290, 60 + len(lot_usage) * 22)
+    return _svg(460, height, body, title)
+
+
+def cost_trend_chart(daily_costs, title="Daily Parking Costs Trend"):
+    """
+    Render a line chart of daily costs
+
+    Args:
+        daily_costs (dict): {'YYYY-MM-DD': cost}, in date order
+        title (str): Chart title
+
+    Returns:
+        str: SVG markup, or None if there is nothing to plot
+    """
+    if not daily_costs:
+        return None
+
+    dates = list(daily_costs.keys())
+    costs = list(daily_costs.values())
+    width, height = 600, 300
+    left, right, top, bottom = 50, 20, 40, 40
+    plot_w, plot_h = width - left - right, height - top - bottom
+    peak = max(costs) or 1
+    step = plot_w / (len(costs) - 1) if len(costs) > 1 else 0
+
+    def point(index, cost):
+        x = left + (index * step if step else plot_w / 2)
+        y = top + plot_h - cost / peak * plot_h
+        return f"{x:.1f},{y:.1f}"
+
+    points = [point(i, cost) for i, cost in enumerate(costs)]
+    body = [
+        # Axes and gridlines at 0, 50% and 100% of the peak
+        f'<line x1="{left}" y1="{top + plot_h}" x2="{left + plot_w}" y2="{top + plot_h}" stroke="#999"/>',
+        f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_h}" stroke="#999"/>',
+    ]
+    for fraction in (0.5, 1):
+        y = top + plot_h - fraction * plot_h
+        body.append(
+            f'<line x1="{left}" y1="{y:g}" x2="{left + plot_w}" y2="{y:g}" stroke="#ddd"/>'
+        )
+        body.append(
+            f'<text x="{left - 6}" y="{y + 4:g}" text-anchor="end" font-size="11" {FONT}>'
+            f"${peak * fraction:.0f}</text>"
+        )
+    body.append(
+        f'<polyline points="{" ".join(points)}" fill="none" stroke="#667eea" stroke-width="2"/>'
+    )
+    body.extend(
+        f'<circle cx="{p.split(",")[0]}" cy="{p.split(",")[1]}" r="3" fill="#667eea"/>'
+        for p in points
+    )
+
+    # Day-of-month labels, at most about 10 of them
+    label_every = max(1, len(dates) // 10)
+    for index in range(0, len(dates), label_every):
+        x = point(index, 0).split(",")[0]
+        body.append(
+            f'<text x="{x}" y="{top + plot_h + 16}" text-anchor="middle" font-size="11" {FONT}>'
+            f"{escape(dates[index].split('-')[-1])}</text>"
+        )
+
+    return _svg(width, height, body, title)